@@ -0,0 +1,77 @@
+"""
+Compare building envelope requests from scratch with EnvelopeTemplate.
+
+    python -m benchmarks.envelope_templates
+"""
+
+import timeit
+
+from esignanywhere_python_client.envelope_templates import EnvelopeTemplate
+from esignanywhere_python_client.models import models_v6
+
+NUMBER = 2000
+ACTIVITIES = 10
+
+
+def envelope_data(email, file_id):
+    return {
+        "Name": "Contract",
+        "Documents": [{"FileId": file_id, "DocumentNumber": 1}],
+        "Activities": [
+            {
+                "Action": {
+                    "Sign": {
+                        "RecipientConfiguration": {
+                            "ContactInformation": {
+                                "Email": (
+                                    email if index == 0 else f"{index}@example.com"
+                                ),
+                                "GivenName": "Mario",
+                                "Surname": "Rossi",
+                                "LanguageCode": "IT",
+                            }
+                        },
+                        "Elements": {
+                            "TextBoxes": [
+                                {
+                                    "ElementId": f"field-{index}",
+                                    "DocumentNumber": 1,
+                                    "Value": "",
+                                }
+                            ]
+                        },
+                    }
+                }
+            }
+            for index in range(ACTIVITIES)
+        ],
+        "EmailConfiguration": {"Subject": "Please sign", "Message": "Hello"},
+    }
+
+
+def measure(statement, **namespace):
+    seconds = min(timeit.repeat(statement, number=NUMBER, repeat=5, globals=namespace))
+    return seconds / NUMBER * 1e6
+
+
+def main():
+    template = EnvelopeTemplate(envelope_data("signer@example.com", "file"))
+    scratch = measure(
+        "EnvelopeSendRequest(**envelope_data('luigi@example.com', 'file-id'))",
+        EnvelopeSendRequest=models_v6.EnvelopeSendRequest,
+        envelope_data=envelope_data,
+    )
+    instantiate = measure(
+        "template.instantiate(recipients=[{'Email': 'luigi@example.com'}],"
+        " documents=['file-id'], field_values={'field-0': 'value'})",
+        template=template,
+    )
+    print(f"{ACTIVITIES} activities")
+    print(f"from scratch : {scratch:8.1f} us/request")
+    print(
+        f"template     : {instantiate:8.1f} us/request (x{scratch / instantiate:.1f})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Compare serializing envelope requests with and without frozen fragments.
+
+The email, reminder, expiration and agreement configurations and the form
+fields of the signer are shared by every request and frozen once; only the
+recipient differs. The JSON encoding of pydantic is already fast for long
+strings, freezing pays off most for large trees of models such as form
+fields.
+
+    python -m benchmarks.fragments
+"""
+
+import json
+import timeit
+
+from esignanywhere_python_client import fragments
+from esignanywhere_python_client.models import models_v6
+
+NUMBER = 2000
+FORM_FIELDS = 200
+LANGUAGES = ("IT", "EN", "DE", "FR", "ES")
+
+
+def shared_configuration():
+    return {
+        "EmailConfiguration": models_v6.EnvelopeSendEmailConfiguration(
+            Subject="Please sign your contract",
+            Message="Dear customer,\n" + "please read the contract carefully. " * 40,
+        ),
+        "ReminderConfiguration": models_v6.EnvelopeSendReminderConfiguration(
+            Enabled=True, FirstReminderInDays=2, ReminderResendIntervalInDays=3
+        ),
+        "ExpirationConfiguration": models_v6.EnvelopeSendExpirationConfiguration(
+            ExpirationInSecondsAfterSending=30 * 86400
+        ),
+        "AgreementConfiguration": models_v6.EnvelopeSendAgreementConfiguration(
+            Translations=[
+                {
+                    "LanguageCode": language,
+                    "Header": "Terms and conditions",
+                    "Text": "I agree to the terms and conditions. " * 100,
+                    "IsDefault": language == "IT",
+                }
+                for language in LANGUAGES
+            ]
+        ),
+        "Elements": models_v6.EnvelopeSendElements(
+            TextBoxes=[
+                {
+                    "ElementId": f"field-{index}",
+                    "DocumentNumber": 1,
+                    "Required": True,
+                    "Value": "",
+                }
+                for index in range(FORM_FIELDS)
+            ]
+        ),
+    }
+
+
+def make_request(configuration):
+    configuration = dict(configuration)
+    elements = configuration.pop("Elements")
+    return models_v6.EnvelopeSendRequest(
+        Name="Contract",
+        Documents=[{"FileId": "file-id"}],
+        Activities=[
+            {
+                "Action": {
+                    "Sign": {
+                        "RecipientConfiguration": {
+                            "ContactInformation": {
+                                "Email": "signer@example.com",
+                                "GivenName": "Mario",
+                                "Surname": "Rossi",
+                            }
+                        },
+                        "Elements": elements,
+                    }
+                }
+            }
+        ],
+        **configuration,
+    )
+
+
+def measure(statement, **namespace):
+    seconds = min(timeit.repeat(statement, number=NUMBER, repeat=5, globals=namespace))
+    return seconds / NUMBER * 1e6
+
+
+def main():
+    configuration = shared_configuration()
+    request = make_request(configuration)
+    size = len(fragments.dumps(request))
+    full = measure(
+        "json.dumps(request.model_dump(mode='json'))", json=json, request=request
+    )
+    to_json = measure(
+        "request.__pydantic_serializer__.to_json(request)", request=request
+    )
+    for model in configuration.values():
+        fragments.freeze(model)
+    spliced = measure("dumps(request)", dumps=fragments.dumps, request=request)
+    print(f"{size} bytes per request")
+    print(f"model_dump + json.dumps : {full:8.1f} us/request")
+    print(f"to_json                 : {to_json:8.1f} us/request")
+    print(f"frozen fragments        : {spliced:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measure the per-call cost of the client middleware chain.
+
+The HTTP transport is replaced by a canned response, so the numbers only
+include the work done by the client itself.
+
+    python -m benchmarks.middleware_overhead
+"""
+
+import datetime
+import timeit
+from unittest import mock
+
+import requests
+
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.middleware import ClientCall, Middleware, build_chain
+
+NUMBER = 20000
+
+
+def canned_response(*args, **kwargs):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b"{}"
+    response.elapsed = datetime.timedelta()
+    response.request = requests.Request("GET", "https://example.com").prepare()
+    return response
+
+
+def measure(statement, **namespace):
+    seconds = min(timeit.repeat(statement, number=NUMBER, repeat=5, globals=namespace))
+    return seconds / NUMBER * 1e6
+
+
+def main():
+    call = ClientCall(
+        endpoint="get_teams", version="v6", http_method="GET", service_url=""
+    )
+    for count in (0, 1, 5, 10):
+        chain = build_chain([Middleware() for _ in range(count)], lambda call: None)
+        elapsed = measure("chain(call)", chain=chain, call=call)
+        print(f"chain only, {count:2d} middlewares  : {elapsed:8.3f} us/call")
+
+    with mock.patch("requests.request", canned_response):
+        client = ESignAnyWhereClient(api_token="token")
+        call = ClientCall(
+            endpoint="get_teams",
+            version="v6",
+            http_method="GET",
+            service_url=f"{client.api_uri}v6/organization/team",
+            request_data={},
+            body="data",
+            response_type="json",
+        )
+        baseline = measure("client._dispatch(call)", client=client, call=call)
+        print(f"direct dispatch              : {baseline:8.3f} us/call")
+        for count in (0, 1, 5, 10):
+            client = ESignAnyWhereClient(
+                api_token="token", middlewares=[Middleware() for _ in range(count)]
+            )
+            elapsed = measure(
+                "client._call('get_teams', 'v6', 'GET', client.api_uri,"
+                " request_data={}, body='data', response_type='json')",
+                client=client,
+            )
+            print(
+                f"client call, {count:2d} middlewares : {elapsed:8.3f} us/call"
+                f" (+{elapsed - baseline:.2f} us)"
+            )
+
+
+if __name__ == "__main__":
+    main()
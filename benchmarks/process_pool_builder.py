@@ -0,0 +1,74 @@
+"""
+Measure how building envelope requests scales with worker processes.
+
+Each row becomes a models_v6.EnvelopeSendRequest with many activities,
+validated and serialized to JSON; nothing is sent.
+
+    python -m benchmarks.process_pool_builder [rows]
+"""
+
+import os
+import sys
+import time
+
+from esignanywhere_python_client.builders import (
+    ProcessPoolEnvelopeBuilder,
+    serialize_request,
+)
+from esignanywhere_python_client.models import models_v6
+
+ACTIVITIES = 30
+
+
+def build_envelope(index):
+    return models_v6.EnvelopeSendRequest(
+        Name=f"Envelope {index}",
+        Documents=[{"FileId": f"file-{index}", "DocumentNumber": 0}],
+        Activities=[
+            {
+                "Action": {
+                    "Sign": {
+                        "RecipientConfiguration": {
+                            "ContactInformation": {
+                                "Email": f"signer{index}.{activity}@example.com",
+                                "GivenName": "Mario",
+                                "Surname": "Rossi",
+                                "LanguageCode": "IT",
+                            }
+                        }
+                    }
+                }
+            }
+            for activity in range(ACTIVITIES)
+        ],
+    )
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print(f"{os.cpu_count()} cpus, {rows} rows of {ACTIVITIES} activities")
+
+    started = time.perf_counter()
+    for index in range(rows):
+        serialize_request(build_envelope(index))
+    baseline = rows / (time.perf_counter() - started)
+    print(f"in process    : {baseline:8.0f} rows/s")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        with ProcessPoolEnvelopeBuilder(build_envelope, max_workers=workers) as builder:
+            # Start the workers before measuring
+            list(builder.map(range(workers)))
+            started = time.perf_counter()
+            for _ in builder.map(range(rows)):
+                pass
+            throughput = rows / (time.perf_counter() - started)
+        print(
+            f"{workers:3d} processes : {throughput:8.0f} rows/s"
+            f" (x{throughput / baseline:.2f})"
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Measure how the client throughput scales with the number of threads.
+
+Each operation validates and sends an envelope or gets one and validates
+the response, alternately. The HTTP transport is replaced by a canned
+response, so only the CPU work of the client (pydantic validation and
+serialization, JSON parsing, middlewares) is measured: with the GIL the
+throughput stays flat, on a free-threaded interpreter (python3.14t) it
+should grow with the threads up to the number of cores.
+
+    python -m benchmarks.thread_scaling [operations]
+"""
+
+import datetime
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import requests
+
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.metrics import InMemoryMetricsSink
+from esignanywhere_python_client.models import models_v6
+
+THREADS = (1, 2, 4, 8, 16)
+SEND_RESPONSE = json.dumps({"EnvelopeId": "envelope-id"}).encode()
+GET_RESPONSE = json.dumps(
+    {
+        "Id": "envelope-id",
+        "EnvelopeStatus": "Active",
+        "Name": "Benchmark envelope",
+        "SentDate": "2024-01-01T10:00:00Z",
+        "Activities": [
+            {
+                "Id": f"activity-{index}",
+                "Status": "Completed",
+                "FinishedDate": "2024-01-02T10:00:00Z",
+            }
+            for index in range(20)
+        ],
+    }
+).encode()
+
+
+def canned_response(method, url, **kwargs):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = SEND_RESPONSE if method == "POST" else GET_RESPONSE
+    response.elapsed = datetime.timedelta()
+    response.request = requests.Request(method, url).prepare()
+    return response
+
+
+def envelope_data(index):
+    contact = {
+        "Email": f"signer{index}@example.com",
+        "GivenName": "Mario",
+        "Surname": "Rossi",
+        "LanguageCode": "IT",
+    }
+    return {
+        "Documents": [{"FileId": f"file-{index}", "DocumentNumber": 0}],
+        "Name": f"Envelope {index}",
+        "Activities": [
+            {
+                "Action": {
+                    "Sign": {"RecipientConfiguration": {"ContactInformation": contact}}
+                }
+            }
+            for _ in range(5)
+        ],
+    }
+
+
+def operation(client, index):
+    if index % 2:
+        return client.get_envelope("envelope-id")
+    return client.create_and_send_envelope(
+        models_v6.EnvelopeSendRequest(**envelope_data(index))
+    )
+
+
+def run(client, threads, operations):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for _ in executor.map(
+            lambda index: operation(client, index), range(operations)
+        ):
+            pass
+    return operations / (time.perf_counter() - started)
+
+
+def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(
+        f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'},"
+        f" {os.cpu_count()} cpus, {operations} operations"
+    )
+    with mock.patch("requests.request", canned_response):
+        client = ESignAnyWhereClient(
+            api_token="token", metrics_sink=InMemoryMetricsSink()
+        )
+        run(client, 1, operations // 10)
+        baseline = None
+        for threads in THREADS:
+            throughput = run(client, threads, operations)
+            baseline = baseline or throughput
+            print(
+                f"{threads:3d} threads : {throughput:9.0f} ops/s"
+                f" (x{throughput / baseline:.2f})"
+            )
+
+
+if __name__ == "__main__":
+    main()
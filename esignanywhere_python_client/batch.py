@@ -0,0 +1,346 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from . import exceptions
+from .concurrency import AdaptiveConcurrencyLimiter, RateLimiter
+from .esign_client import ESignAnyWhereClient
+from .models import models_v6
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class BatchOutcome:
+    """The result of the operation on one item of a batch."""
+
+    key: str
+    item: Any = None
+    result: Any = None
+    error: BaseException | None = None
+    attempts: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class BatchCheckpoint:
+    """
+    Keys already processed by a batch, appended as JSON lines to a file.
+
+    Each line records a key and whether its operation succeeded, the last
+    line of a key wins. Lines are flushed as they are written, a partial
+    last line left by a crash is ignored when loading.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # Key -> True if it succeeded
+        self.done: dict[str, bool] = {}
+        if os.path.exists(path):
+            with open(path) as checkpoint_file:
+                for line in checkpoint_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.done[entry["key"]] = entry["ok"]
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "BatchCheckpoint":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def is_done(self, key: str, retry_failed: bool = True) -> bool:
+        ok = self.done.get(key)
+        return ok is not None and (ok or not retry_failed)
+
+    def record(self, outcome: BatchOutcome) -> None:
+        entry = {"key": outcome.key, "ok": outcome.ok}
+        if not outcome.ok:
+            entry["error"] = f"{type(outcome.error).__name__}: {outcome.error!r}"
+        with self._lock:
+            self.done[outcome.key] = outcome.ok
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _get_envelope_id(item: str | Any) -> str:
+    return item if isinstance(item, str) else item.EnvelopeId
+
+
+class BatchRunner:
+    """
+    Run an operation over many envelopes, in parallel and rate limited.
+
+    Items are dispatched to ``max_workers`` threads, at most ``rate`` calls
+    per second when given, and optionally within the slots of an
+    AdaptiveConcurrencyLimiter. A call failing with a retryable error is
+    retried up to ``max_attempts`` times, but only when the error proves it
+    was not processed (see exceptions.is_unprocessed) unless the operation
+    is ``idempotent``: the cancel, delete, remind and restart operations are
+    not, a retried remind would send the reminders twice. The outcomes are
+    yielded as they
+    complete, with at most twice ``max_workers`` items read ahead, so the
+    items can come from a long iterator.
+
+    Given a ``checkpoint_path``, every outcome is recorded there before it
+    is yielded, and running the same job again with it skips the keys which
+    succeeded (and the failed ones too unless ``retry_failed``). Use one
+    checkpoint file per job.
+
+        runner = BatchRunner(client, max_workers=16, rate=20)
+        for outcome in runner.delete_envelopes(ids, checkpoint_path="purge.jsonl"):
+            if not outcome.ok:
+                ...
+    """
+
+    def __init__(
+        self,
+        client: ESignAnyWhereClient,
+        max_workers: int = 8,
+        rate: float | None = None,
+        burst: float = 1.0,
+        limiter: AdaptiveConcurrencyLimiter | None = None,
+        max_attempts: int = 3,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.client = client
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate, burst) if rate else None
+        self.limiter = limiter
+        self.max_attempts = max_attempts
+        self.sleep = sleep
+        self.skipped = 0
+
+    def _call(self, operation: Callable[[Any], Any], item: Any) -> Any:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        if self.limiter is None:
+            return operation(item)
+        with self.limiter.slot():
+            return operation(item)
+
+    def run_one(
+        self,
+        operation: Callable[[Any], Any],
+        key: str,
+        item: Any,
+        endpoint: str = "batch",
+        version: str = "v6",
+        idempotent: bool = False,
+    ) -> BatchOutcome:
+        """
+        Apply operation to item in the calling thread, rate limited and retried.
+
+        :param endpoint: the endpoint the retries are recorded for in the
+            metrics of the client
+        :param idempotent: whether operation can be retried after any
+            retryable error, rather than only the unprocessed ones
+        """
+        outcome = BatchOutcome(key, item)
+        while True:
+            outcome.attempts += 1
+            try:
+                outcome.result = self._call(operation, item)
+            except Exception as e:
+                backoff = exceptions.get_backoff(e)
+                if (
+                    backoff is None
+                    or outcome.attempts >= self.max_attempts
+                    or not (idempotent or exceptions.is_unprocessed(e))
+                ):
+                    outcome.error = e
+                    return outcome
+                self.client.metrics.record_retry(endpoint, version, type(e).__name__)
+                self.sleep(backoff)
+                continue
+            outcome.error = None
+            return outcome
+
+    def run(
+        self,
+        items: Iterable[Any],
+        operation: Callable[[Any], Any],
+        key: Callable[[Any], str] = _get_envelope_id,
+        checkpoint_path: str | None = None,
+        retry_failed: bool = True,
+        endpoint: str = "batch",
+        version: str = "v6",
+        on_outcome: Callable[[BatchOutcome], None] | None = None,
+        idempotent: bool = False,
+    ) -> Iterator[BatchOutcome]:
+        """
+        Apply operation to every item and yield the outcomes as they complete.
+
+        :param key: returns the key identifying an item in the checkpoint,
+            by default its envelope id
+        :param checkpoint_path: file recording the processed keys
+        :param retry_failed: run the failed keys of the checkpoint again
+        :param endpoint: the endpoint the retries are recorded for
+        :param on_outcome: called with every outcome before it is recorded
+            in the checkpoint, e.g. to write it somewhere else first
+        :param idempotent: as for run_one()
+        """
+        checkpoint = BatchCheckpoint(checkpoint_path) if checkpoint_path else None
+        self.skipped = 0
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="esaw-batch"
+            ) as executor:
+                in_flight: set[Future] = set()
+                for item in items:
+                    item_key = key(item)
+                    if checkpoint is not None and checkpoint.is_done(
+                        item_key, retry_failed
+                    ):
+                        self.skipped += 1
+                        continue
+                    in_flight.add(
+                        executor.submit(
+                            self.run_one,
+                            operation,
+                            item_key,
+                            item,
+                            endpoint,
+                            version,
+                            idempotent,
+                        )
+                    )
+                    if len(in_flight) >= self.max_workers * 2:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield self._complete(future, checkpoint, on_outcome)
+                while in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield self._complete(future, checkpoint, on_outcome)
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
+    def _complete(
+        self,
+        future: Future,
+        checkpoint: BatchCheckpoint | None,
+        on_outcome: Callable[[BatchOutcome], None] | None,
+    ) -> BatchOutcome:
+        outcome = future.result()
+        if not outcome.ok:
+            logger.warning("Batch item %s failed: %r", outcome.key, outcome.error)
+        if on_outcome is not None:
+            on_outcome(outcome)
+        if checkpoint is not None:
+            checkpoint.record(outcome)
+        return outcome
+
+    def cancel_envelopes(
+        self,
+        items: Iterable[str | models_v6.EnvelopeCancelRequest],
+        version="v6",
+        **options: Any,
+    ) -> Iterator[BatchOutcome]:
+        """
+        Cancel envelopes given by id or as models_v6.EnvelopeCancelRequest.
+
+        :param options: checkpoint_path and retry_failed, as for run()
+        """
+
+        def cancel(item: str | models_v6.EnvelopeCancelRequest) -> Any:
+            if isinstance(item, str):
+                item = models_v6.EnvelopeCancelRequest(EnvelopeId=item)
+            return self.client.cancel_envelope(item, version=version)
+
+        return self.run(
+            items, cancel, endpoint="cancel_envelope", version=version, **options
+        )
+
+    def delete_envelopes(
+        self,
+        items: Iterable[str | models_v6.EnvelopeDeleteRequest],
+        version="v6",
+        **options: Any,
+    ) -> Iterator[BatchOutcome]:
+        """
+        Delete envelopes given by id or as models_v6.EnvelopeDeleteRequest.
+
+        :param options: checkpoint_path and retry_failed, as for run()
+        """
+
+        def delete(item: str | models_v6.EnvelopeDeleteRequest) -> Any:
+            return self.client.delete_envelope(_get_envelope_id(item), version=version)
+
+        return self.run(
+            items, delete, endpoint="delete_envelope", version=version, **options
+        )
+
+    def remind_envelopes(
+        self,
+        items: Iterable[str | models_v6.EnvelopeRemindRequest],
+        version="v6",
+        **options: Any,
+    ) -> Iterator[BatchOutcome]:
+        """
+        Remind the awaited recipients of envelopes given by id or as
+        models_v6.EnvelopeRemindRequest, the results are
+        models_v6.EnvelopeRemindResponse.
+
+        :param options: checkpoint_path and retry_failed, as for run()
+        """
+
+        def remind(item: str | models_v6.EnvelopeRemindRequest) -> Any:
+            if isinstance(item, str):
+                item = models_v6.EnvelopeRemindRequest(EnvelopeId=item)
+            return self.client.remind_envelope(item, version=version)
+
+        return self.run(
+            items, remind, endpoint="remind_envelope", version=version, **options
+        )
+
+    def restart_envelopes_expiration_days(
+        self,
+        items: Iterable[str | models_v6.EnvelopeRestartExpiredRequest],
+        expiration_in_seconds: int | None = None,
+        expiration_date: datetime | None = None,
+        version="v6",
+        **options: Any,
+    ) -> Iterator[BatchOutcome]:
+        """
+        Restart expired envelopes given as models_v6.EnvelopeRestartExpiredRequest,
+        or by id with the expiration applied to all of them.
+
+        :param expiration_in_seconds: ExpirationInSecondsAfterSending of the ids
+        :param expiration_date: ExpirationDate of the ids
+        :param options: checkpoint_path and retry_failed, as for run()
+        """
+
+        def restart(item: str | models_v6.EnvelopeRestartExpiredRequest) -> Any:
+            if isinstance(item, str):
+                item = models_v6.EnvelopeRestartExpiredRequest(
+                    EnvelopeId=item,
+                    ExpirationInSecondsAfterSending=expiration_in_seconds,
+                    ExpirationDate=expiration_date,
+                )
+            return self.client.restart_envelope_expiration_days(item, version=version)
+
+        return self.run(
+            items,
+            restart,
+            endpoint="restart_envelope_expiration_days",
+            version=version,
+            **options,
+        )
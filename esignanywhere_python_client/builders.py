@@ -0,0 +1,155 @@
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any
+
+from pydantic import BaseModel
+
+from . import fragments
+from .esign_client import ESignAnyWhereClient
+
+
+@dataclass(slots=True)
+class BuiltRequest:
+    """
+    A request built from the row at ``index``.
+
+    ``body`` is the serialized JSON of the validated model, or None when the
+    row was rejected, with the validation message in ``error``.
+    """
+
+    index: int
+    body: bytes | None = None
+    error: str | None = None
+
+
+@dataclass(slots=True)
+class SendResult:
+    index: int
+    response: Any = None
+    error: BaseException | str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def serialize_request(request: BaseModel) -> bytes:
+    """Return the JSON bytes of a validated request, as the client sends it."""
+    return fragments.dumps(request)
+
+
+def _build_chunk(
+    build: Callable[[Any], BaseModel], start: int, rows: list[Any]
+) -> list[BuiltRequest]:
+    built = []
+    for index, row in enumerate(rows, start):
+        try:
+            built.append(BuiltRequest(index, body=serialize_request(build(row))))
+        except Exception as e:
+            # Exceptions, pydantic ones included, do not all survive pickling
+            built.append(BuiltRequest(index, error=f"{type(e).__name__}: {e}"))
+    return built
+
+
+class ProcessPoolEnvelopeBuilder:
+    """
+    Build and validate request models from plain rows in worker processes.
+
+    ``build`` turns a row into a request model (e.g. a
+    models_v6.EnvelopeSendRequest) and must be picklable, that is defined at
+    module level. Rows are sent to the workers in chunks of ``chunksize``
+    and only the serialized JSON comes back, so the parent process does no
+    pydantic work at all. At most ``max_pending`` chunks are in flight,
+    which bounds the memory used for long row iterables.
+
+        def build(row):
+            return models_v6.EnvelopeSendRequest(...)
+
+        with ProcessPoolEnvelopeBuilder(build) as builder:
+            for result in builder.send(client, rows):
+                ...
+    """
+
+    def __init__(
+        self,
+        build: Callable[[Any], BaseModel],
+        max_workers: int | None = None,
+        chunksize: int = 64,
+        max_pending: int | None = None,
+    ) -> None:
+        self.build = build
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.max_pending = max_pending or self.max_workers * 2
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def __enter__(self) -> "ProcessPoolEnvelopeBuilder":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+    def map(self, rows: Iterable[Any]) -> Iterator[BuiltRequest]:
+        """Yield the request built from every row, in the order of rows."""
+        rows = iter(rows)
+        pending: deque[Future] = deque()
+        start = 0
+        while True:
+            while len(pending) < self.max_pending:
+                chunk = list(islice(rows, self.chunksize))
+                if not chunk:
+                    break
+                pending.append(
+                    self.executor.submit(_build_chunk, self.build, start, chunk)
+                )
+                start += len(chunk)
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+    def send(
+        self,
+        client: ESignAnyWhereClient,
+        rows: Iterable[Any],
+        io_workers: int = 16,
+        send: Callable[[ESignAnyWhereClient, bytes], Any] | None = None,
+    ) -> Iterator[SendResult]:
+        """
+        Build the requests of rows and send them from ``io_workers`` threads.
+
+        :param send: sends one serialized request, by default
+            client.create_and_send_envelope
+        :return: the SendResult of every row, roughly in the order of rows
+        """
+        send = send or (lambda client, body: client.create_and_send_envelope(body))
+
+        def run(index: int, body: bytes) -> SendResult:
+            try:
+                return SendResult(index, response=send(client, body))
+            except Exception as e:
+                return SendResult(index, error=e)
+
+        with ThreadPoolExecutor(
+            max_workers=io_workers, thread_name_prefix="esaw-send"
+        ) as executor:
+            in_flight: deque[Future] = deque()
+            for built in self.map(rows):
+                if built.body is None:
+                    yield SendResult(built.index, error=built.error)
+                    continue
+                in_flight.append(executor.submit(run, built.index, built.body))
+                # Keep the builders ahead of the senders without queueing
+                # every request in memory
+                while len(in_flight) >= io_workers * 2 or (
+                    in_flight and in_flight[0].done()
+                ):
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
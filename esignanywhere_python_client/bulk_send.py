@@ -0,0 +1,342 @@
+import dataclasses
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from . import exceptions, fragments
+from .esign_client import ESignAnyWhereClient
+from .models import models_v6
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+# The send failed in a way which does not tell whether the bulk was created
+UNKNOWN = "unknown"
+
+
+@dataclass(slots=True)
+class BulkChunk:
+    """A slice of the bulk recipients, sent as one EnvelopeBulkSendRequest."""
+
+    index: int
+    recipients: list[str]
+    status: str = PENDING
+    attempts: int = 0
+    bulk_parent_id: str | None = None
+    # Recipient email -> child envelope id
+    children: dict[str, str] = field(default_factory=dict)
+    error: str | None = None
+
+
+@dataclass(slots=True)
+class BulkSendManifest:
+    """Which recipients landed in which bulk parent, saved as JSON."""
+
+    name: str
+    chunks: list[BulkChunk] = field(default_factory=list)
+
+    @property
+    def bulk_parent_ids(self) -> list[str]:
+        return [chunk.bulk_parent_id for chunk in self.chunks if chunk.bulk_parent_id]
+
+    @property
+    def children(self) -> dict[str, str]:
+        children = {}
+        for chunk in self.chunks:
+            children.update(chunk.children)
+        return children
+
+    @property
+    def failed(self) -> list[BulkChunk]:
+        return [chunk for chunk in self.chunks if chunk.status != SENT]
+
+    @property
+    def unknown(self) -> list[BulkChunk]:
+        return [chunk for chunk in self.chunks if chunk.status == UNKNOWN]
+
+    @property
+    def complete(self) -> bool:
+        return not self.failed
+
+    def save(self, path: str) -> None:
+        """Write the manifest atomically to path."""
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w") as manifest_file:
+            json.dump(dataclasses.asdict(self), manifest_file, indent=1)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BulkSendManifest":
+        with open(path) as manifest_file:
+            data = json.load(manifest_file)
+        return cls(
+            name=data["name"],
+            chunks=[BulkChunk(**chunk) for chunk in data["chunks"]],
+        )
+
+
+def _get_failed_status(error: BaseException) -> str:
+    if (
+        exceptions.is_unprocessed(error)
+        or isinstance(error, exceptions.ESawQuotaExceededError)
+        or (
+            isinstance(error, exceptions.BaseAPIESawErrorResponse)
+            and 400 <= error.status_code < 500
+        )
+    ):
+        return FAILED
+    # Timeouts, dropped connections, 5xx or unexpected answers: the bulk may
+    # have been created anyway
+    return UNKNOWN
+
+
+def _get_email(recipient: models_v6.EnvelopeBulkSendRecipient) -> str:
+    contact = recipient.RecipientConfiguration.ContactInformation
+    if contact is None or not contact.Email:
+        raise ValueError("Every bulk recipient requires a ContactInformation Email")
+    return contact.Email
+
+
+def _get_sign_bulk(
+    request: models_v6.EnvelopeBulkSendRequest,
+) -> tuple[int, models_v6.EnvelopeBulkSendAction, models_v6.EnvelopeBulkSendSignBulk]:
+    """Return the index, action and SignBulk of the SignBulk activity of request."""
+    for index, activity in enumerate(request.Activities):
+        action = activity.Action
+        if action is not None and action.SignBulk is not None:
+            return index, action, action.SignBulk
+    raise ValueError("The request has no SignBulk activity")
+
+
+class BulkSendOrchestrator:
+    """
+    Send a large bulk envelope as several bulk parents, in parallel.
+
+    The BulkRecipients of the SignBulk activity are split in chunks of at
+    most ``chunk_size`` recipients and, when ``max_chunk_bytes`` is given,
+    of a serialized request below that size. Chunks are sent from
+    ``max_workers`` threads. Sends are not idempotent, so a chunk is only
+    retried, up to ``max_attempts`` times, when the error proves it was not
+    processed (see exceptions.is_unprocessed). The manifest records the
+    bulk parent and the child envelopes of every chunk; given a
+    ``manifest_path`` it is saved after each chunk, and sending the same
+    request again with it only sends the chunks which were not sent yet.
+
+    A chunk whose send failed ambiguously (a timeout, a 5xx, ...) is marked
+    UNKNOWN and is not sent again: check whether its bulk exists, e.g. with
+    find_envelope, then set its status to SENT or FAILED in the manifest,
+    or pass ``resend_unknown`` to send it anyway.
+
+        orchestrator = BulkSendOrchestrator(client, chunk_size=500)
+        manifest = orchestrator.send(bulk_request, "campaign.json")
+        if not manifest.complete:
+            manifest = orchestrator.send(bulk_request, "campaign.json")
+    """
+
+    def __init__(
+        self,
+        client: ESignAnyWhereClient,
+        chunk_size: int = 500,
+        max_chunk_bytes: int | None = None,
+        max_workers: int = 4,
+        max_attempts: int = 3,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.client = client
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.sleep = sleep
+        self._lock = threading.Lock()
+
+    def get_recipients(
+        self, request: models_v6.EnvelopeBulkSendRequest
+    ) -> list[models_v6.EnvelopeBulkSendRecipient]:
+        """
+        Return the bulk recipients of request, checked to be sent in chunks.
+
+        :raises ValueError: if request has no SignBulk activity, a recipient
+            has no email or two have the same one, as the manifest tells
+            the child envelopes apart by email
+        """
+        recipients = _get_sign_bulk(request)[2].BulkRecipients or []
+        emails = set()
+        for recipient in recipients:
+            email = _get_email(recipient).lower()
+            if email in emails:
+                raise ValueError(f"The bulk recipient {email} is given twice")
+            emails.add(email)
+        return recipients
+
+    def split(
+        self, request: models_v6.EnvelopeBulkSendRequest
+    ) -> list[list[models_v6.EnvelopeBulkSendRecipient]]:
+        """
+        Return the chunks of the bulk recipients of request.
+
+        :raises ValueError: as get_recipients
+        """
+        recipients = self.get_recipients(request)
+        if self.max_chunk_bytes is None:
+            return [
+                recipients[start : start + self.chunk_size]
+                for start in range(0, len(recipients), self.chunk_size)
+            ]
+
+        # The request without recipients, plus each recipient and a comma
+        base_size = len(fragments.dumps(self.get_chunk_request(request, [])))
+        chunks: list[list[models_v6.EnvelopeBulkSendRecipient]] = [[]]
+        size = base_size
+        for recipient in recipients:
+            recipient_size = len(fragments.dumps(recipient)) + 1
+            if chunks[-1] and (
+                len(chunks[-1]) >= self.chunk_size
+                or size + recipient_size > self.max_chunk_bytes
+            ):
+                chunks.append([])
+                size = base_size
+            chunks[-1].append(recipient)
+            size += recipient_size
+        return chunks if chunks[0] else []
+
+    def get_chunk_request(
+        self,
+        request: models_v6.EnvelopeBulkSendRequest,
+        recipients: list[models_v6.EnvelopeBulkSendRecipient],
+    ) -> models_v6.EnvelopeBulkSendRequest:
+        """Return request sent to recipients only, sharing everything else."""
+        index, action, sign_bulk = _get_sign_bulk(request)
+        activities = list(request.Activities)
+        activities[index] = activities[index].model_copy(
+            update={
+                "Action": action.model_copy(
+                    update={
+                        "SignBulk": sign_bulk.model_copy(
+                            update={"BulkRecipients": recipients}
+                        )
+                    }
+                )
+            }
+        )
+        return request.model_copy(update={"Activities": activities})
+
+    def _send_chunk(
+        self,
+        request: models_v6.EnvelopeBulkSendRequest,
+        recipients: list[models_v6.EnvelopeBulkSendRecipient],
+        chunk: BulkChunk,
+        manifest: BulkSendManifest,
+        manifest_path: str | None,
+    ) -> None:
+        chunk_request = self.get_chunk_request(request, recipients)
+        attempts = 0
+        while True:
+            attempts += 1
+            with self._lock:
+                chunk.attempts += 1
+            try:
+                response = self.client.create_and_send_bulk_envelope(chunk_request)
+            except Exception as e:
+                backoff = exceptions.get_backoff(e)
+                if (
+                    backoff is not None
+                    and exceptions.is_unprocessed(e)
+                    and attempts < self.max_attempts
+                ):
+                    self.client.metrics.record_retry(
+                        "create_and_send_bulk_envelope", "v6", type(e).__name__
+                    )
+                    self.sleep(backoff)
+                    continue
+                status = _get_failed_status(e)
+                logger.warning(
+                    "Bulk chunk %s of %s %s: %r",
+                    chunk.index,
+                    manifest.name,
+                    "failed" if status == FAILED else "may not have been sent",
+                    e,
+                )
+                with self._lock:
+                    chunk.status = status
+                    # repr() of the API errors leaves the request data out
+                    chunk.error = f"{type(e).__name__}: {e!r}"
+                break
+            with self._lock:
+                chunk.status = SENT
+                chunk.error = None
+                chunk.bulk_parent_id = response.EnvelopeBulkParentId
+                chunk.children = {
+                    child.BulkRecipientEmail: child.EnvelopeId
+                    for child in response.EnvelopeBulkChildren or []
+                }
+            break
+        if manifest_path is not None:
+            with self._lock:
+                manifest.save(manifest_path)
+
+    def send(
+        self,
+        request: models_v6.EnvelopeBulkSendRequest,
+        manifest_path: str | None = None,
+        resend_unknown: bool = False,
+    ) -> BulkSendManifest:
+        """
+        Send request in chunks and return the manifest of the campaign.
+
+        :param manifest_path: file recording the campaign, when it exists the
+            chunks it marks as sent are not sent again
+        :param resend_unknown: send the UNKNOWN chunks of the manifest again,
+            only once they were checked not to exist
+        :raises ValueError: if the manifest does not match the chunks of
+            request, or as get_recipients
+        """
+        chunks = self.split(request)
+        if manifest_path is not None and os.path.exists(manifest_path):
+            manifest = BulkSendManifest.load(manifest_path)
+            if [chunk.recipients for chunk in manifest.chunks] != [
+                [_get_email(recipient) for recipient in recipients]
+                for recipients in chunks
+            ]:
+                raise ValueError(
+                    f"The manifest {manifest_path} does not match the request chunks"
+                )
+        else:
+            manifest = BulkSendManifest(
+                name=request.Name,
+                chunks=[
+                    BulkChunk(
+                        index, [_get_email(recipient) for recipient in recipients]
+                    )
+                    for index, recipients in enumerate(chunks)
+                ],
+            )
+            if manifest_path is not None:
+                manifest.save(manifest_path)
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="esaw-bulk"
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self._send_chunk,
+                    request,
+                    recipients,
+                    chunk,
+                    manifest,
+                    manifest_path,
+                )
+                for recipients, chunk in zip(chunks, manifest.chunks)
+                if chunk.status in (PENDING, FAILED)
+                or (resend_unknown and chunk.status == UNKNOWN)
+            ]
+            for future in futures:
+                future.result()
+        return manifest
@@ -0,0 +1,182 @@
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+
+from .esign_client import ESignAnyWhereClient
+from .models import models_v6
+
+# Child statuses which will not change anymore
+FINAL_STATUSES = frozenset(
+    {
+        models_v6.Status2.Completed.value,
+        models_v6.Status2.Canceled.value,
+        models_v6.Status2.Expired.value,
+        models_v6.Status2.Rejected.value,
+    }
+)
+
+
+def _get_value(value: Enum | str | None) -> str | None:
+    # The models keep enum values, but are typed with the enums
+    return value.value if isinstance(value, Enum) else value
+
+
+@dataclass(slots=True)
+class BulkParentStatus:
+    """Last known state of a bulk parent and of its child envelopes."""
+
+    bulk_id: str
+    bulk_status: str | None = None
+    # Child envelope id -> last child received
+    children: dict[str, models_v6.EnvelopeBulkGetChildEnvelope] = field(
+        default_factory=dict
+    )
+    counts: Counter = field(default_factory=Counter)
+    refreshed_at: float | None = None
+    error: BaseException | None = None
+
+    @property
+    def done(self) -> bool:
+        """True once no child can change anymore, the parent is not refreshed then."""
+        if self.bulk_status == models_v6.BulkStatus.Completed.value:
+            return True
+        return bool(self.children) and all(
+            child.Status in FINAL_STATUSES for child in self.children.values()
+        )
+
+    @property
+    def completion_rate(self) -> float:
+        total = sum(self.counts.values())
+        if not total:
+            return 0.0
+        return self.counts[models_v6.Status2.Completed.value] / total
+
+
+class BulkStatusAggregator:
+    """
+    Follow the child envelopes of many bulk parents with one call per parent.
+
+    ``refresh`` gets every tracked parent which is not done yet with
+    get_bulk_envelope, in parallel, and updates the per status counts of the
+    parent and the overall ones incrementally from the children whose
+    status changed.
+
+        aggregator = BulkStatusAggregator(client)
+        aggregator.track(*manifest.bulk_parent_ids)
+        aggregator.refresh()
+        aggregator.counts["Completed"], aggregator.completion_rate
+    """
+
+    def __init__(
+        self,
+        client: ESignAnyWhereClient,
+        max_workers: int = 8,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.client = client
+        self.max_workers = max_workers
+        self.clock = clock
+        self.parents: dict[str, BulkParentStatus] = {}
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def track(self, *bulk_ids: str) -> None:
+        with self._lock:
+            for bulk_id in bulk_ids:
+                self.parents.setdefault(bulk_id, BulkParentStatus(bulk_id))
+
+    def untrack(self, bulk_id: str) -> None:
+        with self._lock:
+            parent = self.parents.pop(bulk_id, None)
+            if parent is not None:
+                self.counts.subtract(parent.counts)
+                self.counts = +self.counts
+
+    @property
+    def completion_rate(self) -> float:
+        total = sum(self.counts.values())
+        if not total:
+            return 0.0
+        return self.counts[models_v6.Status2.Completed.value] / total
+
+    def get_pending(self) -> list[str]:
+        """Return the tracked parents which are not done yet."""
+        return [bulk_id for bulk_id, parent in self.parents.items() if not parent.done]
+
+    def _update(
+        self, parent: BulkParentStatus, response: models_v6.EnvelopeBulkGetResponse
+    ) -> int:
+        # Children without an id cannot be followed from one refresh to the next
+        children = {
+            child.EnvelopeId: child
+            for child in response.Children or []
+            if child.EnvelopeId is not None
+        }
+        changed = 0
+        with self._lock:
+            parent.bulk_status = _get_value(response.BulkStatus)
+            parent.refreshed_at = self.clock()
+            parent.error = None
+            for envelope_id in list(parent.children):
+                if envelope_id not in children:
+                    status = _get_value(parent.children.pop(envelope_id).Status)
+                    parent.counts[status] -= 1
+                    self.counts[status] -= 1
+                    changed += 1
+            for envelope_id, child in children.items():
+                status = _get_value(child.Status)
+                previous = parent.children.get(envelope_id)
+                parent.children[envelope_id] = child
+                if previous is not None:
+                    previous_status = _get_value(previous.Status)
+                    if previous_status == status:
+                        continue
+                    parent.counts[previous_status] -= 1
+                    self.counts[previous_status] -= 1
+                parent.counts[status] += 1
+                self.counts[status] += 1
+                changed += 1
+            parent.counts = +parent.counts
+            self.counts = +self.counts
+        return changed
+
+    def refresh(self, bulk_ids: Iterable[str] | None = None) -> dict[str, int]:
+        """
+        Get the parents not done yet and return how many children changed in each.
+
+        A parent failing to refresh keeps its previous state, with the error
+        in its ``error`` attribute.
+        """
+        bulk_ids = list(self.get_pending() if bulk_ids is None else bulk_ids)
+        self.track(*bulk_ids)
+
+        def run(bulk_id: str) -> tuple[str, int]:
+            parent = self.parents[bulk_id]
+            try:
+                response = self.client.get_bulk_envelope(bulk_id)
+            except Exception as e:
+                parent.error = e
+                return bulk_id, 0
+            return bulk_id, self._update(parent, response)
+
+        if not bulk_ids:
+            return {}
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(bulk_ids)),
+            thread_name_prefix="esaw-bulk-status",
+        ) as executor:
+            return dict(executor.map(run, bulk_ids))
+
+    def get_recipient_states(self, bulk_id: str | None = None) -> dict[str, str | None]:
+        """Return the status of each recipient email, in one or every parent."""
+        parents = self.parents.values() if bulk_id is None else [self.parents[bulk_id]]
+        return {
+            child.Email: _get_value(child.Status)
+            for parent in parents
+            for child in parent.children.values()
+            if child.Email is not None
+        }
@@ -0,0 +1,241 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlsplit
+
+from . import exceptions
+from .metrics import MetricsSink
+from .middleware import ClientCall, Handler, Middleware
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATES = (CLOSED, OPEN, HALF_OPEN)
+
+CIRCUIT_STATE = "esaw_circuit_state"
+CIRCUIT_REJECTED = "esaw_circuit_rejected_total"
+
+# First path segment after /Api/<version>/ -> endpoint family
+ENDPOINT_FAMILIES = {
+    "file": "file",
+    "envelope": "envelope",
+    "envelopebulk": "bulk",
+    "draft": "draft",
+    "template": "draft",
+    "organization": "organization",
+}
+
+
+def get_endpoint_family(service_url: str) -> str:
+    """Return the family (file, envelope, bulk, draft, ...) of a service url."""
+    segments = urlsplit(service_url).path.lower().split("/")
+    try:
+        segment = segments[segments.index("api") + 2]
+    except (ValueError, IndexError):
+        return "other"
+    return ENDPOINT_FAMILIES.get(segment, segment or "other")
+
+
+@dataclass(frozen=True, slots=True)
+class Permit:
+    """A call let through by CircuitBreaker.allow, to report its outcome with."""
+
+    # Times the circuit had opened when the call was let through
+    generation: int
+    probe: bool = False
+
+
+class CircuitBreaker:
+    """
+    Failure rate based circuit breaker.
+
+    Outcomes are counted in one second slots over ``window_seconds``. Once at
+    least ``minimum_calls`` were made and the failure rate reaches
+    ``failure_rate_threshold`` the circuit opens and rejects every call for
+    ``open_seconds``. It then becomes half open: ``half_open_max_calls``
+    probe calls are let through, the circuit closes after
+    ``half_open_successes`` of them succeed and opens again on any failure.
+
+    ``allow`` returns a Permit which is given back with the outcome of the
+    call. Only the outcomes of probes count while half open, and those of
+    calls let through before the circuit last opened are ignored.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 10,
+        window_seconds: float = 30.0,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        half_open_successes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.half_open_successes = half_open_successes
+        self.clock = clock
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._slots: deque[list] = deque()
+        self._probes = 0
+        self._probe_successes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        while self._slots and self._slots[0][0] <= now - self.window_seconds:
+            self._slots.popleft()
+
+    def _add(self, now: float, failed: bool) -> None:
+        second = int(now)
+        if not self._slots or self._slots[-1][0] != second:
+            self._slots.append([second, 0, 0])
+        self._slots[-1][2 if failed else 1] += 1
+        self._trim(now)
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        self._generation += 1
+        self._slots.clear()
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds left before an open circuit lets probe calls through."""
+        if self.state != OPEN:
+            return 0.0
+        return max(self.opened_at + self.open_seconds - self.clock(), 0.0)
+
+    def allow(self) -> Permit | None:
+        """Return a Permit if a call may be attempted, reserving a probe if half open."""
+        with self._lock:
+            now = self.clock()
+            if self.state == OPEN:
+                if now - self.opened_at < self.open_seconds:
+                    return None
+                self.state = HALF_OPEN
+                self._probes = 0
+                self._probe_successes = 0
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    return None
+                self._probes += 1
+                return Permit(self._generation, probe=True)
+            return Permit(self._generation)
+
+    def _is_current(self, permit: Permit) -> bool:
+        if permit.generation != self._generation:
+            return False
+        return self.state != HALF_OPEN or permit.probe
+
+    def record_success(self, permit: Permit) -> None:
+        with self._lock:
+            if not self._is_current(permit):
+                return
+            now = self.clock()
+            if self.state == HALF_OPEN:
+                self._probes -= 1
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_successes:
+                    self.state = CLOSED
+                    self._slots.clear()
+                return
+            self._add(now, failed=False)
+
+    def record_failure(self, permit: Permit) -> None:
+        with self._lock:
+            if not self._is_current(permit):
+                return
+            now = self.clock()
+            if self.state == HALF_OPEN:
+                self._open(now)
+                return
+            self._add(now, failed=True)
+            successes = sum(slot[1] for slot in self._slots)
+            failures = sum(slot[2] for slot in self._slots)
+            calls = successes + failures
+            if (
+                calls >= self.minimum_calls
+                and failures / calls >= self.failure_rate_threshold
+            ):
+                self._open(now)
+
+    def release(self, permit: Permit) -> None:
+        """Give back a probe whose outcome says nothing about the server health."""
+        with self._lock:
+            if self.state == HALF_OPEN and permit.probe and self._is_current(permit):
+                self._probes -= 1
+
+
+class CircuitBreakerMiddleware(Middleware):
+    """
+    Keep one CircuitBreaker per endpoint family and fail fast when it is open.
+
+    Only failures telling that eSignAnyWhere is unhealthy (connection errors,
+    timeouts, rate limiting and 5xx responses) count against the circuit;
+    calls against an open circuit raise ESawCircuitOpenError without any I/O.
+
+        client.add_middleware(CircuitBreakerMiddleware())
+    """
+
+    def __init__(
+        self,
+        families: tuple[str, ...] = ("file", "envelope", "bulk", "draft"),
+        metrics_sink: MetricsSink | None = None,
+        **breaker_options: Any,
+    ) -> None:
+        self.families = families
+        self.metrics = metrics_sink or MetricsSink()
+        self.breakers = {
+            family: CircuitBreaker(name=family, **breaker_options)
+            for family in families
+        }
+
+    def _set_gauge(self, breaker: CircuitBreaker) -> None:
+        if self.metrics.enabled:
+            self.metrics.set_gauge(
+                CIRCUIT_STATE,
+                STATES.index(breaker.state),
+                labels={"family": breaker.name},
+            )
+
+    def __call__(self, call: ClientCall, call_next: Handler) -> Any:
+        breaker = self.breakers.get(get_endpoint_family(call.service_url))
+        if breaker is None:
+            return call_next(call)
+        permit = breaker.allow()
+        if permit is None:
+            if self.metrics.enabled:
+                self.metrics.increment(
+                    CIRCUIT_REJECTED,
+                    labels={"family": breaker.name, "endpoint": call.endpoint},
+                )
+            raise exceptions.ESawCircuitOpenError(
+                family=breaker.name,
+                method_name=call.endpoint,
+                retry_after=breaker.retry_after,
+            )
+        try:
+            result = call_next(call)
+        except BaseException as e:
+            if exceptions.is_retryable(e):
+                breaker.record_failure(permit)
+            elif isinstance(e, exceptions.BaseAPIESawErrorResponse):
+                # The server answered, so it is healthy enough
+                breaker.record_success(permit)
+            else:
+                breaker.release(permit)
+            self._set_gauge(breaker)
+            raise
+        breaker.record_success(permit)
+        self._set_gauge(breaker)
+        return result
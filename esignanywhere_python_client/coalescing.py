@@ -0,0 +1,152 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from .metrics import MetricsSink
+from .middleware import ClientCall, Handler, Middleware
+
+COALESCED_CALLS = "esaw_coalesced_calls_total"
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls sharing the same key into a single execution.
+
+    The first caller of a key runs the function, callers arriving while it is
+    running wait for it and receive the same result or exception.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.collapsed = 0
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> tuple[Any, bool]:
+        """Return the result of function and whether it was shared with a leader."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.followers += 1
+                self.collapsed += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = function()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines running on the same event loop."""
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, asyncio.Future] = {}
+        self.collapsed = 0
+
+    async def do(
+        self, key: Hashable, function: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        future = self._flights.get(key)
+        if future is not None:
+            self.collapsed += 1
+            return await asyncio.shield(future), True
+
+        future = self._flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await function()
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieve it, so that an exception without followers is not reported
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._flights[key]
+
+
+class CoalescingMiddleware(Middleware):
+    """
+    Share one HTTP request among identical concurrent idempotent calls.
+
+    Calls are identical when they target the same url with the same method
+    and data, and expect the same kind of response. By default every idempotent call
+    is coalesced; ``endpoints`` restricts it to the given client methods.
+
+        client.add_middleware(
+            CoalescingMiddleware(
+                endpoints={"get_envelope", "get_envelope_viewer_links"}
+            )
+        )
+    """
+
+    def __init__(
+        self,
+        endpoints: set[str] | None = None,
+        metrics_sink: MetricsSink | None = None,
+    ) -> None:
+        self.endpoints = endpoints
+        self.metrics = metrics_sink or MetricsSink()
+        self.flights = SingleFlight()
+
+    @property
+    def collapsed(self) -> int:
+        return self.flights.collapsed
+
+    def __call__(self, call: ClientCall, call_next: Handler) -> Any:
+        if not call.is_idempotent or (
+            self.endpoints is not None and call.endpoint not in self.endpoints
+        ):
+            return call_next(call)
+
+        key = (
+            call.http_method,
+            call.service_url,
+            str(call.request_data),
+            call.response_type,
+            call.response_model,
+            call.headers.get("apiToken"),
+        )
+        (result, response), shared = self.flights.do(
+            key, lambda: (call_next(call), call.response)
+        )
+        if shared:
+            call.response = response
+            call.extras["coalesced"] = True
+            if self.metrics.enabled:
+                self.metrics.increment(
+                    COALESCED_CALLS,
+                    labels={"endpoint": call.endpoint, "version": call.version},
+                )
+        return result
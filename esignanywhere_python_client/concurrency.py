@@ -0,0 +1,207 @@
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from . import exceptions
+from .metrics import MetricsSink
+from .middleware import ClientCall, Handler, Middleware
+
+CONCURRENCY_LIMIT = "esaw_concurrency_limit"
+CONCURRENCY_IN_FLIGHT = "esaw_concurrency_in_flight"
+CONCURRENCY_DECISIONS = "esaw_concurrency_decisions_total"
+
+SUCCESS = "success"
+OVERLOAD = "overload"
+IGNORE = "ignore"
+
+
+def get_outcome(error: BaseException | None) -> str:
+    """Map the result of a call to the outcome reported to the limiter."""
+    if error is None:
+        return SUCCESS
+    if exceptions.is_retryable(error) and not isinstance(
+        error, exceptions.ESawCircuitOpenError
+    ):
+        return OVERLOAD
+    return IGNORE
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit following the latency and the errors of the server.
+
+    The limiter tracks the no-load latency (the lowest latency seen recently)
+    and grows the limit by about one slot per round trip while latencies stay
+    below ``latency_tolerance`` times it. Overload errors (429, 5xx,
+    timeouts) or latencies above the tolerance multiply the limit by
+    ``backoff_ratio``, at most once per round trip.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.7,
+        latency_tolerance: float = 2.0,
+        baseline_decay: float = 0.01,
+        name: str = "",
+        metrics_sink: MetricsSink | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.baseline_decay = baseline_decay
+        self.name = name
+        self.metrics = metrics_sink or MetricsSink()
+        self.clock = clock
+        self.in_flight = 0
+        self.baseline_latency: float | None = None
+        self.increases = 0
+        self.decreases = 0
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    @property
+    def current_limit(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Wait for a free slot; return False if timeout expired first."""
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self.in_flight < self.current_limit, timeout=timeout
+            ):
+                return False
+            self.in_flight += 1
+            self._publish()
+            return True
+
+    def release(self, latency: float, outcome: str = SUCCESS) -> None:
+        """Free a slot and adapt the limit to the outcome of the call."""
+        with self._condition:
+            self.in_flight -= 1
+            if outcome == SUCCESS:
+                self._on_success(latency)
+            elif outcome == OVERLOAD:
+                self._decrease("overload")
+            self._publish()
+            self._condition.notify_all()
+
+    def _on_success(self, latency: float) -> None:
+        baseline = self.baseline_latency
+        if baseline is None or latency < baseline:
+            self.baseline_latency = baseline = latency
+        else:
+            # Let the baseline drift up slowly, so it follows a slower server
+            self.baseline_latency = baseline = baseline + self.baseline_decay * (
+                latency - baseline
+            )
+        if latency > baseline * self.latency_tolerance:
+            self._decrease("latency")
+        elif self.limit < self.max_limit:
+            self.limit = min(self.limit + 1 / self.limit, float(self.max_limit))
+            self.increases += 1
+            self._count("increase")
+
+    def _decrease(self, reason: str) -> None:
+        now = self.clock()
+        if now - self._last_decrease < (self.baseline_latency or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(self.limit * self.backoff_ratio, float(self.min_limit))
+        self.decreases += 1
+        self._count(f"decrease_{reason}")
+
+    def _count(self, decision: str) -> None:
+        if self.metrics.enabled:
+            self.metrics.increment(
+                CONCURRENCY_DECISIONS,
+                labels={"limiter": self.name, "decision": decision},
+            )
+
+    def _publish(self) -> None:
+        if self.metrics.enabled:
+            labels = {"limiter": self.name}
+            self.metrics.set_gauge(CONCURRENCY_LIMIT, self.current_limit, labels)
+            self.metrics.set_gauge(CONCURRENCY_IN_FLIGHT, self.in_flight, labels)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot for the duration of the block, timing it for the limiter."""
+        self.acquire()
+        started = time.perf_counter()
+        error: BaseException | None = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.release(time.perf_counter() - started, get_outcome(error))
+
+
+class RateLimiter:
+    """
+    Token bucket letting ``rate`` calls per second through, in bursts of ``burst``.
+
+    ``acquire`` reserves the next free token and sleeps until it is due, so
+    waiting threads are served in order without busy looping.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Wait for a token and return the time waited."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(
+                self._tokens + (now - self._updated) * self.rate, self.burst
+            )
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay:
+            self.sleep(delay)
+        return delay
+
+
+class ConcurrencyLimitMiddleware(Middleware):
+    """
+    Bound the calls in flight through the client with an adaptive limiter.
+
+    ``endpoints`` restricts the limit to the given client methods, e.g. the
+    ones used by batch jobs.
+    """
+
+    def __init__(
+        self,
+        limiter: AdaptiveConcurrencyLimiter | None = None,
+        endpoints: set[str] | None = None,
+    ) -> None:
+        self.limiter = limiter or AdaptiveConcurrencyLimiter()
+        self.endpoints = endpoints
+
+    def __call__(self, call: ClientCall, call_next: Handler) -> Any:
+        if self.endpoints is not None and call.endpoint not in self.endpoints:
+            return call_next(call)
+        with self.limiter.slot():
+            return call_next(call)
@@ -0,0 +1,606 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from .esign_client import ESignAnyWhereClient
+from .middleware import ClientCall, Handler, Middleware
+from .models import models_v6
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS envelopes (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    status TEXT,
+    metadata TEXT,
+    bulk_parent_id TEXT,
+    sent_date TEXT,
+    sender_email TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS envelopes_status ON envelopes (status);
+CREATE INDEX IF NOT EXISTS envelopes_bulk_parent_id ON envelopes (bulk_parent_id);
+CREATE TABLE IF NOT EXISTS recipients (
+    envelope_id TEXT,
+    email TEXT,
+    name TEXT,
+    PRIMARY KEY (envelope_id, email)
+);
+CREATE INDEX IF NOT EXISTS recipients_email ON recipients (email);
+CREATE TABLE IF NOT EXISTS metadata (
+    envelope_id TEXT,
+    key TEXT,
+    value TEXT,
+    PRIMARY KEY (envelope_id, key)
+);
+CREATE INDEX IF NOT EXISTS metadata_key_value ON metadata (key, value);
+"""
+
+# The find_envelope results of a rebuild, before they replace the index
+_STAGING_SCHEMA = """
+CREATE TEMP TABLE IF NOT EXISTS rebuilt_envelopes (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    status TEXT,
+    metadata TEXT,
+    bulk_parent_id TEXT
+)
+"""
+
+# The rowid of the text row is the one of the envelope
+_FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS envelopes_text"
+    " USING fts5(name, metadata, recipients, sender)"
+)
+_TEXT_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS envelopes_text"
+    " (rowid INTEGER PRIMARY KEY, name, metadata, recipients, sender)"
+)
+
+_COLUMNS = (
+    "id",
+    "name",
+    "status",
+    "metadata",
+    "bulk_parent_id",
+    "sent_date",
+    "sender_email",
+    "updated_at",
+)
+
+
+@dataclass(slots=True)
+class IndexedEnvelope:
+    id: str
+    name: str | None = None
+    status: str | None = None
+    metadata: str | None = None
+    bulk_parent_id: str | None = None
+    sent_date: str | None = None
+    sender_email: str | None = None
+    updated_at: float | None = None
+
+
+def parse_json_metadata(metadata: str) -> dict[str, str]:
+    """Return the top level keys of a JSON object MetaData, {} for anything else."""
+    try:
+        values = json.loads(metadata)
+    except ValueError:
+        return {}
+    if not isinstance(values, dict):
+        return {}
+    return {
+        str(key): value if isinstance(value, str) else json.dumps(value)
+        for key, value in values.items()
+    }
+
+
+def _get_recipients(
+    envelope: models_v6.EnvelopeGetResponse,
+) -> list[tuple[str, str | None]]:
+    recipients = []
+    for activity in envelope.Activities or []:
+        if activity.Action is None:
+            continue
+        for name in type(activity.Action).model_fields:
+            action = getattr(activity.Action, name)
+            contact = getattr(action, "ContactInformation", None)
+            if contact is not None and contact.Email:
+                full_name = " ".join(
+                    part for part in (contact.GivenName, contact.Surname) if part
+                )
+                recipients.append((contact.Email, full_name or None))
+    return recipients
+
+
+def _quote(text: str) -> str:
+    # Every word as a prefix phrase, so FTS operators in the text are inert
+    return " ".join('"{}"*'.format(word.replace('"', '""')) for word in text.split())
+
+
+class EnvelopeIndex:
+    """
+    Local SQLite index of envelopes, answering lookups without the API.
+
+    Envelopes are added from find_envelope results (name, status and
+    MetaData), get_envelope results (recipients, sender and sending date)
+    and bulk children (recipient and status), each merging with what the
+    index already has; ``update_status`` records the statuses received by
+    a callback handler. ``IndexMiddleware`` adds the results of the client
+    calls as they happen.
+
+    ``query`` combines full text search over names, MetaData, recipients
+    and senders (SQLite FTS5, or LIKE where FTS5 is not compiled in) with
+    exact recipient email, status and MetaData key lookups. MetaData is
+    split in keys by ``metadata_parser``, top level JSON keys by default.
+
+        index = EnvelopeIndex("envelopes.db")
+        index.add_find_envelopes(client.find_envelope(descriptor).Envelopes)
+        index.query(recipient_email="mario.rossi@example.com", status="Active")
+        index.query(text="rossi contract", metadata={"CustomerId": "42"})
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        metadata_parser: Callable[[str], dict[str, str]] = parse_json_metadata,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.metadata_parser = metadata_parser
+        self.clock = clock
+        self._lock = threading.RLock()
+        # The writes waiting for the rebuild running, None when there is none
+        self._deferred: list[Callable[[], Any]] | None = None
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(_SCHEMA)
+        self.connection.execute(_STAGING_SCHEMA)
+        try:
+            self.connection.execute(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.connection.execute(_TEXT_SCHEMA)
+            self.has_fts = False
+        self.connection.commit()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    @property
+    def rebuilding(self) -> bool:
+        return self._deferred is not None
+
+    def write_after_rebuild(self, write: Callable[[], Any]) -> None:
+        """Call write now, or once the rebuild running has replaced the index."""
+        with self._lock:
+            if self._deferred is not None:
+                self._deferred.append(write)
+                return
+            write()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self.connection.execute(
+                "SELECT count(*) FROM envelopes"
+            ).fetchone()
+        return count
+
+    def _upsert(self, envelope_id: str, **values: Any) -> None:
+        values = {key: value for key, value in values.items() if value is not None}
+        values["updated_at"] = self.clock()
+        columns = ", ".join(["id", *values])
+        placeholders = ", ".join("?" * (len(values) + 1))
+        updates = ", ".join(f"{column} = excluded.{column}" for column in values)
+        self.connection.execute(
+            f"INSERT INTO envelopes ({columns}) VALUES ({placeholders})"
+            f" ON CONFLICT (id) DO UPDATE SET {updates}",
+            (envelope_id, *values.values()),
+        )
+        if "metadata" in values:
+            self.connection.execute(
+                "DELETE FROM metadata WHERE envelope_id = ?", (envelope_id,)
+            )
+            self.connection.executemany(
+                "INSERT INTO metadata VALUES (?, ?, ?)",
+                [
+                    (envelope_id, key, value)
+                    for key, value in self.metadata_parser(values["metadata"]).items()
+                ],
+            )
+
+    def _add_recipient(
+        self, envelope_id: str, email: str, name: str | None = None
+    ) -> None:
+        self.connection.execute(
+            "INSERT INTO recipients VALUES (?, ?, ?) ON CONFLICT DO UPDATE"
+            " SET name = coalesce(excluded.name, name)",
+            (envelope_id, email.lower(), name),
+        )
+
+    def _add_find_envelope(
+        self, envelope_id: str, envelope: models_v6.EnvelopeFindEnvelope
+    ) -> None:
+        self._upsert(
+            envelope_id,
+            name=envelope.Name,
+            status=envelope.Status,
+            metadata=envelope.MetaData,
+            bulk_parent_id=envelope.EnvelopeBulkParentId,
+        )
+
+    def _update_text(self, envelope_ids: Iterable[str]) -> None:
+        for envelope_id in envelope_ids:
+            rowid, name, metadata, sender = self.connection.execute(
+                "SELECT rowid, name, metadata, sender_email FROM envelopes"
+                " WHERE id = ?",
+                (envelope_id,),
+            ).fetchone()
+            recipients = " ".join(
+                " ".join(filter(None, row))
+                for row in self.connection.execute(
+                    "SELECT email, name FROM recipients WHERE envelope_id = ?",
+                    (envelope_id,),
+                )
+            )
+            self.connection.execute(
+                "DELETE FROM envelopes_text WHERE rowid = ?", (rowid,)
+            )
+            self.connection.execute(
+                "INSERT INTO envelopes_text (rowid, name, metadata, recipients, sender)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (rowid, name, metadata, recipients, sender),
+            )
+
+    def _write(self, add: Callable[[], Iterable[str]]) -> int:
+        """Run add in one transaction and update the text of the ids it returns."""
+        with self._lock, self.connection:
+            envelope_ids = set(add())
+            self._update_text(envelope_ids)
+        return len(envelope_ids)
+
+    def add_find_envelopes(
+        self, envelopes: Iterable[models_v6.EnvelopeFindEnvelope]
+    ) -> int:
+        """Index envelopes found by find_envelope, return how many."""
+
+        def add() -> Iterator[str]:
+            for envelope in envelopes:
+                if envelope.Id is None:
+                    continue
+                self._add_find_envelope(envelope.Id, envelope)
+                yield envelope.Id
+
+        return self._write(add)
+
+    def add_envelopes(self, envelopes: Iterable[models_v6.EnvelopeGetResponse]) -> int:
+        """Index envelopes returned by get_envelope, return how many."""
+
+        def add() -> Iterator[str]:
+            for envelope in envelopes:
+                if envelope.Id is None:
+                    continue
+                sender = envelope.SenderUserInformation
+                self._upsert(
+                    envelope.Id,
+                    name=envelope.Name,
+                    status=envelope.EnvelopeStatus,
+                    bulk_parent_id=envelope.EnvelopeBulkParentId,
+                    sent_date=(
+                        envelope.SentDate.isoformat() if envelope.SentDate else None
+                    ),
+                    sender_email=sender.Email if sender is not None else None,
+                )
+                for email, name in _get_recipients(envelope):
+                    self._add_recipient(envelope.Id, email, name)
+                yield envelope.Id
+
+        return self._write(add)
+
+    def add_bulk_children(
+        self,
+        children: Iterable[models_v6.EnvelopeBulkGetChildEnvelope],
+        bulk_parent_id: str | None = None,
+    ) -> int:
+        """Index the child envelopes of a bulk envelope, return how many."""
+
+        def add() -> Iterator[str]:
+            for child in children:
+                if child.EnvelopeId is None:
+                    continue
+                self._upsert(
+                    child.EnvelopeId,
+                    status=child.Status,
+                    bulk_parent_id=bulk_parent_id,
+                    sent_date=child.SentDate.isoformat() if child.SentDate else None,
+                )
+                if child.Email:
+                    self._add_recipient(child.EnvelopeId, child.Email)
+                yield child.EnvelopeId
+
+        return self._write(add)
+
+    def update_status(self, envelope_id: str, status: str) -> None:
+        """Record the status of an envelope, e.g. received by a callback."""
+        with self._lock, self.connection:
+            self._upsert(envelope_id, status=status)
+
+    def remove(self, envelope_id: str) -> None:
+        with self._lock, self.connection:
+            row = self.connection.execute(
+                "SELECT rowid FROM envelopes WHERE id = ?", (envelope_id,)
+            ).fetchone()
+            if row is None:
+                return
+            self.connection.execute(
+                "DELETE FROM envelopes_text WHERE rowid = ?", (row[0],)
+            )
+            for table, column in (
+                ("envelopes", "id"),
+                ("recipients", "envelope_id"),
+                ("metadata", "envelope_id"),
+            ):
+                self.connection.execute(
+                    f"DELETE FROM {table} WHERE {column} = ?", (envelope_id,)
+                )
+
+    def get(self, envelope_id: str) -> IndexedEnvelope | None:
+        with self._lock:
+            row = self.connection.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM envelopes WHERE id = ?",
+                (envelope_id,),
+            ).fetchone()
+        return IndexedEnvelope(*row) if row is not None else None
+
+    def get_recipients(self, envelope_id: str) -> list[str]:
+        with self._lock:
+            return [
+                email
+                for (email,) in self.connection.execute(
+                    "SELECT email FROM recipients WHERE envelope_id = ?"
+                    " ORDER BY email",
+                    (envelope_id,),
+                )
+            ]
+
+    def query(
+        self,
+        text: str | None = None,
+        recipient_email: str | None = None,
+        status: str | None = None,
+        metadata: dict[str, str] | None = None,
+        bulk_parent_id: str | None = None,
+        limit: int | None = 100,
+    ) -> list[IndexedEnvelope]:
+        """
+        Return the envelopes matching every filter given, most recently updated first.
+
+        :param text: words all found, as prefixes, in the name, MetaData,
+            recipients or sender
+        :param metadata: values of MetaData keys
+        """
+        conditions = []
+        parameters: list[Any] = []
+        if text:
+            if self.has_fts:
+                conditions.append(
+                    "rowid IN (SELECT rowid FROM envelopes_text"
+                    " WHERE envelopes_text MATCH ?)"
+                )
+                parameters.append(_quote(text))
+            else:
+                for word in text.split():
+                    conditions.append(
+                        "rowid IN (SELECT rowid FROM envelopes_text WHERE"
+                        " (coalesce(name, '') || ' ' || coalesce(metadata, '')"
+                        " || ' ' || coalesce(recipients, '') || ' '"
+                        " || coalesce(sender, '')) LIKE ?)"
+                    )
+                    parameters.append(f"%{word}%")
+        if recipient_email:
+            conditions.append(
+                "id IN (SELECT envelope_id FROM recipients WHERE email = ?)"
+            )
+            parameters.append(recipient_email.lower())
+        if status:
+            conditions.append("status = ?")
+            parameters.append(status)
+        for key, value in (metadata or {}).items():
+            conditions.append(
+                "id IN (SELECT envelope_id FROM metadata WHERE key = ? AND value = ?)"
+            )
+            parameters.extend((key, value))
+        if bulk_parent_id:
+            conditions.append("bulk_parent_id = ?")
+            parameters.append(bulk_parent_id)
+
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM envelopes"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY updated_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        with self._lock:
+            return [
+                IndexedEnvelope(*row)
+                for row in self.connection.execute(sql, parameters)
+            ]
+
+    def rebuild_text(self) -> None:
+        """Rebuild the text index from the indexed envelopes."""
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM envelopes_text")
+            envelope_ids = [
+                envelope_id
+                for (envelope_id,) in self.connection.execute(
+                    "SELECT id FROM envelopes"
+                )
+            ]
+            self._update_text(envelope_ids)
+
+    def rebuild(
+        self,
+        client: ESignAnyWhereClient,
+        start_date: datetime,
+        end_date: datetime,
+        window_days: int = 7,
+        statuses: Iterable[str | None] = (None,),
+    ) -> int:
+        """
+        Replace the index with the envelopes sent between the dates.
+
+        The envelopes are found first with one find_envelope query per
+        window of ``window_days`` and status (None for any), without
+        blocking the index: if a query fails, the previous index is kept.
+        They are then loaded in a staging table and swapped in, in one
+        transaction: the envelopes not found anymore are removed, the others
+        are updated and keep their recipients, sender and sending date,
+        which find_envelope does not return. The writes of ``write_after_rebuild`` (those of
+        IndexMiddleware) made meanwhile are applied after it.
+
+        :return: the number of envelopes indexed
+        :raises RuntimeError: if a rebuild is already running
+        """
+        statuses = list(statuses)
+        with self._lock:
+            if self._deferred is not None:
+                raise RuntimeError("The envelope index is already being rebuilt")
+            self._deferred = []
+        try:
+            envelopes: dict[str, models_v6.EnvelopeFindEnvelope] = {}
+            end = end_date
+            while end > start_date:
+                start = max(end - timedelta(days=window_days), start_date)
+                for status in statuses:
+                    response = client.find_envelope(
+                        models_v6.EnvelopeFindRequest.model_validate(
+                            {"StartDate": start, "EndDate": end, "Status": status}
+                        )
+                    )
+                    for envelope in response.Envelopes or []:
+                        if envelope.Id is not None:
+                            envelopes[envelope.Id] = envelope
+                end = start
+            self._swap(envelopes.values())
+        finally:
+            with self._lock:
+                deferred, self._deferred = self._deferred, None
+                for write in deferred:
+                    try:
+                        write()
+                    except Exception as e:
+                        logger.warning("Indexing after the rebuild failed: %r", e)
+        return len(envelopes)
+
+    def _swap(self, envelopes: Iterable[models_v6.EnvelopeFindEnvelope]) -> None:
+        with self._lock:
+            with self.connection:
+                self.connection.execute("DELETE FROM rebuilt_envelopes")
+                self.connection.executemany(
+                    "INSERT INTO rebuilt_envelopes VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            envelope.Id,
+                            envelope.Name,
+                            envelope.Status,
+                            envelope.MetaData,
+                            envelope.EnvelopeBulkParentId,
+                        )
+                        for envelope in envelopes
+                        if envelope.Id is not None
+                    ],
+                )
+            with self.connection:
+                self.connection.execute(
+                    "DELETE FROM envelopes_text WHERE rowid IN (SELECT rowid"
+                    " FROM envelopes WHERE id NOT IN (SELECT id FROM rebuilt_envelopes))"
+                )
+                for table, column in (
+                    ("envelopes", "id"),
+                    ("recipients", "envelope_id"),
+                    ("metadata", "envelope_id"),
+                ):
+                    self.connection.execute(
+                        f"DELETE FROM {table} WHERE {column} NOT IN"
+                        " (SELECT id FROM rebuilt_envelopes)"
+                    )
+                # WHERE true tells the ON CONFLICT of the upsert from a join
+                self.connection.execute(
+                    "INSERT INTO envelopes"
+                    " (id, name, status, metadata, bulk_parent_id, updated_at)"
+                    " SELECT id, name, status, metadata, bulk_parent_id, ?"
+                    " FROM rebuilt_envelopes WHERE true"
+                    " ON CONFLICT (id) DO UPDATE SET"
+                    " name = coalesce(excluded.name, name),"
+                    " status = coalesce(excluded.status, status),"
+                    " metadata = coalesce(excluded.metadata, metadata),"
+                    " bulk_parent_id = coalesce(excluded.bulk_parent_id, bulk_parent_id),"
+                    " updated_at = excluded.updated_at",
+                    (self.clock(),),
+                )
+                self.connection.execute("DELETE FROM metadata")
+                envelope_ids = []
+                for envelope_id, metadata in self.connection.execute(
+                    "SELECT id, metadata FROM envelopes"
+                ).fetchall():
+                    envelope_ids.append(envelope_id)
+                    if metadata is not None:
+                        self.connection.executemany(
+                            "INSERT INTO metadata VALUES (?, ?, ?)",
+                            [
+                                (envelope_id, key, value)
+                                for key, value in self.metadata_parser(metadata).items()
+                            ],
+                        )
+                self._update_text(envelope_ids)
+                self.connection.execute("DELETE FROM rebuilt_envelopes")
+
+
+class IndexMiddleware(Middleware):
+    """
+    Add the envelopes returned by the client calls to an EnvelopeIndex.
+
+    Results of find_envelope, get_envelope (v6) and get_bulk_envelope are
+    indexed; a failure to index is logged and never fails the call. While
+    the index is being rebuilt they are indexed once it has been replaced.
+
+        client.add_middleware(IndexMiddleware(EnvelopeIndex("envelopes.db")))
+    """
+
+    def __init__(self, index: EnvelopeIndex) -> None:
+        self.index = index
+
+    def __call__(self, call: ClientCall, call_next: Handler) -> Any:
+        result = call_next(call)
+        if isinstance(result, models_v6.EnvelopeFindResponse):
+            envelopes = result.Envelopes or []
+
+            def write() -> None:
+                self.index.add_find_envelopes(envelopes)
+
+        elif isinstance(result, models_v6.EnvelopeGetResponse):
+
+            def write() -> None:
+                self.index.add_envelopes([result])
+
+        elif isinstance(result, models_v6.EnvelopeBulkGetResponse):
+            # get_bulk_envelope URLs end with the bulk envelope id
+            bulk_parent_id = call.service_url.rsplit("/", 1)[-1]
+
+            def write() -> None:
+                self.index.add_bulk_children(result.Children or [], bulk_parent_id)
+
+        else:
+            return result
+        try:
+            self.index.write_after_rebuild(write)
+        except Exception as e:
+            logger.warning("Indexing the result of %s failed: %r", call.endpoint, e)
+        return result
@@ -0,0 +1,159 @@
+from collections.abc import Iterable
+from typing import Any, cast
+
+from pydantic import BaseModel
+
+from .models import models_v6
+
+Path = tuple[str | int, ...]
+
+# Collections of form fields -> (attribute naming the field, attribute of its value)
+FORM_FIELDS = {
+    "TextBoxes": ("ElementId", "Value"),
+    "CheckBoxes": ("ElementId", "IsChecked"),
+    "ComboBoxes": ("ElementId", "Value"),
+    "RadioButtons": ("GroupName", "SelectedItem"),
+    "ListBoxes": ("ElementId", "PreSelectedItems"),
+}
+
+
+def _get(node: Any, step: str | int) -> Any:
+    return node[step] if isinstance(step, int) else getattr(node, step)
+
+
+class _Writer:
+    """
+    Copy on write of a validated model tree.
+
+    Only the nodes on the path of a changed value are copied, every other
+    subtree is shared with the original tree.
+    """
+
+    def __init__(self, root: BaseModel) -> None:
+        self.root = root.model_copy()
+        self._copies: dict[int, Any] = {id(root): self.root}
+
+    def _copy(self, node: Any) -> Any:
+        copy = self._copies.get(id(node))
+        if copy is None:
+            copy = list(node) if isinstance(node, list) else node.model_copy()
+            self._copies[id(node)] = copy
+        return copy
+
+    def set(self, path: Path, field: str, value: Any) -> None:
+        node: Any = self.root
+        for step in path:
+            child = self._copy(_get(node, step))
+            if isinstance(step, int):
+                node[step] = child
+            else:
+                node.__dict__[step] = child
+            node = child
+        # Only the new value is validated, against the field it replaces
+        type(node).__pydantic_validator__.validate_assignment(node, field, value)
+
+
+class EnvelopeTemplate:
+    """
+    A validated models_v6.EnvelopeSendRequest instantiated for many recipients.
+
+    The skeleton is validated once. Its substitution slots are the contact
+    information of each activity with a recipient, the FileId of each
+    document, the form fields (by ElementId, or GroupName for radio
+    buttons), the envelope Name and its MetaData. ``instantiate`` copies
+    only the nodes holding substituted values and validates those values
+    alone, so the requests it returns share every other subtree with the
+    skeleton and must not be modified in place.
+
+        template = EnvelopeTemplate(skeleton)
+        request = template.instantiate(
+            recipients=[{"Email": "mario.rossi@example.com"}],
+            documents=[file_id],
+            field_values={"iban": "IT60X0542811101000000123456"},
+        )
+    """
+
+    def __init__(self, skeleton: models_v6.EnvelopeSendRequest | dict[str, Any]):
+        if not isinstance(skeleton, models_v6.EnvelopeSendRequest):
+            skeleton = models_v6.EnvelopeSendRequest(**skeleton)
+        self.skeleton = skeleton
+        self.recipient_paths: list[Path] = []
+        self.field_paths: dict[str, tuple[Path, str]] = {}
+
+        for index, activity in enumerate(skeleton.Activities):
+            action = activity.Action
+            if action is None:
+                continue
+            for name in type(action).model_fields:
+                sub_action = getattr(action, name)
+                if sub_action is None:
+                    continue
+                path = ("Activities", index, "Action", name)
+                if getattr(sub_action, "RecipientConfiguration", None) is not None:
+                    self.recipient_paths.append(
+                        path + ("RecipientConfiguration", "ContactInformation")
+                    )
+                elements = getattr(sub_action, "Elements", None)
+                if elements is not None:
+                    self._add_fields(elements, path + ("Elements",))
+        if skeleton.UnassignedElements is not None:
+            self._add_fields(skeleton.UnassignedElements, ("UnassignedElements",))
+
+    def _add_fields(self, elements: BaseModel, path: Path) -> None:
+        for collection, (key, value_field) in FORM_FIELDS.items():
+            for index, field in enumerate(getattr(elements, collection, None) or []):
+                name = getattr(field, key)
+                if name is not None:
+                    self.field_paths[name] = (path + (collection, index), value_field)
+
+    def instantiate(
+        self,
+        recipients: Iterable[dict[str, Any] | None] = (),
+        documents: Iterable[str | None] = (),
+        field_values: dict[str, Any] | None = None,
+        name: str | None = None,
+        metadata: str | None = None,
+    ) -> models_v6.EnvelopeSendRequest:
+        """
+        Return the skeleton with the given values substituted.
+
+        :param recipients: contact information fields (Email, GivenName, ...)
+            for each recipient slot in order, None keeps the skeleton one
+        :param documents: FileId of each document in order, None keeps it
+        :param field_values: form field values by ElementId or GroupName
+        :raises ValueError: for more values than slots or an unknown field
+        :raises pydantic.ValidationError: for an invalid value
+        """
+        writer = _Writer(self.skeleton)
+        recipients = list(recipients)
+        if len(recipients) > len(self.recipient_paths):
+            raise ValueError(
+                f"{len(recipients)} recipients given, the template has"
+                f" {len(self.recipient_paths)} recipient slots"
+            )
+        for path, contact in zip(self.recipient_paths, recipients):
+            for field, value in (contact or {}).items():
+                writer.set(path, field, value)
+
+        documents = list(documents)
+        if len(documents) > len(self.skeleton.Documents):
+            raise ValueError(
+                f"{len(documents)} documents given, the template has"
+                f" {len(self.skeleton.Documents)}"
+            )
+        for index, file_id in enumerate(documents):
+            if file_id is not None:
+                writer.set(("Documents", index), "FileId", file_id)
+
+        for element_id, value in (field_values or {}).items():
+            try:
+                path, value_field = self.field_paths[element_id]
+            except KeyError:
+                raise ValueError(f"Unknown form field {element_id!r}") from None
+            writer.set(path, value_field, value)
+
+        if name is not None:
+            writer.set((), "Name", name)
+        if metadata is not None:
+            writer.set((), "MetaData", metadata)
+        return cast(models_v6.EnvelopeSendRequest, writer.root)
@@ -1,31 +1,74 @@
-import inspect
 import logging
+import threading
 from io import BufferedReader
 from typing import Any
 
 import requests
 
 from . import exceptions
+from .metrics import MetricsSink
+from .middleware import ClientCall, Middleware, build_chain
 from .models import models_v5, models_v6
+from .payload_logging import PayloadLogConfig, PayloadLogger
 
 logger = logging.getLogger(__name__)
 
 
 class ESignAnyWhereClient:
-    """Base class client for eSignAnyWhere V6."""
+    """
+    Base class client for eSignAnyWhere V6.
 
-    def __init__(self, api_token, api_domain=None, is_test_env=True):
+    A client can be shared by many threads, also on free-threaded Python:
+    calls keep their state in their own ClientCall and the shared state of
+    the client, its sink and middlewares is either immutable or locked.
+    """
+
+    def __init__(
+        self,
+        api_token,
+        api_domain=None,
+        is_test_env=True,
+        metrics_sink: MetricsSink | None = None,
+        middlewares: list[Middleware] | None = None,
+        payload_log_config: PayloadLogConfig | None = None,
+        session: requests.Session | None = None,
+    ):
         """
         ESignAnyWhereClient.
 
         :param api_token: Token of the organization
         :param api_uri: Esign uri to append for each api
+        :param metrics_sink: metrics.MetricsSink receiving per endpoint metrics
+        :param middlewares: middleware.Middleware wrapped around each call, outermost first
+        :param payload_log_config: payload_logging.PayloadLogConfig for logged payloads
+        :param session: requests.Session sending the requests, it can be shared
+            by several clients to reuse its connections
         """
         self.api_token = api_token
         self.api_domain = api_domain or self._get_api_domain(is_test_env=is_test_env)
         self.api_uri = f"{self.api_domain}/Api/"
+        self.metrics = metrics_sink or MetricsSink()
+        self.payload_logger = PayloadLogger(logger, payload_log_config)
+        self.middlewares = list(middlewares or [])
+        self.session = session
+        self._middlewares_lock = threading.Lock()
+        self._chain = build_chain(self.middlewares, self._dispatch)
+
+    def add_middleware(self, middleware: Middleware, index: int | None = None):
+        """
+        Add a middleware to the chain.
 
-    def _get_api_domain(self, is_test_env=True):
+        :param middleware: middleware.Middleware
+        :param index: position in the chain, by default it becomes the innermost
+        """
+        with self._middlewares_lock:
+            middlewares = list(self.middlewares)
+            middlewares.insert(len(middlewares) if index is None else index, middleware)
+            self._chain = build_chain(middlewares, self._dispatch)
+            self.middlewares = middlewares
+
+    @staticmethod
+    def _get_api_domain(is_test_env=True):
         if is_test_env:
             return "https://demo.esignanywhere.net"
         else:
@@ -55,7 +98,10 @@ class ESignAnyWhereClient:
                 response=response,
             )
         else:
-            raise exceptions.ESawErrorResponse(
+            error_class = exceptions.get_error_class(
+                response.status_code, exceptions.get_response_error_id(response)
+            )
+            raise error_class(
                 status_code=response.status_code,
                 method_name=method_name,
                 service_url=service_url,
@@ -63,6 +109,127 @@ class ESignAnyWhereClient:
                 response=response,
             )
 
+    def _serialize_request(self, request_model: Any) -> tuple[Any, Any, str]:
+        """
+        Return the request data, model and body argument of a request.
+
+        Bytes are JSON already serialized (and validated) by the caller, e.g.
+        by builders.ProcessPoolEnvelopeBuilder or fragments.dumps, and are
+        sent without going through pydantic again. Models are sent as their
+        dict, which is what the middlewares see as request data.
+        """
+        if isinstance(request_model, bytes):
+            return request_model, None, "data"
+        return request_model.model_dump(mode="json"), request_model, "json"
+
+    def _call(
+        self,
+        method_name: str,
+        version: str,
+        http_method: str,
+        service_url: str,
+        request_data: Any = None,
+        request_model: Any = None,
+        body: str = "json",
+        is_json: bool = True,
+        response_model: Any = None,
+        response_type: str = "model",
+        expected_keys: tuple[str, ...] = (),
+        log_level: int = logging.DEBUG,
+    ):
+        """
+        Perform a request against eSignAnyWhere through the middleware chain.
+
+        :param method_name: name of the client method, used as endpoint name
+        :param request_model: pydantic model request_data was serialized from
+        :param body: requests argument carrying request_data (json, data or files)
+        :param response_type: one of model, json, text, content or empty
+        :param expected_keys: keys that must be in the response data
+        :param log_level: level used to log the response
+        """
+        return self._chain(
+            ClientCall(
+                endpoint=method_name,
+                version=version,
+                http_method=http_method,
+                service_url=service_url,
+                request_model=request_model,
+                request_data=request_data,
+                headers=self._get_request_headers(is_json=is_json),
+                body=body,
+                response_model=response_model,
+                response_type=response_type,
+                expected_keys=expected_keys,
+                log_level=log_level,
+            )
+        )
+
+    def _dispatch(self, call: ClientCall):
+        """Send the call to eSignAnyWhere and parse its response."""
+        recorder = self.metrics.start_call(call.endpoint, call.version)
+        try:
+            response = (self.session or requests).request(
+                call.http_method,
+                url=call.service_url,
+                headers=call.headers,
+                stream=recorder.enabled,
+                **{call.body: call.request_data},
+            )
+        except requests.RequestException:
+            recorder.finish(None, 0, 0)
+            raise
+        call.response = response
+        if recorder.enabled:
+            recorder.split("wait", response.elapsed.total_seconds(), "prepare")
+            response_size = len(response.content or b"")
+            recorder.phase("download")
+
+        service_url, log_level = call.service_url, call.log_level
+        try:
+            if response.status_code != 200:
+                self._handle_response_errors(
+                    service_url=service_url,
+                    method_name=call.endpoint,
+                    request_data=call.request_data,
+                    response=response,
+                )
+            if call.response_type == "empty":
+                self.payload_logger.log_status(
+                    log_level, service_url, response.status_code
+                )
+                return {}
+            if call.response_type == "content":
+                self.payload_logger.log_response(log_level, service_url)
+                return response.content
+            if call.response_type == "text":
+                self.payload_logger.log_response(log_level, service_url, response.text)
+                return response.text
+
+            response_data = response.json()
+            recorder.phase("decode")
+            self.payload_logger.log_response(log_level, service_url, response_data)
+            if any(key not in response_data for key in call.expected_keys):
+                raise exceptions.ESawUnexpectedResponse(
+                    method_name=call.endpoint,
+                    status_code=response.status_code,
+                    service_url=service_url,
+                    request_data=call.request_data,
+                    response=response,
+                )
+            if call.response_type == "json":
+                return response_data
+            result = call.response_model(**response_data)
+            recorder.phase("validate")
+            return result
+        finally:
+            if recorder.enabled:
+                body = response.request.body
+                recorder.finish(
+                    response.status_code,
+                    len(body) if isinstance(body, bytes | str) else 0,
+                    response_size,
+                )
+
     def get_version(self, version="v4"):
         """
         Return the version of eSignAnyWhere.
@@ -75,15 +242,18 @@ class ESignAnyWhereClient:
             }
         """
         service_url = self.api_uri + version + "/version"
-        request_data = {}
-        response = requests.get(
-            url=service_url, data=request_data, headers=self._get_request_headers()
-        )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url}: {response.json()}"
+        try:
+            return self._call(
+                "get_version",
+                version,
+                "GET",
+                service_url,
+                request_data={},
+                body="data",
+                response_type="json",
             )
-            return response.json()
+        except exceptions.BaseAPIESawErrorResponse:
+            return None
 
     def test_authorization(self, version="v4"):
         """
@@ -93,23 +263,15 @@ class ESignAnyWhereClient:
         :return: HTTP_200_OK
         """
         service_url = self.api_uri + version + "/authorization"
-        response = requests.get(
-            url=service_url, data={}, headers=self._get_request_headers()
+        return self._call(
+            "test_authorization",
+            version,
+            "GET",
+            service_url,
+            request_data={},
+            body="data",
+            response_type="text",
         )
-        if response.status_code == 200:
-            logger.debug(f"Response from service_url : {service_url}: {response.text}")
-            return response.text
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data={},
-                response=response,
-            )
 
     def upload_file(
         self,
@@ -138,30 +300,18 @@ class ESignAnyWhereClient:
 
                 request_data = {"File": resource_to_upload}
 
-            response = requests.post(
-                url=service_url,  # https://demo.esignanywhere.net
-                files=request_data,
-                headers=self._get_request_headers(is_json=False),
+            return self._call(
+                "upload_file",
+                version,
+                "POST",
+                service_url,  # https://demo.esignanywhere.net
+                request_data=request_data,
+                body="files",
+                is_json=False,
+                response_model=models_v6.FileUploadResponse,
+                log_level=logging.INFO,
             )
 
-            if response.status_code == 200:
-                logger.info(
-                    f"Response from service_url : {service_url}: {response.json()}"
-                )
-                response_data = response.json()
-                return models_v6.FileUploadResponse(**response_data)
-            else:
-                self._handle_response_errors(
-                    service_url=service_url,
-                    method_name=(
-                        inspect.currentframe().f_code.co_name  # type: ignore
-                        if inspect.currentframe() is not None
-                        else ""
-                    ),
-                    response=response,
-                    request_data=request_data,
-                )
-
         finally:
             try:
                 if file_content:
@@ -173,13 +323,13 @@ class ESignAnyWhereClient:
 
     def create_and_send_envelope(
         self,
-        envelope_data: models_v6.EnvelopeSendRequest,
+        envelope_data: models_v6.EnvelopeSendRequest | bytes,
         version="v6",
     ):
         """
         Create and directly sends a new envelope.
 
-        :param models_v6.EnvelopeSendRequest
+        :param models_v6.EnvelopeSendRequest, or its JSON serialization sent as is
         :param version: string for api version
         :return: models_v6.EnvelopeSendResponse
         """
@@ -190,47 +340,32 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = envelope_data.model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        request_data, request_model, body = self._serialize_request(envelope_data)
+        self.payload_logger.log_request(
+            logging.DEBUG, "create_and_send_envelope", request_data
+        )
+        return self._call(
+            "create_and_send_envelope",
+            version,
+            "POST",
+            service_url,
+            request_data=request_data,
+            request_model=request_model,
+            body=body,
+            response_model=models_v6.EnvelopeSendResponse,
+            expected_keys=("EnvelopeId",),
+            log_level=logging.INFO,
         )
-        logger.debug(f"create_and_send_envelope Request : {request_data}")
-        if response.status_code == 200:
-            logger.info(f"Response from service_url : {service_url}: {response.json()}")
-            if "EnvelopeId" not in response.json().keys():
-                raise exceptions.ESawUnexpectedResponse(
-                    method_name=(
-                        inspect.currentframe().f_code.co_name  # type: ignore
-                        if inspect.currentframe()
-                        else ""
-                    ),
-                    status_code=response.status_code,
-                    service_url=service_url,
-                    request_data=request_data,
-                    response=response,
-                )
-            return models_v6.EnvelopeSendResponse(**response.json())
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                response=response,
-                request_data=request_data,
-            )
 
     def create_and_send_bulk_envelope(
         self,
-        envelope_data: models_v6.EnvelopeBulkSendRequest,
+        envelope_data: models_v6.EnvelopeBulkSendRequest | bytes,
         version="v6",
     ):
         """
         Create and directly sends a new envelope.
 
-        :param models_v6.EnvelopeBulkSendRequest
+        :param models_v6.EnvelopeBulkSendRequest, or its JSON serialization sent as is
         :param version: string for api version
         :return: models_v6.EnvelopeBulkSendResponse
         """
@@ -241,27 +376,190 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = envelope_data.model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        request_data, request_model, body = self._serialize_request(envelope_data)
+        self.payload_logger.log_request(
+            logging.DEBUG, "create_and_send_bulk_envelope", request_data
         )
-        logger.debug(f"create_and_send_envelope Request : {request_data}")
-        if response.status_code == 200:
-            logger.info(f"Response from service_url : {service_url}: {response.json()}")
-            response_data = response.json()
-            return models_v6.EnvelopeBulkSendResponse(**response_data)
+        return self._call(
+            "create_and_send_bulk_envelope",
+            version,
+            "POST",
+            service_url,
+            request_data=request_data,
+            request_model=request_model,
+            body=body,
+            response_model=models_v6.EnvelopeBulkSendResponse,
+            log_level=logging.INFO,
+        )
+
+    def get_bulk_envelope(self, envelope_bulk_id: str, version="v6"):
+        """
+        Return the status and the child envelopes of a bulk envelope.
+
+        :param envelope_bulk_id: str
+        :param version: string for api version
+        :return: models_v6.EnvelopeBulkGetResponse
+        """
+        if version == "v6":
+            service_url = f"{self.api_uri}v6/envelopebulk/{envelope_bulk_id}"
         else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                response=response,
-                request_data=request_data,
+            raise exceptions.ESawInvalidVersionError(
+                version=version, supported_versions=["v6"]
             )
 
+        return self._call(
+            "get_bulk_envelope",
+            version,
+            "GET",
+            service_url,
+            request_data={},
+            body="data",
+            response_model=models_v6.EnvelopeBulkGetResponse,
+        )
+
+    def find_bulk_envelope(
+        self, descriptor: models_v6.EnvelopeBulkFindRequest, version="v6"
+    ):
+        """
+        Return the found bulk envelopes for the given descriptor.
+
+        :param descriptor: models_v6.EnvelopeBulkFindRequest
+        :param version: string for api version
+        :return: models_v6.EnvelopeBulkFindResponse
+        """
+        if version == "v6":
+            service_url = f"{self.api_uri}v6/envelopebulk/find"
+        else:
+            raise exceptions.ESawInvalidVersionError(
+                version=version, supported_versions=["v6"]
+            )
+
+        return self._call(
+            "find_bulk_envelope",
+            version,
+            "POST",
+            service_url,
+            request_data=descriptor.model_dump(mode="json"),
+            request_model=descriptor,
+            response_model=models_v6.EnvelopeBulkFindResponse,
+        )
+
+    def cancel_bulk_envelope(
+        self,
+        cancel_request: models_v6.EnvelopeBulkCancelRequest,
+        version="v6",
+    ):
+        """
+        Cancel every child envelope of a bulk envelope.
+
+        :param cancel_request: models_v6.EnvelopeBulkCancelRequest
+        :param version: string for api version
+        :return:
+        """
+        if version == "v6":
+            service_url = f"{self.api_uri}v6/envelopebulk/cancel"
+        else:
+            raise exceptions.ESawInvalidVersionError(
+                version=version, supported_versions=["v6"]
+            )
+
+        return self._call(
+            "cancel_bulk_envelope",
+            version,
+            "POST",
+            service_url,
+            request_data=cancel_request.model_dump(mode="json"),
+            request_model=cancel_request,
+            response_type="empty",
+            log_level=logging.INFO,
+        )
+
+    def delete_bulk_envelope(self, envelope_bulk_id: str, version="v6"):
+        """
+        Delete a bulk envelope and its child envelopes.
+
+        :param envelope_bulk_id: str
+        :param version: string for api version
+        :return:
+        """
+        if version == "v6":
+            service_url = f"{self.api_uri}v6/envelopebulk/delete"
+        else:
+            raise exceptions.ESawInvalidVersionError(
+                version=version, supported_versions=["v6"]
+            )
+
+        delete_request = models_v6.EnvelopeBulkDeleteRequest(
+            EnvelopeBulkId=envelope_bulk_id
+        )
+        self._call(
+            "delete_bulk_envelope",
+            version,
+            "POST",
+            service_url,
+            request_data=delete_request.model_dump(mode="json"),
+            request_model=delete_request,
+            response_type="empty",
+        )
+
+    def remind_bulk_envelope(
+        self,
+        remind_request: models_v6.EnvelopeBulkRemindRequest,
+        version="v6",
+    ):
+        """
+        Send a reminder email to the awaited recipients of every child envelope.
+
+        :param remind_request: models_v6.EnvelopeBulkRemindRequest
+        :param version: string for api version
+        :return models_v6.EnvelopeBulkRemindResponse
+        """
+        if version == "v6":
+            service_url = f"{self.api_uri}v6/envelopebulk/remind"
+        else:
+            raise exceptions.ESawInvalidVersionError(
+                version=version, supported_versions=["v6"]
+            )
+
+        return self._call(
+            "remind_bulk_envelope",
+            version,
+            "POST",
+            service_url,
+            request_data=remind_request.model_dump(mode="json"),
+            request_model=remind_request,
+            response_model=models_v6.EnvelopeBulkRemindResponse,
+        )
+
+    def restart_expired_bulk_envelope(
+        self,
+        restart_expired_request: models_v6.EnvelopeBulkRestartExpiredRequest,
+        version="v6",
+    ):
+        """
+        Restart the expired child envelopes of a bulk envelope.
+
+        :param restart_expired_request: models_v6.EnvelopeBulkRestartExpiredRequest
+        :param version: string for api version
+        :return:
+        """
+        if version == "v6":
+            service_url = f"{self.api_uri}v6/envelopebulk/restartexpired"
+        else:
+            raise exceptions.ESawInvalidVersionError(
+                version=version, supported_versions=["v6"]
+            )
+
+        return self._call(
+            "restart_expired_bulk_envelope",
+            version,
+            "POST",
+            service_url,
+            request_data=restart_expired_request.model_dump(mode="json"),
+            request_model=restart_expired_request,
+            response_type="empty",
+        )
+
     def get_envelope(
         self,
         envelope_id: str,
@@ -274,38 +572,28 @@ class ESignAnyWhereClient:
         :param version: string for api version
         :return: models_v6.EnvelopeGetResponse for v6 or models_v5.EnvelopeStatus for v5
         """
+        response_model: type[models_v6.EnvelopeGetResponse | models_v5.EnvelopeStatus]
         if version == "v6":
             service_url = f"{self.api_uri}v6/envelope/{envelope_id}"
+            response_model = models_v6.EnvelopeGetResponse
         elif version == "v5":
             service_url = f"{self.api_uri}v5/envelope/{envelope_id}"
+            response_model = models_v5.EnvelopeStatus
         else:
             raise exceptions.ESawInvalidVersionError(
                 version=version, supported_versions=["v6", "v5"]
             )
 
-        request_data = {}  # type:ignore
-        response = requests.get(
-            url=service_url, data=request_data, headers=self._get_request_headers()
+        return self._call(
+            "get_envelope",
+            version,
+            "GET",
+            service_url,
+            request_data={},
+            body="data",
+            response_model=response_model,
+            log_level=logging.INFO,
         )
-        if response.status_code == 200:
-            logger.info(f"Response from service_url : {service_url}: {response.json()}")
-            response_data = response.json()
-            if version == "v5":
-                envelope_status = models_v5.EnvelopeStatus(**response_data)
-            else:
-                envelope_status = models_v6.EnvelopeGetResponse(**response_data)
-            return envelope_status
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                response=response,
-                request_data=request_data,
-            )
 
     def get_envelope_configuration(
         self,
@@ -326,28 +614,16 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = {}  # type:ignore
-        response = requests.get(
-            url=service_url, data=request_data, headers=self._get_request_headers()
+        return self._call(
+            "get_envelope_configuration",
+            version,
+            "GET",
+            service_url,
+            request_data={},
+            body="data",
+            response_model=models_v6.EnvelopeGetConfigurationResponse,
+            log_level=logging.INFO,
         )
-        if response.status_code == 200:
-            logger.info(f"Response from service_url : {service_url}: {response.json()}")
-            response_data = response.json()
-            envelope_status = models_v6.EnvelopeGetConfigurationResponse(
-                **response_data
-            )
-            return envelope_status
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                response=response,
-                request_data=request_data,
-            )
 
     def get_envelope_files(
         self,
@@ -368,26 +644,16 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = {}  # type:ignore
-        response = requests.get(
-            url=service_url, data=request_data, headers=self._get_request_headers()
+        return self._call(
+            "get_envelope_files",
+            version,
+            "GET",
+            service_url,
+            request_data={},
+            body="data",
+            response_model=models_v6.EnvelopeGetFilesResponse,
+            log_level=logging.INFO,
         )
-        if response.status_code == 200:
-            logger.info(f"Response from service_url : {service_url}: {response.json()}")
-            response_data = response.json()
-            envelope_status = models_v6.EnvelopeGetFilesResponse(**response_data)
-            return envelope_status
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def get_envelope_viewer_links(
         self,
@@ -408,26 +674,16 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = {}  # type:ignore
-        response = requests.get(
-            url=service_url, data=request_data, headers=self._get_request_headers()
+        return self._call(
+            "get_envelope_viewer_links",
+            version,
+            "GET",
+            service_url,
+            request_data={},
+            body="data",
+            response_model=models_v6.EnvelopeGetViewerLinksResponse,
+            log_level=logging.INFO,
         )
-        if response.status_code == 200:
-            logger.info(f"Response from service_url : {service_url}: {response.json()}")
-            response_data = response.json()
-            envelope_status = models_v6.EnvelopeGetViewerLinksResponse(**response_data)
-            return envelope_status
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def get_envelope_history(
         self,
@@ -448,26 +704,16 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = {}  # type:ignore
-        response = requests.get(
-            url=service_url, data=request_data, headers=self._get_request_headers()
+        return self._call(
+            "get_envelope_history",
+            version,
+            "GET",
+            service_url,
+            request_data={},
+            body="data",
+            response_model=models_v6.EnvelopeGetHistoryResponse,
+            log_level=logging.INFO,
         )
-        if response.status_code == 200:
-            logger.info(f"Response from service_url : {service_url}: {response.json()}")
-            response_data = response.json()
-            envelope_status = models_v6.EnvelopeGetHistoryResponse(**response_data)
-            return envelope_status
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def get_envelope_elements(
         self,
@@ -488,26 +734,16 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = {}  # type:ignore
-        response = requests.get(
-            url=service_url, data=request_data, headers=self._get_request_headers()
+        return self._call(
+            "get_envelope_elements",
+            version,
+            "GET",
+            service_url,
+            request_data={},
+            body="data",
+            response_model=models_v6.EnvelopeGetElementsResponse,
+            log_level=logging.INFO,
         )
-        if response.status_code == 200:
-            logger.info(f"Response from service_url : {service_url}: {response.json()}")
-            response_data = response.json()
-            envelope_status = models_v6.EnvelopeGetElementsResponse(**response_data)
-            return envelope_status
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def cancel_envelope(
         self,
@@ -528,26 +764,16 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = cancel_request.model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        return self._call(
+            "cancel_envelope",
+            version,
+            "POST",
+            service_url,
+            request_data=cancel_request.model_dump(mode="json"),
+            request_model=cancel_request,
+            response_type="empty",
+            log_level=logging.INFO,
         )
-        if response.status_code == 200:
-            logger.info(
-                f"Response from service_url : {service_url} -> {response.status_code}"
-            )
-            return {}
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def delete_envelope(self, envelope_id: str, version="v6"):
         """
@@ -564,27 +790,16 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = models_v6.EnvelopeDeleteRequest(
-            EnvelopeId=envelope_id
-        ).model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        delete_request = models_v6.EnvelopeDeleteRequest(EnvelopeId=envelope_id)
+        self._call(
+            "delete_envelope",
+            version,
+            "POST",
+            service_url,
+            request_data=delete_request.model_dump(mode="json"),
+            request_model=delete_request,
+            response_type="empty",
         )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url} -> {response.status_code}"
-            )
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def download_completed_document(self, document_id: str, version="v6"):
         """
@@ -602,26 +817,17 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = {}  # type:ignore
-        response = requests.get(
-            url=service_url,
-            data=request_data,
-            headers=self._get_request_headers(is_json=False),
+        return self._call(
+            "download_completed_document",
+            version,
+            "GET",
+            service_url,
+            request_data={},
+            body="data",
+            is_json=False,
+            response_type="content",
+            log_level=logging.INFO,
         )
-        if response.status_code == 200:
-            logger.info(f"Response from service_url : {service_url}")
-            return response.content
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     # ======================================
     #  PAY ATTENTION!!! Below methods are draft and maybe not implemented
@@ -645,27 +851,15 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = draft_create_model.model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        return self._call(
+            "create_draft",
+            version,
+            "POST",
+            service_url,
+            request_data=draft_create_model.model_dump(mode="json"),
+            request_model=draft_create_model,
+            response_model=models_v6.DraftCreateResponse,
         )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url}: {response.json()}"
-            )
-            response_data = response.json()
-            return models_v6.DraftCreateResponse(**response_data)
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def create_draft_from_template(
         self,
@@ -686,27 +880,15 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = create_from_template_model.model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        return self._call(
+            "create_draft_from_template",
+            version,
+            "POST",
+            service_url,
+            request_data=create_from_template_model.model_dump(mode="json"),
+            request_model=create_from_template_model,
+            response_model=models_v6.TemplateCreateDraftResponse,
         )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url}: {response.json()}"
-            )
-            response_data = response.json()
-            return models_v6.TemplateCreateDraftResponse(**response_data)
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def find_envelope(self, descriptor: models_v6.EnvelopeFindRequest, version="v6"):
         """
@@ -723,27 +905,15 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = descriptor.model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        return self._call(
+            "find_envelope",
+            version,
+            "POST",
+            service_url,
+            request_data=descriptor.model_dump(mode="json"),
+            request_model=descriptor,
+            response_model=models_v6.EnvelopeFindResponse,
         )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url}: {response.json()}"
-            )
-            response_data = response.json()
-            return models_v6.EnvelopeFindResponse(**response_data)
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def prepare_file(self, prepare_model: models_v6.FilePrepareRequest, version="v6"):
         """
@@ -760,27 +930,15 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = prepare_model.model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        return self._call(
+            "prepare_file",
+            version,
+            "POST",
+            service_url,
+            request_data=prepare_model.model_dump(mode="json"),
+            request_model=prepare_model,
+            response_model=models_v6.FilePrepareResponse,
         )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url}: {response.json()}"
-            )
-            response_data = response.json()
-            return models_v6.FilePrepareResponse(**response_data)
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def restart_envelope_expiration_days(
         self,
@@ -801,26 +959,15 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = restart_expired_request.model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        return self._call(
+            "restart_envelope_expiration_days",
+            version,
+            "POST",
+            service_url,
+            request_data=restart_expired_request.model_dump(mode="json"),
+            request_model=restart_expired_request,
+            response_type="empty",
         )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url} -> {response.status_code}"
-            )
-            return {}
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def send_draft(
         self,
@@ -841,27 +988,15 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = send_from_template_model.model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        return self._call(
+            "send_draft",
+            version,
+            "POST",
+            service_url,
+            request_data=send_from_template_model.model_dump(mode="json"),
+            request_model=send_from_template_model,
+            response_model=models_v6.DraftSendResponse,
         )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url}: {response.json()}"
-            )
-            response_data = response.json()
-            return models_v6.DraftSendResponse(**response_data)
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def remind_envelope(
         self,
@@ -882,27 +1017,15 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = remind_request.model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        return self._call(
+            "remind_envelope",
+            version,
+            "POST",
+            service_url,
+            request_data=remind_request.model_dump(mode="json"),
+            request_model=remind_request,
+            response_model=models_v6.EnvelopeRemindResponse,
         )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url}: {response.json()}"
-            )
-            response_data = response.json()
-            return models_v6.EnvelopeRemindResponse(**response_data)
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def unlock_envelope(
         self, unlock_request: models_v6.EnvelopeUnlockRequest, version="v6"
@@ -921,26 +1044,16 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = unlock_request.json()
-        response = requests.get(
-            url=service_url, data=request_data, headers=self._get_request_headers()
+        return self._call(
+            "unlock_envelope",
+            version,
+            "GET",
+            service_url,
+            request_data=unlock_request.json(),
+            request_model=unlock_request,
+            body="data",
+            response_type="empty",
         )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url} -> {response.status_code}"
-            )
-            return {}
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def get_license(self, version="v6"):
         """
@@ -956,28 +1069,64 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = {}
-        response = requests.get(
-            url=service_url, data=request_data, headers=self._get_request_headers()
+        return self._call(
+            "get_license",
+            version,
+            "GET",
+            service_url,
+            request_data={},
+            body="data",
+            response_model=models_v6.LicenseGetResponse,
         )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url}: {response.json()}"
+
+    def get_sealing_certificates(self, version="v6"):
+        """
+        Return the sealing certificates available to the organization.
+
+        :param version: string for api version
+        :return models_v6.SealingCertificateGetAllResponse
+        """
+        if version == "v6":
+            service_url = f"{self.api_uri}v6/sealingcertificate"
+        else:
+            raise exceptions.ESawInvalidVersionError(
+                version=version, supported_versions=["v6"]
             )
-            response_data = response.json()
-            return models_v6.LicenseGetResponse(**response_data)
+
+        return self._call(
+            "get_sealing_certificates",
+            version,
+            "GET",
+            service_url,
+            request_data={},
+            body="data",
+            response_model=models_v6.SealingCertificateGetAllResponse,
+        )
+
+    def get_automatic_profiles(self, version="v6"):
+        """
+        Return the remote certificate profiles and signature plugins available for automatic signing.
+
+        :param version: string for api version
+        :return models_v6.AutomaticProfileGetAllResponse
+        """
+        if version == "v6":
+            service_url = f"{self.api_uri}v6/automaticprofile"
         else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
+            raise exceptions.ESawInvalidVersionError(
+                version=version, supported_versions=["v6"]
             )
 
+        return self._call(
+            "get_automatic_profiles",
+            version,
+            "GET",
+            service_url,
+            request_data={},
+            body="data",
+            response_model=models_v6.AutomaticProfileGetAllResponse,
+        )
+
     def remove_activity_from_envelope(
         self,
         activity_delete_request: models_v6.EnvelopeActivityDeleteRequest,
@@ -997,26 +1146,15 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = activity_delete_request.model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        return self._call(
+            "remove_activity_from_envelope",
+            version,
+            "POST",
+            service_url,
+            request_data=activity_delete_request.model_dump(mode="json"),
+            request_model=activity_delete_request,
+            response_type="empty",
         )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url} -> {response.status_code}"
-            )
-            return {}
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def replace_activity_from_envelope(
         self,
@@ -1037,26 +1175,15 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = activity_replace_request.model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        return self._call(
+            "replace_activity_from_envelope",
+            version,
+            "POST",
+            service_url,
+            request_data=activity_replace_request.model_dump(mode="json"),
+            request_model=activity_replace_request,
+            response_type="empty",
         )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url} -> {response.status_code}"
-            )
-            return {}
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def dispose_uploaded_file(
         self,
@@ -1077,26 +1204,15 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = delete_request.model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        return self._call(
+            "dispose_uploaded_file",
+            version,
+            "POST",
+            service_url,
+            request_data=delete_request.model_dump(mode="json"),
+            request_model=delete_request,
+            response_type="empty",
         )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url} -> {response.status_code}"
-            )
-            return {}
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def get_teams(self, version="v6"):
         """
@@ -1112,27 +1228,15 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = {}  # type:ignore
-        response = requests.get(
-            url=service_url, data=request_data, headers=self._get_request_headers()
+        return self._call(
+            "get_teams",
+            version,
+            "GET",
+            service_url,
+            request_data={},
+            body="data",
+            response_model=models_v6.TeamGetAllResponse,
         )
-        if response.status_code == 200:
-            logger.debug(
-                f"Response from service_url : {service_url}: {response.json()}"
-            )
-            response_data = response.json()
-            return models_v6.TeamGetAllResponse(**response_data)
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
 
     def replace_teams(self, teams: models_v6.TeamReplaceRequest, version="v6"):
         """
@@ -1149,20 +1253,12 @@ class ESignAnyWhereClient:
                 version=version, supported_versions=["v6"]
             )
 
-        request_data = teams.model_dump(mode="json")
-        response = requests.post(
-            url=service_url, json=request_data, headers=self._get_request_headers()
+        return self._call(
+            "replace_teams",
+            version,
+            "POST",
+            service_url,
+            request_data=teams.model_dump(mode="json"),
+            request_model=teams,
+            response_type="empty",
         )
-        if response.status_code == 200:
-            return {}
-        else:
-            self._handle_response_errors(
-                service_url=service_url,
-                method_name=(
-                    inspect.currentframe().f_code.co_name  # type: ignore
-                    if inspect.currentframe() is not None
-                    else ""
-                ),
-                request_data=request_data,
-                response=response,
-            )
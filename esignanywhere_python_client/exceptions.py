@@ -1,41 +1,198 @@
+import email.utils
+import json
+import time
+import weakref
 from typing import Any
 
 import requests
+import urllib3
+
+from .payload_logging import DEFAULT_REDACTED_KEYS, EMAIL_RE, REDACTED
+
+# Only this much of the response body is kept by the exceptions
+MAX_BODY_BYTES = 64 * 1024
+KEPT_HEADERS = ("content-type", "content-length", "date", "retry-after")
+KEPT_HEADER_PREFIXES = ("x-", "ratelimit")
+TRUNCATED = "... [truncated]"
+
+
+def _snapshot_headers(headers) -> dict[str, str]:
+    return {
+        key: value
+        for key, value in headers.items()
+        if key.lower() in KEPT_HEADERS or key.lower().startswith(KEPT_HEADER_PREFIXES)
+    }
+
+
+def _redact(value: Any, size: list[int]) -> Any:
+    # size holds the characters kept so far, the copy stops growing once it
+    # reaches MAX_BODY_BYTES
+    if hasattr(value, "read"):
+        # upload_file sends open files, which must not be kept nor pickled
+        return f"<file {getattr(value, 'name', '')}>"
+    if isinstance(value, dict):
+        redacted = {}
+        for key, item in value.items():
+            if size[0] >= MAX_BODY_BYTES:
+                redacted["..."] = TRUNCATED
+                break
+            size[0] += len(str(key))
+            if item is not None and DEFAULT_REDACTED_KEYS.search(str(key)):
+                redacted[key] = REDACTED
+            else:
+                redacted[key] = _redact(item, size)
+        return redacted
+    if isinstance(value, list | tuple):
+        items = []
+        for item in value:
+            if size[0] >= MAX_BODY_BYTES:
+                items.append(TRUNCATED)
+                break
+            items.append(_redact(item, size))
+        return items
+    if isinstance(value, str):
+        value = EMAIL_RE.sub(REDACTED, value[: max(MAX_BODY_BYTES - size[0], 0)])
+        size[0] += len(value)
+        return value
+    if isinstance(value, bytes | bytearray):
+        return f"<{len(value)} bytes>"
+    size[0] += 8
+    return value
+
+
+def _snapshot_request_data(request_data: Any) -> Any:
+    """Return a copy of request_data redacted like the logs and bounded in size."""
+    if isinstance(request_data, bytes | bytearray):
+        # JSON serialized by the caller or with the cached fragments
+        try:
+            request_data = json.loads(request_data)
+        except ValueError:
+            return f"<{len(request_data)} bytes>"
+    return _redact(request_data, [0])
+
+
+def _parse_retry_after(headers: dict[str, str]) -> float | None:
+    value = next(
+        (value for key, value in headers.items() if key.lower() == "retry-after"),
+        None,
+    )
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at - time.time(), 0.0)
+
+
+def _restore_error(cls, state):
+    error = cls.__new__(cls)
+    Exception.__init__(error)
+    error.__dict__.update(state)
+    return error
 
 
 class BaseAPIESawErrorResponse(Exception):
+    # Whether sending the same request again may succeed, and how long to
+    # wait before doing it when the server does not say otherwise.
+    retryable = False
+    default_backoff: float | None = None
+
     def __init__(
         self,
         status_code: int,
         service_url: str,
         method_name: str,
         request_data: dict[str, Any],
-        response: requests.Response,
+        response: requests.Response | None = None,
         *args,
         **kwargs,
     ) -> None:
-        """BaseAPIESawErrorResponse."""
+        """
+        BaseAPIESawErrorResponse.
+
+        Only a snapshot of the response is kept (a subset of the headers and
+        up to MAX_BODY_BYTES of the body), the response data is parsed on
+        first access. The request data is kept redacted as in the payload
+        logs and up to about MAX_BODY_BYTES characters.
+        """
         super().__init__(*args, **kwargs)
         self.status_code = status_code
         self.service_url = service_url
         self.method_name = method_name
-        self.response = response
-        self.request_data = request_data
-        self.response_headers = dict(response.headers)
+        self.request_data = _snapshot_request_data(request_data)
+        self.response_headers: dict[str, str] = {}
+        self.response_body = b""
+        self.response_encoding: str | None = None
+        self._response_ref = None
+        if response is not None:
+            self.response_headers = _snapshot_headers(response.headers)
+            try:
+                self.response_body = (response.content or b"")[:MAX_BODY_BYTES]
+                self.response_encoding = response.encoding
+            except Exception:
+                self.response_body = b""
+            self._response_ref = weakref.ref(response)
+
+    @property
+    def response(self) -> requests.Response | None:
+        """The original response, as long as something else keeps it alive."""
+        return self._response_ref() if self._response_ref is not None else None
+
+    @property
+    def response_data(self) -> Any:
         try:
-            self.response_data = response.json()
+            return self.__dict__["_response_data"]
+        except KeyError:
+            pass
+        try:
+            response_data = json.loads(self.response_body)
         except Exception:
             try:
-                self.response_data = (
-                    response.content.decode()
-                    if isinstance(response.content, bytes)
-                    else response.content
+                response_data = self.response_body.decode(
+                    self.response_encoding or "utf-8"
                 )
             except Exception:
-                try:
-                    self.response_data = response.text
-                except Exception:
-                    self.response_data = "Unable to get response data"
+                response_data = "Unable to get response data"
+        self.__dict__["_response_data"] = response_data
+        return response_data
+
+    @property
+    def error_response(self):
+        """Return the models_v6.ErrorResponse sent by eSignAnyWhere, if any."""
+        try:
+            return self.__dict__["_error_response"]
+        except KeyError:
+            pass
+        from .models.models_v6 import ErrorResponse
+
+        error_response = None
+        if isinstance(self.response_data, dict):
+            try:
+                error_response = ErrorResponse(**self.response_data)
+            except Exception:
+                pass
+        self.__dict__["_error_response"] = error_response
+        return error_response
+
+    @property
+    def error_id(self) -> str | None:
+        response_data = self.response_data
+        if isinstance(response_data, dict):
+            return response_data.get("ErrorId")
+        return None
+
+    @property
+    def suggested_backoff(self) -> float | None:
+        """Seconds to wait before retrying, None if the request must not be retried."""
+        if not self.retryable:
+            return None
+        retry_after = _parse_retry_after(self.response_headers)
+        return retry_after if retry_after is not None else self.default_backoff
 
     def __str__(self):
         return f"Status Code: {self.status_code}"
@@ -44,16 +201,13 @@ class BaseAPIESawErrorResponse(Exception):
         return f"Status Code: {self.status_code}"
 
     def __reduce__(self):
-        return (
-            self.__class__,
-            (
-                self.status_code,
-                self.service_url,
-                self.method_name,
-                self.request_data,
-                self.response,
-            ),
-        )
+        state = {
+            key: value
+            for key, value in self.__dict__.items()
+            if key not in ("_response_ref", "_response_data", "_error_response")
+        }
+        state["_response_ref"] = None
+        return (_restore_error, (self.__class__, state))
 
 
 class ESawInvalidVersionError(Exception):
@@ -62,6 +216,7 @@ class ESawInvalidVersionError(Exception):
         version: str,
         supported_versions: list[str],
     ):
+        super().__init__(version, supported_versions)
         self.version = version
         self.supported_versions = supported_versions
 
@@ -72,6 +227,47 @@ class ESawInvalidVersionError(Exception):
         )
 
 
+class ESawCircuitOpenError(Exception):
+    """The circuit of an endpoint family is open, the call was not attempted."""
+
+    retryable = True
+
+    def __init__(self, family: str, method_name: str, retry_after: float):
+        super().__init__(family, method_name, retry_after)
+        self.family = family
+        self.method_name = method_name
+        self.retry_after = retry_after
+
+    @property
+    def suggested_backoff(self) -> float:
+        return self.retry_after
+
+    def __str__(self):
+        return (
+            f"Circuit open for {self.family} endpoints, {self.method_name} not sent.\n"
+            f"retry_after : {self.retry_after:.1f}s"
+        )
+
+
+class ESawQuotaExceededError(Exception):
+    """Sending would exceed the envelopes of the license, the call was not attempted."""
+
+    retryable = False
+
+    def __init__(self, method_name: str, requested: int, remaining: int):
+        super().__init__(method_name, requested, remaining)
+        self.method_name = method_name
+        self.requested = requested
+        self.remaining = remaining
+
+    def __str__(self):
+        return (
+            f"License quota exceeded, {self.method_name} not sent.\n"
+            f"requested : {self.requested}\n"
+            f"remaining : {self.remaining}"
+        )
+
+
 class ESawUnauthorizedRequest(BaseAPIESawErrorResponse):
     pass
 
@@ -98,3 +294,138 @@ class ESawErrorResponse(BaseAPIESawErrorResponse):
             f"request_data : {str(self.request_data)}\n"
             f"response_headers : {str(self.response_headers)}\n"
         )
+
+
+class ESawRateLimitedError(ESawErrorResponse):
+    """The organization exceeded the rate limit of eSignAnyWhere."""
+
+    retryable = True
+    default_backoff = 5.0
+
+
+class ESawTransientError(ESawErrorResponse):
+    """eSignAnyWhere failed or timed out, the same request may succeed later."""
+
+    retryable = True
+    default_backoff = 1.0
+
+
+class ESawNotFoundError(ESawErrorResponse):
+    """The requested resource does not exist."""
+
+
+class ESawValidationError(ESawErrorResponse):
+    """The request was rejected as invalid and will never succeed as is."""
+
+
+class ESawConflictError(ESawErrorResponse):
+    """The request conflicts with the current state of the resource."""
+
+
+class ESawInvalidStatusError(ESawConflictError):
+    """The envelope is not in a status allowing the operation (ERR0013)."""
+
+
+class ESawExpirationInPastError(ESawValidationError):
+    """The requested expiration of the envelope is already past (ERR0163)."""
+
+
+class ESawEmptyFileError(ESawValidationError):
+    """The uploaded file has no content (ERR0097)."""
+
+
+class ESawUnknownUserError(ESawValidationError):
+    """An email of the request is not a user of the organization (ERR0110)."""
+
+
+STATUS_CODE_ERRORS: dict[int, type[ESawErrorResponse]] = {
+    400: ESawValidationError,
+    404: ESawNotFoundError,
+    408: ESawTransientError,
+    409: ESawConflictError,
+    410: ESawNotFoundError,
+    412: ESawConflictError,
+    413: ESawValidationError,
+    415: ESawValidationError,
+    422: ESawValidationError,
+    423: ESawConflictError,
+    429: ESawRateLimitedError,
+    500: ESawTransientError,
+    502: ESawTransientError,
+    503: ESawTransientError,
+    504: ESawTransientError,
+}
+# ErrorId returned by eSignAnyWhere which are more specific than the status code
+ERROR_ID_ERRORS: dict[str, type[ESawErrorResponse]] = {
+    # Envelope, draft and template not found
+    "ERR0007": ESawNotFoundError,
+    "ERR0250": ESawNotFoundError,
+    "ERR0260": ESawNotFoundError,
+    "ERR0013": ESawInvalidStatusError,
+    "ERR0097": ESawEmptyFileError,
+    "ERR0110": ESawUnknownUserError,
+    "ERR0163": ESawExpirationInPastError,
+}
+
+
+def get_error_class(
+    status_code: int, error_id: str | None = None
+) -> type[ESawErrorResponse]:
+    """Return the ESawErrorResponse subclass matching an error of eSignAnyWhere."""
+    if error_id is not None and error_id in ERROR_ID_ERRORS:
+        return ERROR_ID_ERRORS[error_id]
+    error_class = STATUS_CODE_ERRORS.get(status_code)
+    if error_class is not None:
+        return error_class
+    if status_code >= 500:
+        return ESawTransientError
+    return ESawErrorResponse
+
+
+def get_response_error_id(response: requests.Response) -> str | None:
+    """Return the ErrorId of an error response of eSignAnyWhere, if any."""
+    if "json" not in response.headers.get("Content-Type", ""):
+        return None
+    try:
+        error_id = json.loads(response.content[:MAX_BODY_BYTES]).get("ErrorId")
+    except Exception:
+        return None
+    return error_id if isinstance(error_id, str) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Return True if the request that raised error may succeed if sent again."""
+    if isinstance(error, BaseAPIESawErrorResponse | ESawCircuitOpenError):
+        return error.retryable
+    return isinstance(error, requests.ConnectionError | requests.Timeout)
+
+
+def is_unprocessed(error: BaseException) -> bool:
+    """
+    Return True if error proves eSignAnyWhere did not process the request.
+
+    Unlike is_retryable, this also holds for requests which are not
+    idempotent, such as sends: the connection could not be set up, the call
+    was not attempted, or it was refused with 429, or 503 and Retry-After.
+    """
+    if isinstance(error, ESawCircuitOpenError | ESawRateLimitedError):
+        return True
+    if isinstance(error, BaseAPIESawErrorResponse):
+        return (
+            error.status_code == 503
+            and _parse_retry_after(error.response_headers) is not None
+        )
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError) and error.args:
+        # A refused connection, not one dropped once the request was sent
+        reason = getattr(error.args[0], "reason", None)
+        return isinstance(reason, urllib3.exceptions.NewConnectionError)
+    return False
+
+
+def get_backoff(error: BaseException, default: float = 1.0) -> float | None:
+    """Return the seconds to wait before retrying, None if it must not be retried."""
+    if isinstance(error, BaseAPIESawErrorResponse | ESawCircuitOpenError):
+        return error.suggested_backoff
+    return default if is_retryable(error) else None
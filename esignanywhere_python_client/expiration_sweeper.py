@@ -0,0 +1,329 @@
+import dataclasses
+import json
+import logging
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from .batch import BatchOutcome, BatchRunner
+from .esign_client import ESignAnyWhereClient
+from .models import models_v6
+
+logger = logging.getLogger(__name__)
+
+EXPIRED = models_v6.Status1.Expired.value
+DAY_SECONDS = 86400
+
+
+@dataclass(slots=True)
+class RestartPolicy:
+    """
+    Which expired envelopes found by the sweeper are restarted, and until when.
+
+    Only Expired envelopes are restarted, the server refuses the others
+    (ERR0013). The restarts set an absolute ExpirationDate, ``expires_in``
+    after the restart or ``expiration_date``, one of which is required:
+    ExpirationInSecondsAfterSending counts from the original sending, so
+    for an expired envelope it would mostly be past already (ERR0163).
+
+    :param expires_in: how long the envelopes stay valid after the restart
+    :param expiration_date: ExpirationDate of the restarts, with a timezone
+    :param expired_since_days: only find the envelopes expired since that
+        many days (InStatusSinceDays)
+    :param max_restarts: restarts of an envelope over every cycle, None for
+        no limit
+    :param predicate: restarts only the envelopes for which it returns True,
+        e.g. based on their MetaData
+    :raises ValueError: without exactly one of expires_in and expiration_date
+    """
+
+    expires_in: timedelta | None = None
+    expiration_date: datetime | None = None
+    expired_since_days: int | None = None
+    max_restarts: int | None = 1
+    predicate: Callable[[models_v6.EnvelopeFindEnvelope], bool] | None = None
+
+    def __post_init__(self) -> None:
+        if (self.expires_in is None) == (self.expiration_date is None):
+            raise ValueError("Give either expires_in or expiration_date")
+        if self.expiration_date is not None and self.expiration_date.tzinfo is None:
+            raise ValueError("expiration_date must have a timezone")
+
+    def get_expiration(self, now: datetime) -> datetime:
+        """Return the ExpirationDate of the envelopes restarted at now."""
+        if self.expiration_date is not None:
+            return self.expiration_date
+        if self.expires_in is None:
+            raise ValueError("Give either expires_in or expiration_date")
+        return (now + self.expires_in).replace(microsecond=0)
+
+    def get_request(
+        self,
+        envelope: models_v6.EnvelopeFindEnvelope,
+        restarts: int = 0,
+        now: datetime | None = None,
+    ) -> models_v6.EnvelopeRestartExpiredRequest | None:
+        """Return the restart of envelope, or None if it is not restarted."""
+        if envelope.Id is None:
+            return None
+        if self.max_restarts is not None and restarts >= self.max_restarts:
+            return None
+        if envelope.Status != models_v6.Status2.Expired.value:
+            return None
+        if self.predicate is not None and not self.predicate(envelope):
+            return None
+        return models_v6.EnvelopeRestartExpiredRequest(
+            EnvelopeId=envelope.Id,
+            ExpirationInSecondsAfterSending=None,
+            ExpirationDate=self.get_expiration(now or datetime.now(timezone.utc)),
+        )
+
+
+@dataclass(slots=True)
+class LedgerEntry:
+    """When the sweeper last restarted an envelope."""
+
+    cycle: str
+    restarts: int = 0
+    restarted_at: float = 0.0
+
+
+class SweepLedger:
+    """
+    The envelopes restarted by the sweeper, by envelope id, saved as JSON.
+
+    Only the restarts which succeeded are recorded, the failed ones are
+    tried again by the next sweep. Without a path the ledger only lives as
+    long as the object, which is enough for a sweeper running in a long
+    lived service.
+    """
+
+    def __init__(
+        self, path: str | None = None, clock: Callable[[], float] = time.time
+    ) -> None:
+        self.path = path
+        self.clock = clock
+        self.entries: dict[str, LedgerEntry] = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as ledger_file:
+                data = json.load(ledger_file)
+            for envelope_id, entry in data.items():
+                # Ledgers saved before recorded the failed restarts too
+                if entry.get("ok", True):
+                    self.entries[envelope_id] = LedgerEntry(
+                        entry["cycle"],
+                        entry.get("restarts", 0),
+                        entry.get("restarted_at", clock()),
+                    )
+
+    def is_touched(self, envelope_id: str, cycle: str) -> bool:
+        entry = self.entries.get(envelope_id)
+        return entry is not None and entry.cycle == cycle
+
+    def get_restarts(self, envelope_id: str) -> int:
+        entry = self.entries.get(envelope_id)
+        return 0 if entry is None else entry.restarts
+
+    def record(self, outcome: BatchOutcome, cycle: str) -> None:
+        """Record a restart which succeeded, the failed ones are ignored."""
+        if not outcome.ok:
+            return
+        self.entries[outcome.key] = LedgerEntry(
+            cycle, self.get_restarts(outcome.key) + 1, self.clock()
+        )
+
+    def prune(self, before: float) -> int:
+        """Drop the envelopes last restarted before a timestamp, return how many."""
+        pruned = [
+            envelope_id
+            for envelope_id, entry in self.entries.items()
+            if entry.restarted_at < before
+        ]
+        for envelope_id in pruned:
+            del self.entries[envelope_id]
+        return len(pruned)
+
+    def save(self) -> None:
+        """Write the ledger atomically to its path, if it has one."""
+        if self.path is None:
+            return
+        data = {
+            envelope_id: dataclasses.asdict(entry)
+            for envelope_id, entry in self.entries.items()
+        }
+        # A unique name in the same directory, sweepers can share the ledger
+        with tempfile.NamedTemporaryFile(
+            "w",
+            dir=os.path.dirname(os.path.abspath(self.path)),
+            prefix=f"{os.path.basename(self.path)}.",
+            suffix=".tmp",
+            delete=False,
+        ) as ledger_file:
+            try:
+                json.dump(data, ledger_file)
+            except BaseException:
+                ledger_file.close()
+                os.remove(ledger_file.name)
+                raise
+        os.replace(ledger_file.name, self.path)
+
+
+@dataclass(slots=True)
+class SweepReport:
+    cycle: str
+    found: int = 0
+    skipped: int = 0
+    restarted: list[str] = field(default_factory=list)
+    failed: list[BatchOutcome] = field(default_factory=list)
+    # The find_envelope queries which failed, their envelopes were not swept
+    failed_queries: list[BatchOutcome] = field(default_factory=list)
+
+
+class ExpirationSweeper:
+    """
+    Find the expired envelopes and restart them by policy.
+
+    The envelopes sent in the last ``lookback_days`` are searched with one
+    find_envelope query per ``window_days`` window, so no single query has
+    to match every envelope. The queries and
+    then the restarts run from ``max_workers`` threads, at most ``rate``
+    calls per second, through a BatchRunner.
+
+    The ledger records every envelope the sweeper restarted, with the cycle
+    it did it in. Cycles last ``cycle_seconds``; an envelope is restarted
+    at most once per cycle, so sweeping again in the same cycle, after a
+    crash or from a second scheduled run, only handles the envelopes not
+    restarted yet, the failed ones included. It also counts the restarts of
+    each envelope for the ``max_restarts`` of the policy. Envelopes
+    restarted more than ``lookback_days`` ago are dropped from it, as they
+    were sent before and are not found anymore.
+
+        sweeper = ExpirationSweeper(
+            client,
+            RestartPolicy(expires_in=timedelta(days=7)),
+            ledger_path="sweeper.json",
+            rate=10,
+        )
+        report = sweeper.sweep()
+    """
+
+    def __init__(
+        self,
+        client: ESignAnyWhereClient,
+        policy: RestartPolicy,
+        ledger_path: str | None = None,
+        lookback_days: int = 28,
+        window_days: int = 1,
+        cycle_seconds: float = 86400,
+        max_workers: int = 8,
+        rate: float | None = None,
+        burst: float = 1.0,
+        save_every: int = 100,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.client = client
+        self.policy = policy
+        self.ledger = SweepLedger(ledger_path, clock)
+        self.lookback_days = lookback_days
+        self.window_days = window_days
+        self.cycle_seconds = cycle_seconds
+        self.save_every = save_every
+        self.clock = clock
+        self.runner = BatchRunner(
+            client, max_workers=max_workers, rate=rate, burst=burst
+        )
+
+    def get_cycle(self) -> str:
+        return str(int(self.clock() // self.cycle_seconds))
+
+    def get_queries(self) -> list[models_v6.EnvelopeFindRequest]:
+        """Return the find_envelope queries of a sweep, newest window first."""
+        end = datetime.fromtimestamp(self.clock(), timezone.utc)
+        oldest = end - timedelta(days=self.lookback_days)
+        queries = []
+        while end > oldest:
+            start = max(end - timedelta(days=self.window_days), oldest)
+            queries.append(
+                models_v6.EnvelopeFindRequest.model_validate(
+                    {
+                        "StartDate": start,
+                        "EndDate": end,
+                        "Status": models_v6.Status1.Expired,
+                        "InStatusSinceDays": self.policy.expired_since_days,
+                    }
+                )
+            )
+            end = start
+        return queries
+
+    def discover(
+        self,
+    ) -> tuple[dict[str, models_v6.EnvelopeFindEnvelope], list[BatchOutcome]]:
+        """Return the envelopes found by id, and the queries which failed."""
+        envelopes: dict[str, models_v6.EnvelopeFindEnvelope] = {}
+        failed = []
+        for outcome in self.runner.run(
+            self.get_queries(),
+            self.client.find_envelope,
+            key=lambda query: f"{query.Status}:{query.EndDate.isoformat()}",
+            endpoint="find_envelope",
+            idempotent=True,
+        ):
+            if not outcome.ok:
+                logger.warning(
+                    "Sweeper query %s failed: %r", outcome.key, outcome.error
+                )
+                failed.append(outcome)
+                continue
+            for envelope in outcome.result.Envelopes or []:
+                if envelope.Id is not None:
+                    envelopes[envelope.Id] = envelope
+        return envelopes, failed
+
+    def sweep(self, cycle: str | None = None) -> SweepReport:
+        """
+        Restart the envelopes the policy selects and not touched in cycle yet.
+
+        :param cycle: the current cycle, by default derived from the clock
+        :raises ValueError: if the expiration_date of the policy is past
+        """
+        now = datetime.fromtimestamp(self.clock(), timezone.utc)
+        if self.policy.get_expiration(now) <= now:
+            raise ValueError(
+                f"The expiration date {self.policy.expiration_date} is past"
+            )
+        report = SweepReport(cycle or self.get_cycle())
+        envelopes, report.failed_queries = self.discover()
+        report.found = len(envelopes)
+
+        requests = []
+        for envelope_id, envelope in envelopes.items():
+            if self.ledger.is_touched(envelope_id, report.cycle):
+                report.skipped += 1
+                continue
+            request = self.policy.get_request(
+                envelope, self.ledger.get_restarts(envelope_id), now
+            )
+            if request is None:
+                report.skipped += 1
+                continue
+            requests.append(request)
+
+        try:
+            for count, outcome in enumerate(
+                self.runner.restart_envelopes_expiration_days(requests), 1
+            ):
+                self.ledger.record(outcome, report.cycle)
+                if outcome.ok:
+                    report.restarted.append(outcome.key)
+                else:
+                    report.failed.append(outcome)
+                if count % self.save_every == 0:
+                    self.ledger.save()
+        finally:
+            self.ledger.prune(self.clock() - self.lookback_days * DAY_SECONDS)
+            self.ledger.save()
+        return report
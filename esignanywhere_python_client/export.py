@@ -0,0 +1,378 @@
+import csv
+import json
+import os
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import IO, Any
+
+from .envelope_templates import FORM_FIELDS
+
+STRING = "string"
+BOOL = "bool"
+INT = "int"
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+
+def _get(node: Any, key: str) -> Any:
+    """Return the key of a model or of its raw JSON dict."""
+    if node is None:
+        return None
+    if type(node) is dict:
+        return node.get(key)
+    return getattr(node, key, None)
+
+
+def _text(value: Any) -> str | None:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool | int | float | list | dict):
+        return json.dumps(value)
+    return str(value)
+
+
+@dataclass(frozen=True, slots=True)
+class Table:
+    """The columns of an export and how to get its rows from the input items."""
+
+    name: str
+    columns: tuple[tuple[str, str], ...]
+    get_rows: Callable[[Any], Iterable[tuple]]
+
+    @property
+    def column_names(self) -> list[str]:
+        return [name for name, _ in self.columns]
+
+
+def _get_envelope_rows(envelope: Any) -> Iterator[tuple]:
+    yield (
+        _get(envelope, "Id"),
+        _get(envelope, "Name"),
+        _get(envelope, "Status"),
+        _get(envelope, "MetaData"),
+        _get(envelope, "EnvelopeBulkParentId"),
+        _get(envelope, "IsExpiringSoon"),
+    )
+
+
+def _get_bulk_child_rows(item: tuple[str, Any]) -> Iterator[tuple]:
+    bulk_id, bulk_envelope = item
+    for child in _get(bulk_envelope, "Children") or []:
+        yield (
+            bulk_id,
+            _get(child, "EnvelopeId"),
+            _get(child, "Email"),
+            _get(child, "Status"),
+            _text(_get(child, "SentDate")),
+        )
+
+
+def _get_history_rows(item: tuple[str, Any]) -> Iterator[tuple]:
+    envelope_id, history = item
+    for event in _get(history, "Events") or []:
+        recipient = _get(event, "AffectedRecipient")
+        yield (
+            envelope_id,
+            _text(_get(event, "CreationDate")),
+            _get(event, "Type"),
+            _get(recipient, "Email"),
+            _get(recipient, "GivenName"),
+            _get(recipient, "Surname"),
+            _get(event, "Completed"),
+            _text(_get(event, "CompletedOn")),
+            _get(event, "IsInErrorState"),
+            _get(event, "Attempt"),
+            _get(event, "RemainingAttempts"),
+            _text(_get(event, "NextAttemptOn")),
+            _get(event, "ContextInformation"),
+        )
+
+
+def _get_element_rows(
+    envelope_id: str, activity_id: str | None, elements: Any
+) -> Iterator[tuple]:
+    for collection, (key, value_field) in FORM_FIELDS.items():
+        for field in _get(elements, collection) or []:
+            yield (
+                envelope_id,
+                activity_id,
+                collection,
+                _get(field, key),
+                _get(field, "DocumentNumber"),
+                _get(field, "Required"),
+                _text(_get(field, value_field)),
+            )
+
+
+def _get_form_field_rows(item: tuple[str, Any]) -> Iterator[tuple]:
+    envelope_id, response = item
+    unassigned = _get(response, "UnassignedElements")
+    if unassigned is not None:
+        yield from _get_element_rows(envelope_id, None, unassigned)
+    for activity in _get(response, "Activities") or []:
+        action = _get(activity, "Action")
+        if action is None:
+            continue
+        names = action if type(action) is dict else type(action).model_fields
+        for name in names:
+            elements = _get(_get(action, name), "Elements")
+            if elements is not None:
+                yield from _get_element_rows(
+                    envelope_id, _get(activity, "Id"), elements
+                )
+
+
+ENVELOPES = Table(
+    "envelopes",
+    (
+        ("Id", STRING),
+        ("Name", STRING),
+        ("Status", STRING),
+        ("MetaData", STRING),
+        ("EnvelopeBulkParentId", STRING),
+        ("IsExpiringSoon", BOOL),
+    ),
+    _get_envelope_rows,
+)
+BULK_CHILDREN = Table(
+    "bulk_children",
+    (
+        ("EnvelopeBulkParentId", STRING),
+        ("EnvelopeId", STRING),
+        ("Email", STRING),
+        ("Status", STRING),
+        ("SentDate", STRING),
+    ),
+    _get_bulk_child_rows,
+)
+HISTORY_EVENTS = Table(
+    "history_events",
+    (
+        ("EnvelopeId", STRING),
+        ("CreationDate", STRING),
+        ("Type", STRING),
+        ("RecipientEmail", STRING),
+        ("RecipientGivenName", STRING),
+        ("RecipientSurname", STRING),
+        ("Completed", BOOL),
+        ("CompletedOn", STRING),
+        ("IsInErrorState", BOOL),
+        ("Attempt", INT),
+        ("RemainingAttempts", INT),
+        ("NextAttemptOn", STRING),
+        ("ContextInformation", STRING),
+    ),
+    _get_history_rows,
+)
+FORM_FIELD_VALUES = Table(
+    "form_field_values",
+    (
+        ("EnvelopeId", STRING),
+        ("ActivityId", STRING),
+        ("FieldType", STRING),
+        ("ElementId", STRING),
+        ("DocumentNumber", INT),
+        ("Required", BOOL),
+        ("Value", STRING),
+    ),
+    _get_form_field_rows,
+)
+
+
+class ColumnBuffer:
+    """Rows appended column by column, handed over in batches."""
+
+    def __init__(self, size: int) -> None:
+        self.columns: list[list[Any]] = [[] for _ in range(size)]
+        self.rows = 0
+
+    def append(self, row: tuple) -> None:
+        for column, value in zip(self.columns, row):
+            column.append(value)
+        self.rows += 1
+
+    def flush(self) -> list[list[Any]]:
+        columns = self.columns
+        self.columns = [[] for _ in columns]
+        self.rows = 0
+        return columns
+
+
+class _CsvWriter:
+    def __init__(self, file: IO[str], table: Table) -> None:
+        self.writer = csv.writer(file)
+        self.writer.writerow(table.column_names)
+
+    def write(self, columns: list[list[Any]]) -> None:
+        self.writer.writerows(zip(*columns))
+
+    def close(self) -> None:
+        pass
+
+
+class _JsonlWriter:
+    def __init__(self, file: IO[str], table: Table) -> None:
+        self.file = file
+        self.names = table.column_names
+
+    def write(self, columns: list[list[Any]]) -> None:
+        self.file.writelines(
+            json.dumps(dict(zip(self.names, row))) + "\n" for row in zip(*columns)
+        )
+
+    def close(self) -> None:
+        pass
+
+
+class _ParquetWriter:
+    def __init__(self, path: str, table: Table) -> None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError(
+                "Exporting to Parquet requires the pyarrow package"
+            ) from e
+        types = {STRING: pyarrow.string(), BOOL: pyarrow.bool_(), INT: pyarrow.int64()}
+        self.pyarrow = pyarrow
+        self.schema = pyarrow.schema(
+            [(name, types[column_type]) for name, column_type in table.columns]
+        )
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, columns: list[list[Any]]) -> None:
+        self.writer.write_table(
+            self.pyarrow.Table.from_arrays(
+                [
+                    self.pyarrow.array(column, type=field.type)
+                    for column, field in zip(columns, self.schema)
+                ],
+                schema=self.schema,
+            )
+        )
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def get_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    if extension not in FORMATS:
+        raise ValueError(
+            f"Cannot guess the export format of {path}, use one of {FORMATS}"
+        )
+    return extension
+
+
+def export(
+    table: Table,
+    items: Iterable[Any],
+    destination: str | IO[str],
+    format: str | None = None,
+    batch_size: int = 10000,
+) -> int:
+    """
+    Write the rows of table got from items to destination, return their count.
+
+    Items are read one at a time and their rows go through a ColumnBuffer
+    of ``batch_size`` rows, so memory does not grow with the export. Items
+    can be the models returned by the client or their raw JSON dicts,
+    which avoids building any pydantic model at all.
+
+        histories = (
+            (envelope_id, client.get_envelope_history(envelope_id))
+            for envelope_id in envelope_ids
+        )
+        export(HISTORY_EVENTS, histories, "history.parquet")
+
+    :param destination: a file path, or an open text file for CSV and JSONL
+    :param format: "csv", "jsonl" or "parquet" (requires pyarrow), by
+        default from the extension of the path
+    :raises ValueError: for an unknown format
+    :raises ImportError: for Parquet without pyarrow
+    """
+    if format is None:
+        if not isinstance(destination, str):
+            raise ValueError("The format is required to export to a file object")
+        format = get_format(destination)
+    if format not in FORMATS:
+        raise ValueError(f"Unknown export format {format!r}, use one of {FORMATS}")
+
+    file = None
+    writer: _CsvWriter | _JsonlWriter | _ParquetWriter
+    if format == "parquet":
+        if not isinstance(destination, str):
+            raise ValueError("Parquet is only exported to a file path")
+        writer = _ParquetWriter(destination, table)
+    else:
+        if isinstance(destination, str):
+            destination = file = open(destination, "w", newline="")
+        writer_class = _CsvWriter if format == "csv" else _JsonlWriter
+        writer = writer_class(destination, table)
+
+    buffer = ColumnBuffer(len(table.columns))
+    count = 0
+    try:
+        for item in items:
+            for row in table.get_rows(item):
+                buffer.append(row)
+                if buffer.rows >= batch_size:
+                    count += buffer.rows
+                    writer.write(buffer.flush())
+        if buffer.rows:
+            count += buffer.rows
+            writer.write(buffer.flush())
+    finally:
+        writer.close()
+        if file is not None:
+            file.close()
+    return count
+
+
+def export_envelopes(
+    envelopes: Iterable[Any], destination: str | IO[str], **options: Any
+) -> int:
+    """
+    Export models_v6.EnvelopeFindEnvelope listings, e.g. chained find results.
+
+    :param options: format and batch_size, as for export()
+    """
+    return export(ENVELOPES, envelopes, destination, **options)
+
+
+def export_bulk_children(
+    bulk_envelopes: Iterable[tuple[str, Any]],
+    destination: str | IO[str],
+    **options: Any,
+) -> int:
+    """
+    Export the children of (bulk envelope id, models_v6.EnvelopeBulkGetResponse) pairs.
+
+    :param options: format and batch_size, as for export()
+    """
+    return export(BULK_CHILDREN, bulk_envelopes, destination, **options)
+
+
+def export_history_events(
+    histories: Iterable[tuple[str, Any]], destination: str | IO[str], **options: Any
+) -> int:
+    """
+    Export the events of (envelope id, models_v6.EnvelopeGetHistoryResponse) pairs.
+
+    :param options: format and batch_size, as for export()
+    """
+    return export(HISTORY_EVENTS, histories, destination, **options)
+
+
+def export_form_field_values(
+    elements: Iterable[tuple[str, Any]], destination: str | IO[str], **options: Any
+) -> int:
+    """
+    Export the form fields of (envelope id, models_v6.EnvelopeGetElementsResponse) pairs.
+
+    :param options: format and batch_size, as for export()
+    """
+    return export(FORM_FIELD_VALUES, elements, destination, **options)
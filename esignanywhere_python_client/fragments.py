@@ -0,0 +1,116 @@
+import functools
+import re
+import threading
+import weakref
+from typing import Any
+
+from pydantic import BaseModel
+
+# id() of the frozen models -> a weak reference to them and their JSON. The
+# models are not hashable, the reference tells them apart from a later
+# object reusing the id of a freed one.
+_fragments: dict[int, tuple[weakref.ref, bytes]] = {}
+_lock = threading.RLock()
+
+_PLACEHOLDER = "\x00esaw-fragment-{}\x00"
+_PLACEHOLDER_RE = re.compile(rb'"\\u0000esaw-fragment-(\d+)\\u0000"')
+
+
+def _discard(key: int, ref: weakref.ref) -> None:
+    with _lock:
+        entry = _fragments.get(key)
+        if entry is not None and entry[0] is ref:
+            del _fragments[key]
+
+
+def _get_fragment(model: Any) -> bytes | None:
+    entry = _fragments.get(id(model))
+    if entry is None or entry[0]() is not model:
+        return None
+    return entry[1]
+
+
+def freeze(model: BaseModel) -> BaseModel:
+    """
+    Serialize model once and reuse its JSON in every request including it.
+
+    Meant for the invariant parts of the requests (email, reminder,
+    expiration or sealing configuration, ...): a frozen model must not be
+    modified anymore, its cached JSON would be sent instead. The cache
+    entry lives as long as the model. The cached JSON is only used by
+    dumps(), whose bytes can be given to the client instead of the model:
+
+        client.create_and_send_envelope(fragments.dumps(request))
+    """
+    fragment = model.__pydantic_serializer__.to_json(model)
+    key = id(model)
+    with _lock:
+        _fragments[key] = (
+            weakref.ref(model, functools.partial(_discard, key)),
+            fragment,
+        )
+    return model
+
+
+def unfreeze(model: BaseModel) -> None:
+    """Drop the cached JSON of model, it is serialized again from now on."""
+    with _lock:
+        if _get_fragment(model) is not None:
+            del _fragments[id(model)]
+
+
+def is_frozen(model: Any) -> bool:
+    return _get_fragment(model) is not None
+
+
+def has_fragments() -> bool:
+    """Return True if any model is frozen, dumps() is only worth it then."""
+    return bool(_fragments)
+
+
+def _is_container(value: Any) -> bool:
+    # isinstance() against BaseModel goes through ABCMeta and is slow
+    value_type = type(value)
+    return value_type is list or BaseModel in value_type.__mro__
+
+
+def _substitute(node: Any, fragments: list[bytes]) -> Any:
+    """Return node with its frozen models replaced by placeholders, copying as needed."""
+    fragment = _get_fragment(node)
+    if fragment is not None:
+        fragments.append(fragment)
+        return _PLACEHOLDER.format(len(fragments) - 1)
+    if type(node) is list:
+        items = enumerate(node)
+    else:
+        items = node.__dict__.items()
+    copy: Any = None
+    for key, value in items:
+        if value is None or not _is_container(value):
+            continue
+        new_value = _substitute(value, fragments)
+        if new_value is not value:
+            if copy is None:
+                copy = list(node) if type(node) is list else node.__copy__()
+            if type(copy) is list:
+                copy[key] = new_value
+            else:
+                copy.__dict__[key] = new_value
+    return node if copy is None else copy
+
+
+def dumps(model: BaseModel) -> bytes:
+    """
+    Return the JSON of model, splicing in the cached JSON of its frozen parts.
+
+    Only the parts which are not frozen are walked and serialized.
+    """
+    fragments: list[bytes] = []
+    root = _substitute(model, fragments) if _fragments else model
+    if not fragments:
+        return model.__pydantic_serializer__.to_json(model)
+    if isinstance(root, str):
+        return fragments[0]
+    # The placeholders are strings where models are expected
+    body = root.__pydantic_serializer__.to_json(root, warnings=False)
+    return _PLACEHOLDER_RE.sub(lambda match: fragments[int(match[1])], body)
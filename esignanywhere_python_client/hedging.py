@@ -0,0 +1,181 @@
+import contextvars
+import dataclasses
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
+
+from . import metrics
+from .middleware import ClientCall, Handler, Middleware
+
+HEDGED_CALLS = "esaw_hedged_calls_total"
+HEDGE_WINS = "esaw_hedge_wins_total"
+HEDGE_BUDGET_EXHAUSTED = "esaw_hedge_budget_exhausted_total"
+HEDGE_POOL_BUSY = "esaw_hedge_pool_busy_total"
+
+
+class HedgeBudget:
+    """
+    Token bucket limiting hedged requests to a fraction of the calls.
+
+    Every call adds ``ratio`` tokens, up to ``burst``; a hedge spends one.
+    """
+
+    def __init__(self, ratio: float = 0.05, burst: float = 10.0) -> None:
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self.tokens = min(self.tokens + self.ratio, self.burst)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class HedgingMiddleware(Middleware):
+    """
+    Send a second attempt of slow idempotent calls and keep the first answer.
+
+    The hedge is fired once the first attempt has been running longer than
+    the ``percentile`` of the latency recorded for the endpoint in
+    ``metrics_sink``, the same sink given to the client. Until
+    ``min_samples`` calls were recorded no hedge is sent. ``budget`` caps
+    the extra load, by default to 5% of the calls.
+
+    Both attempts run on the pool of ``max_workers`` threads, so the caller
+    returns as soon as either answers, and in a copy of the context of the
+    caller. Nothing ever queues in the pool: while all its threads are busy
+    the call runs on the calling thread without a hedge, and no hedge is
+    sent. Call ``close`` once the client is done.
+
+        sink = InMemoryMetricsSink()
+        client = ESignAnyWhereClient(api_token, metrics_sink=sink)
+        client.add_middleware(HedgingMiddleware(sink))
+    """
+
+    def __init__(
+        self,
+        metrics_sink: metrics.InMemoryMetricsSink,
+        endpoints: frozenset[str] | set[str] | None = frozenset(
+            {"get_envelope", "get_envelope_viewer_links"}
+        ),
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        min_delay: float = 0.01,
+        max_delay: float | None = None,
+        budget: HedgeBudget | None = None,
+        max_workers: int = 32,
+    ) -> None:
+        self.metrics = metrics_sink
+        self.endpoints = endpoints
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.budget = budget or HedgeBudget()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="esaw-hedge"
+        )
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self.closed = False
+
+    def get_delay(self, call: ClientCall) -> float | None:
+        """Return how long to wait before hedging call, None to never hedge it."""
+        histogram = self.metrics.get_histogram(
+            metrics.REQUEST_DURATION, endpoint=call.endpoint, version=call.version
+        )
+        if histogram is None or histogram.count < self.min_samples:
+            return None
+        delay = self.metrics.percentile(
+            metrics.REQUEST_DURATION,
+            self.percentile,
+            endpoint=call.endpoint,
+            version=call.version,
+        )
+        if delay is None:
+            return None
+        delay = max(delay, self.min_delay)
+        return min(delay, self.max_delay) if self.max_delay is not None else delay
+
+    def _increment(self, name: str, call: ClientCall) -> None:
+        self.metrics.increment(
+            name, labels={"endpoint": call.endpoint, "version": call.version}
+        )
+
+    def _submit(self, call_next: Handler, attempt: ClientCall) -> Future | None:
+        """Run attempt on a free thread of the pool, None if there is none."""
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            future = self.executor.submit(
+                contextvars.copy_context().run, call_next, attempt
+            )
+        except RuntimeError:
+            # Closed meanwhile
+            self._slots.release()
+            return None
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def __call__(self, call: ClientCall, call_next: Handler) -> Any:
+        if (
+            self.closed
+            or not call.is_idempotent
+            or (self.endpoints is not None and call.endpoint not in self.endpoints)
+        ):
+            return call_next(call)
+        self.budget.deposit()
+        delay = self.get_delay(call)
+        if delay is None:
+            return call_next(call)
+
+        def copy() -> ClientCall:
+            return dataclasses.replace(
+                call, headers=dict(call.headers), extras=dict(call.extras)
+            )
+
+        first_attempt = copy()
+        first = self._submit(call_next, first_attempt)
+        if first is None:
+            self._increment(HEDGE_POOL_BUSY, call)
+            return call_next(call)
+        attempts: dict[Future, ClientCall] = {first: first_attempt}
+        done, _ = wait([first], timeout=delay)
+        if not done:
+            if not self.budget.withdraw():
+                self._increment(HEDGE_BUDGET_EXHAUSTED, call)
+            else:
+                hedge_attempt = copy()
+                hedge = self._submit(call_next, hedge_attempt)
+                if hedge is None:
+                    self._increment(HEDGE_POOL_BUSY, call)
+                else:
+                    self._increment(HEDGED_CALLS, call)
+                    attempts[hedge] = hedge_attempt
+
+        pending = set(attempts)
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                if future is not first:
+                    call.extras["hedged"] = True
+                    self._increment(HEDGE_WINS, call)
+                call.response = attempts[future].response
+                return future.result()
+        assert error is not None
+        raise error
+
+    def close(self) -> None:
+        """Stop hedging and shut the pool down, the running attempts go on."""
+        self.closed = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
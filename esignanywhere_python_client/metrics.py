@@ -0,0 +1,378 @@
+import bisect
+import threading
+import time
+from collections import deque
+from typing import Any
+
+REQUEST_BYTES = "esaw_request_bytes"
+RESPONSE_BYTES = "esaw_response_bytes"
+REQUEST_DURATION = "esaw_request_duration_seconds"
+PHASE_DURATION = "esaw_request_phase_seconds"
+RESPONSES = "esaw_responses_total"
+RETRIES = "esaw_retries_total"
+
+# "wait" covers the connection setup as well: requests only exposes the time
+# elapsed between sending the request and parsing the response headers.
+PHASES = ("prepare", "wait", "download", "decode", "validate")
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+SIZE_BUCKETS = (
+    256,
+    1024,
+    4096,
+    16384,
+    65536,
+    262144,
+    1048576,
+    4194304,
+    16777216,
+    67108864,
+)
+
+
+def get_buckets(name: str) -> tuple[float, ...]:
+    if name.endswith("_bytes"):
+        return SIZE_BUCKETS
+    return LATENCY_BUCKETS
+
+
+class MetricsSink:
+    """
+    Destination of the metrics recorded by ESignAnyWhereClient.
+
+    The base class discards everything and is the default sink of the client.
+    Subclasses set ``enabled = True`` and override ``observe``, ``increment``
+    and ``set_gauge``; labels always are a flat dict of strings.
+    """
+
+    enabled = False
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        """Record a value in the histogram ``name``."""
+
+    def increment(
+        self, name: str, value: float = 1, labels: dict[str, str] | None = None
+    ) -> None:
+        """Increase the counter ``name``."""
+
+    def set_gauge(
+        self, name: str, value: float, labels: dict[str, str] | None = None
+    ) -> None:
+        """Set the current value of the gauge ``name``."""
+
+    def start_call(self, endpoint: str, version: str) -> "CallRecorder":
+        if not self.enabled:
+            return NULL_RECORDER
+        return CallRecorder(self, endpoint, version)
+
+    def record_retry(self, endpoint: str, version: str, reason: str = "") -> None:
+        """Count a retry of endpoint, reason usually is the error class name."""
+        if self.enabled:
+            self.increment(
+                RETRIES,
+                labels={"endpoint": endpoint, "version": version, "reason": reason},
+            )
+
+
+class CallRecorder:
+    """Collect timings and sizes of a single call and flush them to a sink."""
+
+    enabled = True
+
+    def __init__(self, sink: MetricsSink, endpoint: str, version: str) -> None:
+        self.sink = sink
+        self.labels = {"endpoint": endpoint, "version": version}
+        self.started = self._checkpoint = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    def phase(self, name: str) -> None:
+        """Close the phase ``name``, started at the previous checkpoint."""
+        now = time.perf_counter()
+        self.phases[name] = self.phases.get(name, 0.0) + now - self._checkpoint
+        self._checkpoint = now
+
+    def split(self, name: str, seconds: float, remainder: str) -> None:
+        """Close a checkpoint whose duration is partially known in advance."""
+        now = time.perf_counter()
+        total = now - self._checkpoint
+        seconds = min(max(seconds, 0.0), total)
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        self.phases[remainder] = self.phases.get(remainder, 0.0) + total - seconds
+        self._checkpoint = now
+
+    def finish(
+        self, status_code: int | None, request_bytes: int, response_bytes: int
+    ) -> None:
+        sink, labels = self.sink, self.labels
+        for name, seconds in self.phases.items():
+            sink.observe(PHASE_DURATION, seconds, {**labels, "phase": name})
+        sink.observe(REQUEST_DURATION, time.perf_counter() - self.started, labels)
+        sink.observe(REQUEST_BYTES, request_bytes, labels)
+        sink.observe(RESPONSE_BYTES, response_bytes, labels)
+        sink.increment(
+            RESPONSES, labels={**labels, "status_code": str(status_code or 0)}
+        )
+
+
+class _NullRecorder:
+    enabled = False
+
+    def phase(self, name: str) -> None:
+        pass
+
+    def split(self, name: str, seconds: float, remainder: str) -> None:
+        pass
+
+    def finish(
+        self, status_code: int | None, request_bytes: int, response_bytes: int
+    ) -> None:
+        pass
+
+
+NULL_RECORDER: Any = _NullRecorder()
+
+
+class Histogram:
+    """
+    Cumulative bucketed histogram with a window of the most recent samples.
+
+    Buckets follow the Prometheus convention (upper bounds, plus +Inf), while
+    percentiles are computed on the recent window so they follow the current
+    behaviour of the server.
+    """
+
+    def __init__(self, buckets: tuple[float, ...], window: int = 1024) -> None:
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+        self.window = window
+        # The recent samples in arrival order, to know which one leaves the
+        # window, and sorted, so percentiles do not sort on every read
+        self.recent: deque[float] = deque()
+        self.sorted_recent: list[float] = []
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self.recent) >= self.window:
+            oldest = self.recent.popleft()
+            del self.sorted_recent[bisect.bisect_left(self.sorted_recent, oldest)]
+        self.recent.append(value)
+        bisect.insort(self.sorted_recent, value)
+
+    def percentile(self, q: float) -> float | None:
+        """Return the ``q`` percentile (0-100) of the recent samples."""
+        samples = self.sorted_recent
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, round(q / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    @property
+    def mean(self) -> float | None:
+        return self.sum / self.count if self.count else None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": dict(zip([*map(str, self.buckets), "+Inf"], self.bucket_counts)),
+        }
+
+
+def _key(name: str, labels: dict[str, str] | None) -> tuple:
+    return (name, tuple(sorted((labels or {}).items())))
+
+
+class InMemoryMetricsSink(MetricsSink):
+    """Keep histograms, counters and gauges in process memory."""
+
+    enabled = True
+
+    def __init__(self, window: int = 1024) -> None:
+        self.window = window
+        self.histograms: dict[tuple, Histogram] = {}
+        self.counters: dict[tuple, float] = {}
+        self.gauges: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(
+                    get_buckets(name), window=self.window
+                )
+            histogram.observe(value)
+
+    def increment(
+        self, name: str, value: float = 1, labels: dict[str, str] | None = None
+    ) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(
+        self, name: str, value: float, labels: dict[str, str] | None = None
+    ) -> None:
+        with self._lock:
+            self.gauges[_key(name, labels)] = value
+
+    def get_histogram(self, name: str, **labels: str) -> Histogram | None:
+        return self.histograms.get(_key(name, labels))
+
+    def get_counter(self, name: str, **labels: str) -> float:
+        return self.counters.get(_key(name, labels), 0)
+
+    def get_gauge(self, name: str, **labels: str) -> float | None:
+        return self.gauges.get(_key(name, labels))
+
+    def percentile(self, name: str, q: float, **labels: str) -> float | None:
+        with self._lock:
+            histogram = self.get_histogram(name, **labels)
+            return histogram.percentile(q) if histogram is not None else None
+
+    def snapshot(self) -> dict[str, list[dict[str, Any]]]:
+        """Return a JSON friendly copy of every metric."""
+        with self._lock:
+            return {
+                "histograms": [
+                    {"name": name, "labels": dict(labels), **histogram.as_dict()}
+                    for (name, labels), histogram in self.histograms.items()
+                ],
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self.counters.items()
+                ],
+                "gauges": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self.gauges.items()
+                ],
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+
+class PrometheusMetricsSink(MetricsSink):
+    """
+    Export the client metrics through ``prometheus_client``.
+
+    Label names are fixed by the first observation of each metric, as
+    required by Prometheus.
+    """
+
+    enabled = True
+
+    def __init__(self, registry: Any = None, namespace: str = "") -> None:
+        try:
+            import prometheus_client
+        except ImportError as e:
+            raise ImportError(
+                "PrometheusMetricsSink requires the prometheus_client package"
+            ) from e
+        self._prometheus = prometheus_client
+        self.registry = registry or prometheus_client.REGISTRY
+        self.namespace = namespace
+        self._metrics: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get_metric(self, kind: str, name: str, labels: dict[str, str]) -> Any:
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    options: dict[str, Any] = {
+                        "labelnames": sorted(labels),
+                        "namespace": self.namespace,
+                        "registry": self.registry,
+                    }
+                    if kind == "Histogram":
+                        options["buckets"] = get_buckets(name)
+                    metric = self._metrics[name] = getattr(self._prometheus, kind)(
+                        name, name.replace("_", " "), **options
+                    )
+        return metric.labels(**labels) if labels else metric
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        self._get_metric("Histogram", name, labels).observe(value)
+
+    def increment(
+        self, name: str, value: float = 1, labels: dict[str, str] | None = None
+    ) -> None:
+        self._get_metric("Counter", name.removesuffix("_total"), labels or {}).inc(
+            value
+        )
+
+    def set_gauge(
+        self, name: str, value: float, labels: dict[str, str] | None = None
+    ) -> None:
+        self._get_metric("Gauge", name, labels or {}).set(value)
+
+
+class OpenTelemetryMetricsSink(MetricsSink):
+    """Export the client metrics through an OpenTelemetry ``Meter``."""
+
+    enabled = True
+
+    def __init__(self, meter: Any) -> None:
+        self.meter = meter
+        self._instruments: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get_instrument(self, factory: str, name: str) -> Any:
+        instrument = self._instruments.get(name)
+        if instrument is None:
+            with self._lock:
+                instrument = self._instruments.get(name)
+                if instrument is None:
+                    unit = "By" if name.endswith("_bytes") else "s"
+                    if factory == "create_counter":
+                        unit = "1"
+                    instrument = self._instruments[name] = getattr(self.meter, factory)(
+                        name, unit=unit
+                    )
+        return instrument
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        self._get_instrument("create_histogram", name).record(value, labels)
+
+    def increment(
+        self, name: str, value: float = 1, labels: dict[str, str] | None = None
+    ) -> None:
+        self._get_instrument("create_counter", name).add(value, labels or {})
+
+    def set_gauge(
+        self, name: str, value: float, labels: dict[str, str] | None = None
+    ) -> None:
+        self._get_instrument("create_gauge", name).set(value, labels or {})
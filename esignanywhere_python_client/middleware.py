@@ -0,0 +1,81 @@
+import logging
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+import requests
+
+Handler = Callable[["ClientCall"], Any]
+
+
+@dataclass(slots=True)
+class ClientCall:
+    """
+    A single call of ESignAnyWhereClient, as seen by the middlewares.
+
+    ``request_model`` is the pydantic model given by the caller (if any) and
+    ``request_data`` its serialized form, sent to eSignAnyWhere. ``response``
+    is filled once the HTTP response is received, and ``extras`` is free for
+    middlewares to share information along the chain.
+    """
+
+    endpoint: str
+    version: str
+    http_method: str
+    service_url: str
+    request_model: Any = None
+    request_data: Any = None
+    headers: dict[str, str] = field(default_factory=dict)
+    body: str = "json"
+    response_model: Any = None
+    response_type: str = "model"
+    expected_keys: tuple[str, ...] = ()
+    log_level: int = logging.DEBUG
+    response: requests.Response | None = None
+    extras: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def is_idempotent(self) -> bool:
+        return self.http_method in ("GET", "HEAD", "OPTIONS")
+
+
+class Middleware:
+    """
+    Base class of the client middlewares.
+
+    A middleware receives the call and the next handler of the chain. It can
+    change the call before invoking ``call_next``, inspect ``call.response``
+    and the parsed result afterwards, or return a result without invoking
+    ``call_next`` at all to answer without any I/O.
+    """
+
+    def __call__(self, call: ClientCall, call_next: Handler) -> Any:
+        return call_next(call)
+
+    def close(self) -> None:
+        """Release what the middleware holds, once its client is dropped."""
+
+
+def build_chain(middlewares: Iterable[Middleware], handler: Handler) -> Handler:
+    """Compose the middlewares around handler; the first one is the outermost."""
+    for middleware in reversed(list(middlewares)):
+        handler = _bind(middleware, handler)
+    return handler
+
+
+def _bind(middleware: Middleware, call_next: Handler) -> Handler:
+    def handler(call: ClientCall) -> Any:
+        return middleware(call, call_next)
+
+    return handler
+
+
+class HeadersMiddleware(Middleware):
+    """Add static headers to every request."""
+
+    def __init__(self, headers: dict[str, str]) -> None:
+        self.headers = headers
+
+    def __call__(self, call: ClientCall, call_next: Handler) -> Any:
+        call.headers.update(self.headers)
+        return call_next(call)
@@ -0,0 +1,159 @@
+import json
+import logging
+import random
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+# Matches start at the beginning of a run of address characters and do not
+# backtrack, so long strings without addresses (e.g. base64) stay linear
+EMAIL_RE = re.compile(r"(?<![\w.+-])[\w.+-]++@[\w-]+\.[\w.-]+")
+DEFAULT_REDACTED_KEYS = re.compile(
+    r"token|password|secret|email|phone|accesscode|pin$|otp", re.IGNORECASE
+)
+REDACTED = "***"
+# Larger bodies are logged as their length, parsing them costs too much
+MAX_PARSED_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class PayloadLogConfig:
+    """
+    How request and response payloads are written to the logs.
+
+    :param max_length: maximum number of characters logged for a payload
+    :param sample_rate: fraction (0-1) of the calls whose payload is logged
+    :param redacted_keys: regex matching the keys whose values are hidden
+    :param redact_emails: hide email addresses found in any string value
+    :param enabled: if False payloads are never logged, only the service url
+    """
+
+    max_length: int = 2048
+    sample_rate: float = 1.0
+    redacted_keys: re.Pattern | None = DEFAULT_REDACTED_KEYS
+    redact_emails: bool = True
+    enabled: bool = True
+
+
+class LazyPayload:
+    """Render a payload only when a log handler actually formats the record."""
+
+    __slots__ = ("payload", "config")
+
+    def __init__(self, payload: Any, config: PayloadLogConfig) -> None:
+        self.payload = payload
+        self.config = config
+
+    def __str__(self) -> str:
+        return render_payload(self.payload, self.config)
+
+    __repr__ = __str__
+
+
+def render_payload(payload: Any, config: PayloadLogConfig) -> str:
+    """Serialize payload with redaction, stopping once max_length is reached."""
+    chunks = []
+    length = 0
+    for chunk in _iter_chunks(payload, config):
+        chunks.append(chunk)
+        length += len(chunk)
+        if length > config.max_length:
+            return "".join(chunks)[: config.max_length] + "... [truncated]"
+    return "".join(chunks)
+
+
+def _iter_chunks(value: Any, config: PayloadLogConfig) -> Iterator[str]:
+    if isinstance(value, dict):
+        yield "{"
+        for index, (key, item) in enumerate(value.items()):
+            if index:
+                yield ", "
+            yield json.dumps(str(key))
+            yield ": "
+            if (
+                item is not None
+                and config.redacted_keys is not None
+                and config.redacted_keys.search(str(key))
+            ):
+                yield json.dumps(REDACTED)
+            else:
+                yield from _iter_chunks(item, config)
+        yield "}"
+    elif isinstance(value, list | tuple):
+        yield "["
+        for index, item in enumerate(value):
+            if index:
+                yield ", "
+            yield from _iter_chunks(item, config)
+        yield "]"
+    elif isinstance(value, str):
+        if config.redact_emails:
+            value = EMAIL_RE.sub(REDACTED, value)
+        yield json.dumps(value, ensure_ascii=False)
+    elif isinstance(value, bytes | bytearray):
+        payload = _loads(value)
+        if payload is None:
+            yield f"<{len(value)} bytes>"
+        else:
+            yield from _iter_chunks(payload, config)
+    elif value is None or isinstance(value, bool | int | float):
+        yield json.dumps(value)
+    elif hasattr(value, "model_dump"):
+        yield from _iter_chunks(value.model_dump(mode="json"), config)
+    else:
+        yield from _iter_chunks(str(value), config)
+
+
+def _loads(body: bytes | bytearray) -> Any:
+    """Return the JSON object or array in body, None if it holds something else."""
+    if len(body) > MAX_PARSED_BYTES or body.lstrip()[:1] not in (b"{", b"["):
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+class PayloadLogger:
+    """Log service responses and requests without paying for disabled records."""
+
+    def __init__(
+        self, logger: logging.Logger, config: PayloadLogConfig | None = None
+    ) -> None:
+        self.logger = logger
+        self.config = config or PayloadLogConfig()
+
+    def is_enabled_for(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def _sampled(self) -> bool:
+        config = self.config
+        if not config.enabled or config.sample_rate <= 0:
+            return False
+        return config.sample_rate >= 1 or random.random() < config.sample_rate
+
+    def log_response(self, level: int, service_url: str, payload: Any = None) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        if payload is None or not self._sampled():
+            self.logger.log(level, "Response from service_url : %s", service_url)
+        else:
+            self.logger.log(
+                level,
+                "Response from service_url : %s: %s",
+                service_url,
+                LazyPayload(payload, self.config),
+            )
+
+    def log_status(self, level: int, service_url: str, status_code: int) -> None:
+        if self.logger.isEnabledFor(level):
+            self.logger.log(
+                level, "Response from service_url : %s -> %s", service_url, status_code
+            )
+
+    def log_request(self, level: int, method_name: str, payload: Any) -> None:
+        if self.logger.isEnabledFor(level) and self._sampled():
+            self.logger.log(
+                level, "%s Request : %s", method_name, LazyPayload(payload, self.config)
+            )
@@ -0,0 +1,269 @@
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from . import exceptions
+from .esign_client import ESignAnyWhereClient
+from .metrics import MetricsSink
+from .middleware import ClientCall, Handler, Middleware
+from .models import models_v6
+from .reference_data import ReferenceDataCache
+
+logger = logging.getLogger(__name__)
+
+QUOTA_REMAINING = "esaw_license_envelopes_remaining"
+
+UNLIMITED = -1
+
+SEND_ENDPOINTS = frozenset(
+    {"create_and_send_envelope", "create_and_send_bulk_envelope", "send_draft"}
+)
+
+
+class LicenseQuota:
+    """
+    Local view of the envelopes left in the license, to refuse sends early.
+
+    The Envelopes amount of the license is read once; every send then
+    reserves its envelopes with ``acquire`` and either ``commit``s them once
+    sent or ``release``s them when it was not processed. Sends are admitted while the
+    envelopes counted by the server, plus the ones sent and reserved since,
+    stay below the limit minus ``headroom``. Every ``reconcile_seconds``
+    the license is read again and its Count replaces the local tally.
+
+    A Limit of -1 (or no Envelopes at all) means unlimited and admits
+    everything. Given a ReferenceDataCache, the license is read through it,
+    so the cache and the quota share the same calls.
+
+    Reading the license requires a usermanager token: until it succeeds
+    sends are admitted against the configured ``limit`` (unlimited when
+    None), and a failed read is tried again after ``retry_seconds``,
+    doubling up to ``reconcile_seconds``, rather than on every send.
+    """
+
+    def __init__(
+        self,
+        client: ESignAnyWhereClient,
+        headroom: int = 0,
+        reconcile_seconds: float = 300.0,
+        limit: int | None = None,
+        retry_seconds: float = 10.0,
+        reference_cache: ReferenceDataCache | None = None,
+        metrics_sink: MetricsSink | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.client = client
+        self.headroom = headroom
+        self.reconcile_seconds = reconcile_seconds
+        self.retry_seconds = retry_seconds
+        self.reference_cache = reference_cache
+        self.metrics = metrics_sink or MetricsSink()
+        self.clock = clock
+        self.limit = limit
+        self.count = 0
+        self.sent = 0
+        self.reserved = 0
+        self.reconciled_at: float | None = None
+        # None until the first reconciliation attempt
+        self.next_reconcile_at: float | None = None
+        self.failures = 0
+        self._condition = threading.Condition()
+        self._reconcile_lock = threading.Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.limit is None or self.limit == UNLIMITED
+
+    @property
+    def remaining(self) -> int | None:
+        """Envelopes which can still be reserved, None when unlimited."""
+        with self._condition:
+            return self._get_remaining()
+
+    def _get_remaining(self) -> int | None:
+        if self.limit is None or self.limit == UNLIMITED:
+            return None
+        return max(
+            self.limit - self.headroom - self.count - self.sent - self.reserved, 0
+        )
+
+    def _publish(self) -> None:
+        remaining = self._get_remaining()
+        if self.metrics.enabled and remaining is not None:
+            self.metrics.set_gauge(QUOTA_REMAINING, remaining)
+
+    def _get_license(self) -> models_v6.LicenseGetResponse:
+        if self.reference_cache is None:
+            return self.client.get_license()
+        if self.reconciled_at is None:
+            return self.reference_cache.get_license()
+        return self.reference_cache.refresh("license")
+
+    def reconcile(self) -> None:
+        """Read the license now and replace the local tally with its Count."""
+        with self._reconcile_lock:
+            self._reconcile()
+
+    def _reconcile(self) -> None:
+        with self._condition:
+            sent = self.sent
+        envelopes = self._get_license().Envelopes
+        with self._condition:
+            if envelopes is None:
+                self.limit = None
+            else:
+                self.limit = envelopes.Limit
+                self.count = envelopes.Count or 0
+            # The sends committed during the request may be counted twice,
+            # which errs on the safe side until the next reconciliation
+            self.sent -= sent
+            self.reconciled_at = self.clock()
+            self.next_reconcile_at = self.reconciled_at + self.reconcile_seconds
+            self.failures = 0
+            self._publish()
+            self._condition.notify_all()
+
+    def _is_due(self) -> bool:
+        return self.next_reconcile_at is None or self.clock() >= self.next_reconcile_at
+
+    def _reconcile_if_due(self) -> None:
+        if not self._is_due():
+            return
+        # A single thread reconciles, the others go on with the local tally
+        if not self._reconcile_lock.acquire(blocking=False):
+            return
+        try:
+            if self._is_due():
+                self._reconcile()
+        except Exception as e:
+            with self._condition:
+                self.failures += 1
+                backoff = min(
+                    self.retry_seconds * 2 ** (self.failures - 1),
+                    self.reconcile_seconds,
+                )
+                self.next_reconcile_at = self.clock() + backoff
+                # Waiters wake up to wait for the next attempt instead
+                self._condition.notify_all()
+            logger.warning(
+                "Reconciling the license quota failed, retrying in %ss: %r", backoff, e
+            )
+        finally:
+            self._reconcile_lock.release()
+
+    def acquire(self, envelopes: int = 1, timeout: float | None = 0) -> bool:
+        """
+        Reserve envelopes, return False if they are not available in time.
+
+        :param timeout: seconds to wait for reserved envelopes to be released
+            or for a reconciliation to free some, None waits forever
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            # Waiting reconciles too, a lone caller has nobody else to do it
+            self._reconcile_if_due()
+            with self._condition:
+                remaining = self._get_remaining()
+                if remaining is None or remaining >= envelopes:
+                    self.reserved += envelopes
+                    self._publish()
+                    return True
+                now = self.clock()
+                wait = None if deadline is None else deadline - now
+                if wait is not None and wait <= 0:
+                    return False
+                # Past it another thread is reconciling, and notifies when done
+                if self.next_reconcile_at is not None and self.next_reconcile_at > now:
+                    until_reconcile = self.next_reconcile_at - now
+                    wait = (
+                        until_reconcile if wait is None else min(wait, until_reconcile)
+                    )
+                self._condition.wait(wait)
+
+    def commit(self, envelopes: int = 1) -> None:
+        """Count reserved envelopes as sent."""
+        with self._condition:
+            self.reserved -= envelopes
+            self.sent += envelopes
+            self._publish()
+
+    def release(self, envelopes: int = 1) -> None:
+        """Give back reserved envelopes which were not sent."""
+        with self._condition:
+            self.reserved -= envelopes
+            self._publish()
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(
+        self,
+        envelopes: int = 1,
+        timeout: float | None = 0,
+        method_name: str = "send",
+    ) -> Iterator[None]:
+        """
+        Reserve envelopes around a send, committing them unless it fails
+        with an error proving it was not processed (exceptions.is_unprocessed).
+
+        :raises exceptions.ESawQuotaExceededError: if they are not available
+        """
+        if not self.acquire(envelopes, timeout):
+            raise exceptions.ESawQuotaExceededError(
+                method_name, envelopes, self.remaining or 0
+            )
+        try:
+            yield
+        except BaseException as e:
+            if exceptions.is_unprocessed(e):
+                self.release(envelopes)
+            else:
+                # The server may have sent them before failing
+                self.commit(envelopes)
+            raise
+        self.commit(envelopes)
+
+
+def get_envelope_count(call: ClientCall) -> int:
+    """Return the envelopes a send creates, the recipients of a bulk send."""
+    if isinstance(call.request_model, models_v6.EnvelopeBulkSendRequest):
+        return sum(
+            len(activity.Action.SignBulk.BulkRecipients or [])
+            for activity in call.request_model.Activities
+            if activity.Action is not None and activity.Action.SignBulk is not None
+        )
+    return 1
+
+
+class QuotaMiddleware(Middleware):
+    """
+    Refuse the sends the license quota cannot take, without any I/O.
+
+    Sends raise exceptions.ESawQuotaExceededError, which is not retryable,
+    once the quota is exhausted; with a ``timeout`` they first wait that
+    long for reserved envelopes to be freed. A bulk send counts its
+    recipients when the request is given as a model, and one envelope when
+    given as serialized bytes.
+
+        client.add_middleware(QuotaMiddleware(LicenseQuota(client)))
+    """
+
+    def __init__(
+        self,
+        quota: LicenseQuota,
+        endpoints: frozenset[str] | set[str] = SEND_ENDPOINTS,
+        timeout: float | None = 0,
+    ) -> None:
+        self.quota = quota
+        self.endpoints = endpoints
+        self.timeout = timeout
+
+    def __call__(self, call: ClientCall, call_next: Handler) -> Any:
+        if call.endpoint not in self.endpoints:
+            return call_next(call)
+        with self.quota.reserve(
+            get_envelope_count(call), self.timeout, method_name=call.endpoint
+        ):
+            return call_next(call)
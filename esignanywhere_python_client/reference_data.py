@@ -0,0 +1,268 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
+
+from pydantic import BaseModel
+
+from .coalescing import SingleFlight
+from .esign_client import ESignAnyWhereClient
+from .metrics import MetricsSink
+from .models import models_v6
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_CACHE_LOOKUPS = "esaw_reference_cache_lookups_total"
+
+# Cached name -> (client method, response model of the snapshot)
+REFERENCE_DATA: dict[str, tuple[str, type[BaseModel] | None]] = {
+    "license": ("get_license", models_v6.LicenseGetResponse),
+    "teams": ("get_teams", models_v6.TeamGetAllResponse),
+    "version": ("get_version", None),
+    "authorization": ("test_authorization", None),
+    "sealing_certificates": (
+        "get_sealing_certificates",
+        models_v6.SealingCertificateGetAllResponse,
+    ),
+    "automatic_profiles": (
+        "get_automatic_profiles",
+        models_v6.AutomaticProfileGetAllResponse,
+    ),
+}
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    value: Any
+    fetched_at: float
+    # Error of the last refresh, the value is the previous one then
+    error: BaseException | None = None
+
+
+class ReferenceDataCache:
+    """
+    TTL cache of the slowly changing data of the account.
+
+    ``get`` returns the cached value of one of the REFERENCE_DATA names
+    while it is younger than its TTL (``ttl``, or its own in ``ttls``), and
+    fetches it otherwise; concurrent fetches of a name are collapsed into
+    one. A failed fetch serves the previous value, however old, unless
+    ``stale_if_error`` is False.
+
+    ``start`` refreshes the values in a background thread before they
+    expire, so ``get`` hardly ever waits on the API. With a
+    ``snapshot_path`` the values are saved after every fetch and loaded at
+    creation, so a short lived worker starts from the snapshot instead of
+    calling the API: values younger than their TTL are used as they are.
+
+        cache = ReferenceDataCache(client, ttl=600, snapshot_path="esaw.json")
+        cache.start()
+        license = cache.get_license()
+    """
+
+    def __init__(
+        self,
+        client: ESignAnyWhereClient,
+        ttl: float = 300.0,
+        ttls: dict[str, float] | None = None,
+        refresh_ratio: float = 0.75,
+        snapshot_path: str | None = None,
+        stale_if_error: bool = True,
+        metrics_sink: MetricsSink | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.refresh_ratio = refresh_ratio
+        self.snapshot_path = snapshot_path
+        self.stale_if_error = stale_if_error
+        self.metrics = metrics_sink or MetricsSink()
+        self.clock = clock
+        self.entries: dict[str, CacheEntry] = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        if snapshot_path is not None and os.path.exists(snapshot_path):
+            try:
+                self.load_snapshot()
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(
+                    "Ignoring the unreadable snapshot %s: %r", snapshot_path, e
+                )
+
+    def get_ttl(self, name: str) -> float:
+        return self.ttls.get(name, self.ttl)
+
+    def _count(self, name: str, result: str) -> None:
+        if self.metrics.enabled:
+            self.metrics.increment(
+                REFERENCE_CACHE_LOOKUPS, labels={"data": name, "result": result}
+            )
+
+    def get(self, name: str) -> Any:
+        """
+        Return the value of name, fetching it if missing or expired.
+
+        :raises KeyError: for a name not in REFERENCE_DATA
+        :raises Exception: the fetch error, when there is no value to fall back on
+        """
+        if name not in REFERENCE_DATA:
+            raise KeyError(name)
+        entry = self.entries.get(name)
+        if entry is not None and self.clock() - entry.fetched_at < self.get_ttl(name):
+            self._count(name, "hit")
+            return entry.value
+        self._count(name, "miss")
+        return self._flight.do(name, lambda: self.refresh(name))[0]
+
+    def refresh(self, name: str) -> Any:
+        """Fetch the value of name now and return it."""
+        method, _ = REFERENCE_DATA[name]
+        try:
+            value = getattr(self.client, method)()
+        except Exception as e:
+            with self._lock:
+                entry = self.entries.get(name)
+                if entry is None or not self.stale_if_error:
+                    raise
+                entry.error = e
+            logger.warning("Refreshing %s failed, serving the cached one: %r", name, e)
+            self._count(name, "stale")
+            return entry.value
+        with self._lock:
+            self.entries[name] = CacheEntry(value, self.clock())
+        if self.snapshot_path is not None:
+            self.save_snapshot()
+        return value
+
+    def invalidate(self, name: str | None = None) -> None:
+        """Drop the value of name, or every value."""
+        with self._lock:
+            if name is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(name, None)
+
+    def get_license(self) -> models_v6.LicenseGetResponse:
+        return self.get("license")
+
+    def get_teams(self) -> models_v6.TeamGetAllResponse:
+        return self.get("teams")
+
+    def get_version(self) -> dict[str, Any] | None:
+        return self.get("version")
+
+    def test_authorization(self) -> str:
+        return self.get("authorization")
+
+    def get_sealing_certificates(self) -> models_v6.SealingCertificateGetAllResponse:
+        return self.get("sealing_certificates")
+
+    def get_automatic_profiles(self) -> models_v6.AutomaticProfileGetAllResponse:
+        return self.get("automatic_profiles")
+
+    def refresh_due(self) -> list[str]:
+        """Refresh the values past ``refresh_ratio`` of their TTL, return their names."""
+        now = self.clock()
+        due = [
+            name
+            for name, entry in list(self.entries.items())
+            if now - entry.fetched_at >= self.get_ttl(name) * self.refresh_ratio
+        ]
+        for name in due:
+            try:
+                self._flight.do(name, partial(self.refresh, name))
+            except Exception as e:
+                logger.warning("Refreshing %s failed: %r", name, e)
+        return due
+
+    def start(self, interval: float | None = None) -> None:
+        """
+        Refresh the cached values in a daemon thread until ``stop``.
+
+        :param interval: seconds between checks, by default a tenth of the
+            shortest TTL
+        """
+        if self._thread is not None:
+            return
+        interval = interval or min([self.ttl, *self.ttls.values()]) / 10
+        self._stopped.clear()
+
+        def run() -> None:
+            while not self._stopped.wait(interval):
+                self.refresh_due()
+
+        self._thread = threading.Thread(
+            target=run, name="esaw-reference-data", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def save_snapshot(self) -> None:
+        """Write the cached values atomically to the snapshot path, if any."""
+        if self.snapshot_path is None:
+            return
+        with self._lock:
+            data = {
+                name: {
+                    "fetched_at": entry.fetched_at,
+                    "value": (
+                        entry.value.model_dump(mode="json")
+                        if isinstance(entry.value, BaseModel)
+                        else entry.value
+                    ),
+                }
+                for name, entry in self.entries.items()
+            }
+        # A unique name in the same directory, workers can share the snapshot
+        with tempfile.NamedTemporaryFile(
+            "w",
+            dir=os.path.dirname(os.path.abspath(self.snapshot_path)),
+            prefix=f"{os.path.basename(self.snapshot_path)}.",
+            suffix=".tmp",
+            delete=False,
+        ) as snapshot_file:
+            try:
+                json.dump(data, snapshot_file)
+            except BaseException:
+                snapshot_file.close()
+                os.remove(snapshot_file.name)
+                raise
+        os.replace(snapshot_file.name, self.snapshot_path)
+
+    def load_snapshot(self) -> None:
+        """
+        Load the values of the snapshot path, keeping their fetch time.
+
+        :raises ValueError: for a corrupt snapshot, nothing is loaded then
+        """
+        if self.snapshot_path is None:
+            return
+        with open(self.snapshot_path) as snapshot_file:
+            data = json.load(snapshot_file)
+        if not isinstance(data, dict):
+            raise ValueError(f"Expected a JSON object in {self.snapshot_path}")
+        entries = {}
+        for name, saved in data.items():
+            if name not in REFERENCE_DATA:
+                continue
+            model = REFERENCE_DATA[name][1]
+            value = saved["value"]
+            if model is not None and value is not None:
+                value = model.model_validate(value)
+            entries[name] = CacheEntry(value, float(saved["fetched_at"]))
+        with self._lock:
+            self.entries.update(entries)
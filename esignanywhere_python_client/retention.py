@@ -0,0 +1,371 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from .batch import BatchOutcome, BatchRunner
+from .esign_client import ESignAnyWhereClient
+from .models import models_v6
+
+logger = logging.getLogger(__name__)
+
+DELETED = "deleted"
+ALREADY_DELETED = "already_deleted"
+# In the manifest of a run which crashed before checkpointing it
+ALREADY_LISTED = "already_listed"
+
+
+def has_metadata(**expected: Any) -> Callable[[models_v6.EnvelopeFindEnvelope], bool]:
+    """
+    Return a predicate matching the envelopes whose JSON MetaData has the
+    expected values, envelopes without JSON object MetaData never match.
+
+        RetentionPolicy(365, predicate=has_metadata(Retention="standard"))
+    """
+
+    def predicate(envelope: models_v6.EnvelopeFindEnvelope) -> bool:
+        try:
+            metadata = json.loads(envelope.MetaData or "")
+        except ValueError:
+            return False
+        return isinstance(metadata, dict) and all(
+            metadata.get(key) == value for key, value in expected.items()
+        )
+
+    return predicate
+
+
+@dataclass(slots=True)
+class RetentionPolicy:
+    """
+    Which envelopes are purged.
+
+    :param older_than_days: days the envelopes must have been in their
+        status for (InStatusSinceDays)
+    :param statuses: statuses of the envelopes purged, models_v6.Status1 values
+    :param lookback_days: how far back before older_than_days envelopes are
+        searched in windows, by sending date, the envelopes sent before are
+        searched first with one query starting at earliest
+    :param earliest: sending date of the oldest envelopes searched
+    :param predicate: purges only the envelopes for which it returns True,
+        evaluated locally on the found envelopes (e.g. has_metadata())
+    """
+
+    older_than_days: int
+    statuses: tuple[str, ...] = (models_v6.Status1.Completed.value,)
+    lookback_days: int = 365
+    earliest: datetime = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    predicate: Callable[[models_v6.EnvelopeFindEnvelope], bool] | None = None
+
+    def matches(self, envelope: models_v6.EnvelopeFindEnvelope) -> bool:
+        return envelope.Status in self.statuses and (
+            self.predicate is None or self.predicate(envelope)
+        )
+
+
+class PurgeManifest:
+    """
+    The envelopes purged by a run, as JSON lines signed off at the end.
+
+    Each purged envelope is appended as soon as it is deleted, and feeds a
+    running SHA-256 digest, or HMAC-SHA256 when a key is given. ``sign_off``
+    appends a last line with the totals and the signature of every line
+    before it; reopening the manifest to resume a run drops that line and
+    carries on after the envelopes already listed, which ``in`` tells apart.
+    """
+
+    def __init__(self, path: str, key: bytes | None = None) -> None:
+        self.path = path
+        self.key = key
+        self.count = 0
+        self.envelope_ids: set[str] = set()
+        self._digest = self._new_digest(key)
+        lines = []
+        if os.path.exists(path):
+            with open(path, "rb") as manifest_file:
+                lines = [
+                    line
+                    for line in manifest_file
+                    if line.endswith(b"\n") and not line.startswith(b'{"signed_off"')
+                ]
+            temporary_path = f"{path}.tmp"
+            with open(temporary_path, "wb") as manifest_file:
+                manifest_file.writelines(lines)
+            os.replace(temporary_path, path)
+        for line in lines:
+            self._digest.update(line)
+            self.envelope_ids.add(json.loads(line)["EnvelopeId"])
+        self.count = len(lines)
+        self._file = open(path, "ab")
+
+    @staticmethod
+    def _new_digest(key: bytes | None) -> Any:
+        if key is None:
+            return hashlib.sha256()
+        return hmac.new(key, digestmod=hashlib.sha256)
+
+    def add(self, envelope: models_v6.EnvelopeFindEnvelope, result: str) -> None:
+        line = (
+            json.dumps(
+                {
+                    "EnvelopeId": envelope.Id,
+                    "Name": envelope.Name,
+                    "Status": envelope.Status,
+                    "result": result,
+                    "at": datetime.now(timezone.utc).isoformat(),
+                }
+            )
+            + "\n"
+        ).encode()
+        self._digest.update(line)
+        self._file.write(line)
+        self._file.flush()
+        self.count += 1
+        if envelope.Id is not None:
+            self.envelope_ids.add(envelope.Id)
+
+    def __contains__(self, envelope_id: object) -> bool:
+        return envelope_id in self.envelope_ids
+
+    def sign_off(self, **summary: Any) -> str:
+        """Append the signature line and close the manifest, return the signature."""
+        signature = self._digest.hexdigest()
+        signed_off = {
+            **summary,
+            "entries": self.count,
+            "algorithm": "sha256" if self.key is None else "hmac-sha256",
+            "signature": signature,
+        }
+        self._file.write((json.dumps({"signed_off": signed_off}) + "\n").encode())
+        self.close()
+        return signature
+
+    def close(self) -> None:
+        self._file.close()
+
+    @classmethod
+    def verify(cls, path: str, key: bytes | None = None) -> bool:
+        """Return True if the manifest at path is signed off and unaltered."""
+        digest = cls._new_digest(key)
+        with open(path, "rb") as manifest_file:
+            lines = manifest_file.readlines()
+        if not lines or not lines[-1].startswith(b'{"signed_off"'):
+            return False
+        for line in lines[:-1]:
+            digest.update(line)
+        signed_off = json.loads(lines[-1])["signed_off"]
+        return signed_off["entries"] == len(lines) - 1 and hmac.compare_digest(
+            signed_off["signature"], digest.hexdigest()
+        )
+
+
+@dataclass(slots=True)
+class PurgeReport:
+    found: int = 0
+    filtered_out: int = 0
+    # Skipped because the checkpoint has them
+    skipped: int = 0
+    deleted: int = 0
+    already_deleted: int = 0
+    # Listed in the manifest by a run which crashed before checkpointing them
+    already_listed: int = 0
+    failed: list[BatchOutcome] = field(default_factory=list)
+    # The find_envelope queries which failed, their envelopes were not purged
+    failed_queries: list[BatchOutcome] = field(default_factory=list)
+    signature: str | None = None
+
+
+class PurgeEngine:
+    """
+    Delete the envelopes a RetentionPolicy selects, in parallel and rate limited.
+
+    Candidates are streamed one sending date window of ``window_days`` at a
+    time, oldest first, with a find_envelope query per status of the policy
+    (the first one covering everything sent before lookback_days), filtered
+    locally with its predicate. They are deleted through a BatchRunner from
+    ``max_workers`` threads at most ``rate`` calls per second, so only a
+    window and the deletions in flight are held in memory.
+
+    A deletion failing is checked against the envelope history: an
+    envelope whose EnvelopeHasBeenDeleted is set was already deleted, by a
+    previous run or someone else, and only that one extra call is spent on
+    it. With a ``checkpoint_path`` a run can be resumed without deleting
+    again, and with a ``manifest_path`` the envelopes deleted are listed in
+    a PurgeManifest signed off (with ``manifest_key``) at the end of the run.
+    An envelope is listed in the manifest before the checkpoint records it,
+    and the envelopes of a manifest being resumed are not deleted again, so
+    a crash in between neither leaves one unlisted nor lists it twice.
+
+        engine = PurgeEngine(
+            client,
+            RetentionPolicy(older_than_days=3650),
+            checkpoint_path="purge.checkpoint",
+            manifest_path="purge.manifest",
+            rate=20,
+        )
+        report = engine.purge()
+    """
+
+    def __init__(
+        self,
+        client: ESignAnyWhereClient,
+        policy: RetentionPolicy,
+        checkpoint_path: str | None = None,
+        manifest_path: str | None = None,
+        manifest_key: bytes | None = None,
+        window_days: int = 7,
+        max_workers: int = 8,
+        rate: float | None = None,
+        burst: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.client = client
+        self.policy = policy
+        self.checkpoint_path = checkpoint_path
+        self.manifest_path = manifest_path
+        self.manifest_key = manifest_key
+        self.window_days = window_days
+        self.clock = clock
+        self.runner = BatchRunner(
+            client, max_workers=max_workers, rate=rate, burst=burst
+        )
+
+    def get_queries(self) -> Iterator[models_v6.EnvelopeFindRequest]:
+        """
+        Yield the find_envelope queries of the candidates, oldest first.
+
+        The envelopes sent before lookback_days are not left out: they are
+        all searched with the first query of every status.
+        """
+        # Envelopes were sent before they got their status
+        newest = datetime.fromtimestamp(self.clock(), timezone.utc) - timedelta(
+            days=self.policy.older_than_days
+        )
+        oldest = newest - timedelta(days=self.policy.lookback_days)
+        windows: list[tuple[datetime, datetime]] = []
+        if self.policy.earliest < oldest:
+            windows.append((self.policy.earliest, oldest))
+        start = oldest
+        while start < newest:
+            end = min(start + timedelta(days=self.window_days), newest)
+            windows.append((start, end))
+            start = end
+        for start, end in windows:
+            for status in self.policy.statuses:
+                yield models_v6.EnvelopeFindRequest.model_validate(
+                    {
+                        "StartDate": start,
+                        "EndDate": end,
+                        "Status": status,
+                        "InStatusSinceDays": self.policy.older_than_days,
+                    }
+                )
+
+    def iter_candidates(
+        self, report: PurgeReport | None = None
+    ) -> Iterator[models_v6.EnvelopeFindEnvelope]:
+        """Yield the envelopes the policy selects, window by window."""
+        report = report if report is not None else PurgeReport()
+        for query in self.get_queries():
+            outcome = self.runner.run_one(
+                self.client.find_envelope,
+                f"{query.Status}:{query.EndDate}",
+                query,
+                endpoint="find_envelope",
+                idempotent=True,
+            )
+            if not outcome.ok:
+                logger.warning("Purge query %s failed: %r", outcome.key, outcome.error)
+                report.failed_queries.append(outcome)
+                continue
+            for envelope in outcome.result.Envelopes or []:
+                report.found += 1
+                if envelope.Id is not None and self.policy.matches(envelope):
+                    yield envelope
+                else:
+                    report.filtered_out += 1
+
+    def _delete(self, envelope: models_v6.EnvelopeFindEnvelope) -> str:
+        if envelope.Id is None:
+            raise ValueError("The envelope has no Id")
+        try:
+            self.client.delete_envelope(envelope.Id)
+        except Exception:
+            try:
+                history = self.client.get_envelope_history(envelope.Id)
+            except Exception:
+                history = None
+            if history is not None and history.EnvelopeHasBeenDeleted:
+                return ALREADY_DELETED
+            raise
+        return DELETED
+
+    def purge(self, dry_run: bool = False) -> PurgeReport:
+        """
+        Delete the candidates and return what was done.
+
+        :param dry_run: only find and filter the candidates, deleting nothing
+        """
+        report = PurgeReport()
+        candidates = self.iter_candidates(report)
+        if dry_run:
+            for _ in candidates:
+                pass
+            return report
+
+        manifest = (
+            PurgeManifest(self.manifest_path, self.manifest_key)
+            if self.manifest_path is not None
+            else None
+        )
+
+        def delete(envelope: models_v6.EnvelopeFindEnvelope) -> str:
+            if manifest is not None and envelope.Id in manifest:
+                return ALREADY_LISTED
+            return self._delete(envelope)
+
+        def record(outcome: BatchOutcome) -> None:
+            # Listed in the manifest before the checkpoint skips it on resume
+            if not outcome.ok:
+                report.failed.append(outcome)
+                return
+            if outcome.result == ALREADY_LISTED:
+                report.already_listed += 1
+                return
+            if outcome.result == DELETED:
+                report.deleted += 1
+            else:
+                report.already_deleted += 1
+            if manifest is not None:
+                manifest.add(outcome.item, outcome.result)
+
+        try:
+            for _ in self.runner.run(
+                candidates,
+                delete,
+                key=lambda envelope: envelope.Id,
+                checkpoint_path=self.checkpoint_path,
+                endpoint="delete_envelope",
+                on_outcome=record,
+            ):
+                pass
+            report.skipped = self.runner.skipped
+        except BaseException:
+            if manifest is not None:
+                manifest.close()
+            raise
+        if manifest is not None:
+            report.signature = manifest.sign_off(
+                older_than_days=self.policy.older_than_days,
+                statuses=list(self.policy.statuses),
+                failed=len(report.failed),
+                failed_queries=len(report.failed_queries),
+                finished_at=datetime.now(timezone.utc).isoformat(),
+            )
+        return report
@@ -0,0 +1,181 @@
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from .metrics import MetricsSink
+from .middleware import ClientCall, Handler, Middleware
+
+INTERACTIVE = "interactive"
+DEFAULT = "default"
+BATCH = "batch"
+DEFAULT_WEIGHTS = {INTERACTIVE: 16.0, DEFAULT: 4.0, BATCH: 1.0}
+
+SCHEDULER_QUEUE_DEPTH = "esaw_scheduler_queue_depth"
+SCHEDULER_WAIT = "esaw_scheduler_wait_seconds"
+
+_priority: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "esaw_priority", default=None
+)
+
+
+@contextmanager
+def priority(name: str) -> Iterator[None]:
+    """
+    Send the calls made within the block with the given priority class.
+
+        with priority(BATCH):
+            for envelope_id in envelope_ids:
+                client.download_completed_document(envelope_id)
+    """
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def get_priority() -> str | None:
+    """Return the priority class set by the enclosing priority block, if any."""
+    return _priority.get()
+
+
+class WeightedFairScheduler:
+    """
+    Share ``max_concurrency`` slots between priority classes.
+
+    Waiting calls are served by weighted fair queuing: every call is tagged
+    with a virtual finish time advancing by ``1 / weight`` of its class, and
+    free slots go to the lowest tag. A class with a weight 16 times higher
+    gets 16 times more slots while both are waiting, and a class alone takes
+    all of them, so batch calls use the capacity left by interactive ones
+    without ever being starved.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        weights: dict[str, float] | None = None,
+        metrics_sink: MetricsSink | None = None,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.metrics = metrics_sink or MetricsSink()
+        self.in_flight = 0
+        self._queue: list[tuple[float, int, str]] = []
+        self._depths = dict.fromkeys(self.weights, 0)
+        self._finish_tags = dict.fromkeys(self.weights, 0.0)
+        self._virtual_time = 0.0
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def queue_depth(self, name: str | None = None) -> int:
+        """Return the calls waiting in a priority class, or in all of them."""
+        with self._condition:
+            if name is None:
+                return len(self._queue)
+            return self._depths.get(name, 0)
+
+    def _set_depth(self, name: str) -> None:
+        if self.metrics.enabled:
+            self.metrics.set_gauge(
+                SCHEDULER_QUEUE_DEPTH, self._depths[name], {"priority": name}
+            )
+
+    def acquire(self, name: str = DEFAULT) -> float:
+        """Wait for a slot in the priority class name; return the time waited."""
+        if name not in self.weights:
+            raise ValueError(f"Unknown priority class {name!r}")
+        started = time.perf_counter()
+        with self._condition:
+            tag = max(self._virtual_time, self._finish_tags[name]) + (
+                1 / self.weights[name]
+            )
+            self._finish_tags[name] = tag
+            entry = (tag, next(self._sequence), name)
+            heapq.heappush(self._queue, entry)
+            self._depths[name] += 1
+            self._set_depth(name)
+            try:
+                self._condition.wait_for(
+                    lambda: self._queue[0] is entry
+                    and self.in_flight < self.max_concurrency
+                )
+            except BaseException:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._depths[name] -= 1
+                self._set_depth(name)
+                self._condition.notify_all()
+                raise
+            heapq.heappop(self._queue)
+            self._depths[name] -= 1
+            self._set_depth(name)
+            self._virtual_time = tag
+            self.in_flight += 1
+            # The next waiting call may be allowed to go as well
+            self._condition.notify_all()
+        waited = time.perf_counter() - started
+        if self.metrics.enabled:
+            self.metrics.observe(SCHEDULER_WAIT, waited, {"priority": name})
+        return waited
+
+    def release(self) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, name: str = DEFAULT) -> Iterator[float]:
+        waited = self.acquire(name)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+
+class SchedulerMiddleware(Middleware):
+    """
+    Queue the calls of a shared client by priority class before sending them.
+
+    The priority class of a call is taken from ``call.extras["priority"]``,
+    then from the enclosing ``priority()`` block, then from ``endpoints``
+    (a mapping of client methods to classes), and defaults to ``default``.
+    Add it last, so that it sits right in front of the transport:
+
+        client.add_middleware(
+            SchedulerMiddleware(
+                WeightedFairScheduler(max_concurrency=8),
+                endpoints={"get_envelope_viewer_links": INTERACTIVE},
+            )
+        )
+    """
+
+    def __init__(
+        self,
+        scheduler: WeightedFairScheduler | None = None,
+        endpoints: dict[str, str] | None = None,
+        default: str = DEFAULT,
+    ) -> None:
+        self.scheduler = scheduler or WeightedFairScheduler()
+        self.endpoints = endpoints or {}
+        self.default = default
+
+    def get_priority(self, call: ClientCall) -> str:
+        return (
+            call.extras.get("priority")
+            or get_priority()
+            or self.endpoints.get(call.endpoint)
+            or self.default
+        )
+
+    def __call__(self, call: ClientCall, call_next: Handler) -> Any:
+        name = self.get_priority(call)
+        with self.scheduler.slot(name) as waited:
+            call.extras["priority"] = name
+            call.extras["queue_wait"] = waited
+            return call_next(call)
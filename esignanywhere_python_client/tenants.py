@@ -0,0 +1,276 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .esign_client import ESignAnyWhereClient
+from .metrics import MetricsSink
+from .middleware import Middleware
+from .models import models_v6
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Tenant:
+    """An organization of eSignAnyWhere managed through the pool."""
+
+    tenant_id: str
+    api_token: str
+    api_domain: str
+
+
+@dataclass(slots=True)
+class TenantResult:
+    """Outcome of a fan-out call for one tenant: its result or its error."""
+
+    tenant_id: str
+    result: Any = None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(slots=True)
+class TenantEnvelope:
+    tenant_id: str
+    envelope: models_v6.EnvelopeFindEnvelope
+
+
+class TenantClientPool:
+    """
+    Clients of many eSignAnyWhere organizations sharing their connections.
+
+    Clients are built on first use, each with a requests.Session of its own
+    so cookies never cross tenants, and share the connections of one
+    HTTPAdapter per api_domain. The middlewares returned by
+    ``middleware_factory`` (rate limiters, circuit breakers, caches, ...)
+    are built for each tenant and thus never shared. Clients unused for
+    ``idle_seconds`` are evicted, as are the least recently used ones
+    beyond ``max_clients``, closing their middlewares; they are built
+    again, with fresh middlewares, on their next use.
+
+        pool = TenantClientPool(
+            middleware_factory=lambda tenant_id: [CircuitBreakerMiddleware()]
+        )
+        pool.register("acme", acme_token)
+        pool.get("acme").get_envelope(envelope_id)
+    """
+
+    def __init__(
+        self,
+        is_test_env: bool = True,
+        middleware_factory: Callable[[str], list[Middleware]] | None = None,
+        metrics_sink: MetricsSink | None = None,
+        idle_seconds: float = 600.0,
+        max_clients: int | None = None,
+        pool_maxsize: int = 32,
+        clock: Callable[[], float] = time.monotonic,
+        **client_options: Any,
+    ) -> None:
+        self.is_test_env = is_test_env
+        self.middleware_factory = middleware_factory
+        self.metrics = metrics_sink
+        self.idle_seconds = idle_seconds
+        self.max_clients = max_clients
+        self.pool_maxsize = pool_maxsize
+        self.clock = clock
+        self.client_options = client_options
+        self.tenants: dict[str, Tenant] = {}
+        self._clients: OrderedDict[str, tuple[ESignAnyWhereClient, float]] = (
+            OrderedDict()
+        )
+        self._adapters: dict[str, HTTPAdapter] = {}
+        self._last_sweep = clock()
+        self._lock = threading.Lock()
+
+    def register(
+        self, tenant_id: str, api_token: str, api_domain: str | None = None
+    ) -> Tenant:
+        """Add or update a tenant; an existing client of it is dropped."""
+        if api_domain is None:
+            api_domain = ESignAnyWhereClient._get_api_domain(
+                is_test_env=self.is_test_env
+            )
+        tenant = Tenant(tenant_id, api_token, api_domain)
+        with self._lock:
+            self.tenants[tenant_id] = tenant
+            entry = self._clients.pop(tenant_id, None)
+        if entry is not None:
+            self._close_clients([entry[0]])
+        return tenant
+
+    def unregister(self, tenant_id: str) -> None:
+        with self._lock:
+            self.tenants.pop(tenant_id, None)
+            entry = self._clients.pop(tenant_id, None)
+        if entry is not None:
+            self._close_clients([entry[0]])
+
+    def get_adapter(self, api_domain: str) -> HTTPAdapter:
+        """Return the adapter whose connections the clients of api_domain share."""
+        with self._lock:
+            return self._get_adapter(api_domain)
+
+    def _get_adapter(self, api_domain: str) -> HTTPAdapter:
+        adapter = self._adapters.get(api_domain)
+        if adapter is None:
+            adapter = self._adapters[api_domain] = HTTPAdapter(
+                pool_maxsize=self.pool_maxsize
+            )
+        return adapter
+
+    def _new_session(self, api_domain: str) -> requests.Session:
+        session = requests.Session()
+        adapter = self._get_adapter(api_domain)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @staticmethod
+    def _close_clients(clients: Iterable[ESignAnyWhereClient]) -> None:
+        # Their sessions are left open, closing them closes the shared adapter
+        for client in clients:
+            for middleware in client.middlewares:
+                try:
+                    middleware.close()
+                except Exception as e:
+                    logger.warning(
+                        "Closing the middleware %r failed: %r", middleware, e
+                    )
+
+    def get(self, tenant_id: str) -> ESignAnyWhereClient:
+        """Return the client of a registered tenant, building it if needed."""
+        evicted: list[ESignAnyWhereClient] = []
+        try:
+            with self._lock:
+                now = self.clock()
+                if now - self._last_sweep >= self.idle_seconds:
+                    evicted.extend(self._evict_idle(now).values())
+                entry = self._clients.get(tenant_id)
+                if entry is not None:
+                    client = entry[0]
+                    self._clients.move_to_end(tenant_id)
+                else:
+                    try:
+                        tenant = self.tenants[tenant_id]
+                    except KeyError:
+                        raise KeyError(f"Unknown tenant {tenant_id!r}") from None
+                    client = ESignAnyWhereClient(
+                        api_token=tenant.api_token,
+                        api_domain=tenant.api_domain,
+                        metrics_sink=self.metrics,
+                        middlewares=(
+                            self.middleware_factory(tenant_id)
+                            if self.middleware_factory is not None
+                            else None
+                        ),
+                        session=self._new_session(tenant.api_domain),
+                        **self.client_options,
+                    )
+                self._clients[tenant_id] = (client, now)
+                if self.max_clients is not None:
+                    while len(self._clients) > self.max_clients:
+                        evicted.append(self._clients.popitem(last=False)[1][0])
+                return client
+        finally:
+            self._close_clients(evicted)
+
+    def evict_idle(self) -> list[str]:
+        """Drop the clients unused for idle_seconds; return their tenant ids."""
+        with self._lock:
+            evicted = self._evict_idle(self.clock())
+        self._close_clients(evicted.values())
+        return list(evicted)
+
+    def _evict_idle(self, now: float) -> dict[str, ESignAnyWhereClient]:
+        self._last_sweep = now
+        evicted = {}
+        # Least recently used first, stop at the first client still in use
+        for tenant_id, (client, last_used) in list(self._clients.items()):
+            if now - last_used < self.idle_seconds:
+                break
+            del self._clients[tenant_id]
+            evicted[tenant_id] = client
+        return evicted
+
+    def __len__(self) -> int:
+        """Return the number of clients currently built."""
+        return len(self._clients)
+
+    def map(
+        self,
+        function: Callable[[ESignAnyWhereClient], Any],
+        tenant_ids: Iterable[str] | None = None,
+        max_workers: int = 16,
+    ) -> list[TenantResult]:
+        """
+        Call function with the client of every tenant in parallel.
+
+        An error of one tenant does not stop the others: it is returned in
+        its TenantResult, results keep the order of tenant_ids.
+        """
+        tenant_ids = list(self.tenants if tenant_ids is None else tenant_ids)
+
+        def run(tenant_id: str) -> TenantResult:
+            try:
+                return TenantResult(tenant_id, result=function(self.get(tenant_id)))
+            except Exception as e:
+                return TenantResult(tenant_id, error=e)
+
+        if not tenant_ids:
+            return []
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(tenant_ids)),
+            thread_name_prefix="esaw-tenant",
+        ) as executor:
+            return list(executor.map(run, tenant_ids))
+
+    def find_envelope(
+        self,
+        descriptor: models_v6.EnvelopeFindRequest,
+        tenant_ids: Iterable[str] | None = None,
+        version: str = "v6",
+        max_workers: int = 16,
+    ) -> tuple[list[TenantEnvelope], dict[str, BaseException]]:
+        """
+        Search envelopes in every tenant and merge the results.
+
+        :param descriptor: models_v6.EnvelopeFindRequest sent to each tenant
+        :return: the envelopes found and the errors by tenant id
+        """
+        envelopes: list[TenantEnvelope] = []
+        errors: dict[str, BaseException] = {}
+        for outcome in self.map(
+            lambda client: client.find_envelope(descriptor, version=version),
+            tenant_ids,
+            max_workers=max_workers,
+        ):
+            if outcome.error is not None:
+                errors[outcome.tenant_id] = outcome.error
+                continue
+            envelopes.extend(
+                TenantEnvelope(outcome.tenant_id, envelope)
+                for envelope in outcome.result.Envelopes or []
+            )
+        return envelopes, errors
+
+    def close(self) -> None:
+        """Drop every client, closing their middlewares and the shared adapters."""
+        with self._lock:
+            clients = [client for client, _ in self._clients.values()]
+            self._clients.clear()
+            adapters = list(self._adapters.values())
+            self._adapters.clear()
+        self._close_clients(clients)
+        for adapter in adapters:
+            adapter.close()
@@ -67,5 +67,6 @@ setup(
         "Natural Language :: English",
         "Programming Language :: Python :: 3.11",
         "Programming Language :: Python :: 3.14",
+        "Programming Language :: Python :: Free Threading :: 2 - Beta",
     ],
 )
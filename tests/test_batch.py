@@ -0,0 +1,218 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from esignanywhere_python_client.batch import BatchCheckpoint, BatchRunner
+from esignanywhere_python_client.concurrency import RateLimiter
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.metrics import RETRIES, InMemoryMetricsSink
+from esignanywhere_python_client.models import models_v6
+
+from .utils import make_response
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_waits_for_tokens(self):
+        now = [0.0]
+        sleeps = []
+        limiter = RateLimiter(
+            rate=2, burst=2, clock=lambda: now[0], sleep=sleeps.append
+        )
+        self.assertEqual(limiter.acquire(), 0.0)
+        self.assertEqual(limiter.acquire(), 0.0)
+        self.assertEqual(limiter.acquire(), 0.5)
+        self.assertEqual(limiter.acquire(), 1.0)
+        self.assertEqual(sleeps, [0.5, 1.0])
+
+        now[0] = 10.0
+        self.assertEqual(limiter.acquire(), 0.0)
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.client = ESignAnyWhereClient("token", "", is_test_env=True)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint_path = os.path.join(directory.name, "job.jsonl")
+
+    def get_envelope_ids(self, mock_request):
+        return sorted(
+            call.kwargs["json"]["EnvelopeId"] for call in mock_request.call_args_list
+        )
+
+    @mock.patch("requests.request")
+    def test_cancel_envelopes(self, mock_request):
+        mock_request.return_value = make_response(content=b"")
+        runner = BatchRunner(self.client, max_workers=2)
+        items = ["a", "b", models_v6.EnvelopeCancelRequest(EnvelopeId="c")]
+
+        outcomes = list(runner.cancel_envelopes(items))
+
+        self.assertEqual(sorted(outcome.key for outcome in outcomes), ["a", "b", "c"])
+        self.assertTrue(all(outcome.ok for outcome in outcomes))
+        self.assertEqual(self.get_envelope_ids(mock_request), ["a", "b", "c"])
+        for call in mock_request.call_args_list:
+            self.assertTrue(call.kwargs["url"].endswith("v6/envelope/cancel"))
+
+    @mock.patch("requests.request")
+    def test_remind_envelopes_returns_responses(self, mock_request):
+        mock_request.return_value = make_response(json_data={})
+        runner = BatchRunner(self.client)
+
+        (outcome,) = runner.remind_envelopes(["a"])
+
+        self.assertIsInstance(outcome.result, models_v6.EnvelopeRemindResponse)
+
+    @mock.patch("requests.request")
+    def test_restart_envelopes_expiration_days(self, mock_request):
+        mock_request.return_value = make_response(content=b"")
+        runner = BatchRunner(self.client)
+
+        list(runner.restart_envelopes_expiration_days(["a"], expiration_in_seconds=60))
+        list(
+            runner.restart_envelopes_expiration_days(
+                ["b"], expiration_date=datetime(2030, 1, 2, tzinfo=timezone.utc)
+            )
+        )
+
+        first, second = (call.kwargs["json"] for call in mock_request.call_args_list)
+        self.assertEqual(first["EnvelopeId"], "a")
+        self.assertEqual(first["ExpirationInSecondsAfterSending"], 60)
+        self.assertTrue(second["ExpirationDate"].startswith("2030-01-02T00:00:00"))
+
+    @mock.patch("requests.request")
+    def test_failures_are_outcomes(self, mock_request):
+        def request(method, json=None, **kwargs):
+            if json["EnvelopeId"] == "b":
+                return make_response(status_code=400, json_data={"Message": "no"})
+            return make_response(content=b"")
+
+        mock_request.side_effect = request
+        runner = BatchRunner(self.client)
+
+        outcomes = {outcome.key: outcome for outcome in runner.delete_envelopes("abc")}
+
+        self.assertTrue(outcomes["a"].ok)
+        self.assertFalse(outcomes["b"].ok)
+        self.assertEqual(outcomes["b"].attempts, 1)
+        self.assertTrue(outcomes["c"].ok)
+
+    @mock.patch("requests.request")
+    def test_retries_unprocessed_errors(self, mock_request):
+        mock_request.side_effect = [
+            make_response(status_code=503, headers={"Retry-After": "1"}),
+            make_response(content=b""),
+        ]
+        sleeps = []
+        sink = InMemoryMetricsSink()
+        client = ESignAnyWhereClient("token", "", is_test_env=True, metrics_sink=sink)
+        runner = BatchRunner(client, sleep=sleeps.append)
+
+        (outcome,) = runner.delete_envelopes(["a"])
+
+        self.assertTrue(outcome.ok)
+        self.assertEqual(outcome.attempts, 2)
+        self.assertEqual(len(sleeps), 1)
+        self.assertEqual(
+            sink.get_counter(
+                RETRIES,
+                endpoint="delete_envelope",
+                version="v6",
+                reason="ESawTransientError",
+            ),
+            1,
+        )
+
+    @mock.patch("requests.request")
+    def test_retries_only_idempotent_operations_after_processing(self, mock_request):
+        mock_request.side_effect = [
+            make_response(status_code=503),
+            make_response(status_code=503),
+            make_response(json_data={"Envelopes": []}),
+        ]
+        runner = BatchRunner(self.client, sleep=lambda seconds: None)
+
+        (outcome,) = runner.remind_envelopes(["a"])
+        self.assertFalse(outcome.ok)
+        self.assertEqual(outcome.attempts, 1)
+
+        outcome = runner.run_one(
+            self.client.find_envelope,
+            "find",
+            models_v6.EnvelopeFindRequest(),
+            endpoint="find_envelope",
+            idempotent=True,
+        )
+        self.assertTrue(outcome.ok)
+        self.assertEqual(outcome.attempts, 2)
+
+    @mock.patch("requests.request")
+    def test_resumes_from_checkpoint(self, mock_request):
+        def request(method, json=None, **kwargs):
+            if json["EnvelopeId"] == "b":
+                return make_response(status_code=400, json_data={"Message": "no"})
+            return make_response(content=b"")
+
+        mock_request.side_effect = request
+        runner = BatchRunner(self.client)
+        list(runner.delete_envelopes("abc", checkpoint_path=self.checkpoint_path))
+        self.assertEqual(mock_request.call_count, 3)
+
+        mock_request.reset_mock()
+        mock_request.side_effect = None
+        mock_request.return_value = make_response(content=b"")
+        outcomes = list(
+            runner.delete_envelopes("abcd", checkpoint_path=self.checkpoint_path)
+        )
+
+        self.assertEqual(sorted(outcome.key for outcome in outcomes), ["b", "d"])
+        self.assertEqual(runner.skipped, 2)
+        with BatchCheckpoint(self.checkpoint_path) as checkpoint:
+            self.assertEqual(
+                checkpoint.done, {"a": True, "b": True, "c": True, "d": True}
+            )
+
+    @mock.patch("requests.request")
+    def test_checkpoint_keeps_failed_keys_without_retry_failed(self, mock_request):
+        with open(self.checkpoint_path, "w") as checkpoint_file:
+            checkpoint_file.write('{"key": "a", "ok": false}\n{"key": "b", "o')
+        mock_request.return_value = make_response(content=b"")
+        runner = BatchRunner(self.client)
+
+        outcomes = list(
+            runner.delete_envelopes(
+                "ab", checkpoint_path=self.checkpoint_path, retry_failed=False
+            )
+        )
+
+        self.assertEqual([outcome.key for outcome in outcomes], ["b"])
+
+    @mock.patch("requests.request")
+    def test_bounds_in_flight_items(self, mock_request):
+        read = []
+        release = threading.Event()
+
+        def request(*args, **kwargs):
+            release.wait(5)
+            return make_response(content=b"")
+
+        def items():
+            for index in range(100):
+                read.append(index)
+                yield str(index)
+
+        mock_request.side_effect = request
+        runner = BatchRunner(self.client, max_workers=2)
+        outcomes = runner.delete_envelopes(items())
+        threading.Timer(0.1, release.set).start()
+        next(outcomes)
+
+        self.assertLessEqual(len(read), 5)
+        self.assertEqual(len(list(outcomes)), 99)
+
+
+if __name__ == "__main__":
+    unittest.main()
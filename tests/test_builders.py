@@ -0,0 +1,77 @@
+import json
+import unittest
+from unittest import mock
+
+from esignanywhere_python_client.builders import (
+    ProcessPoolEnvelopeBuilder,
+    serialize_request,
+)
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.models import models_v6
+
+from .utils import make_response
+
+
+def build_envelope(row):
+    return models_v6.EnvelopeSendRequest(
+        Name=row["name"],
+        Documents=[{"FileId": row["file_id"], "DocumentNumber": 0}],
+        Activities=[
+            {
+                "Action": {
+                    "Sign": {
+                        "RecipientConfiguration": {
+                            "ContactInformation": {
+                                "Email": row["email"],
+                                "GivenName": "Mario",
+                                "Surname": "Rossi",
+                                "LanguageCode": "IT",
+                            }
+                        }
+                    }
+                }
+            }
+        ],
+    )
+
+
+ROWS = [
+    {"name": f"Envelope {index}", "file_id": f"file-{index}", "email": "a@example.com"}
+    for index in range(10)
+]
+
+
+class TestProcessPoolEnvelopeBuilder(unittest.TestCase):
+    def setUp(self):
+        self.builder = ProcessPoolEnvelopeBuilder(
+            build_envelope, max_workers=2, chunksize=3
+        )
+        self.addCleanup(self.builder.shutdown)
+
+    def test_map(self):
+        rows = ROWS + [{"name": "No file"}]
+        built = list(self.builder.map(rows))
+
+        self.assertEqual([request.index for request in built], list(range(11)))
+        self.assertEqual(built[4].body, serialize_request(build_envelope(ROWS[4])))
+        self.assertEqual(json.loads(built[4].body)["Name"], "Envelope 4")
+        self.assertIsNone(built[10].body)
+        self.assertIn("KeyError", built[10].error)
+
+    @mock.patch("requests.request")
+    def test_send_serialized_bytes(self, request):
+        request.return_value = make_response(json_data={"EnvelopeId": "envelope-id"})
+        client = ESignAnyWhereClient(api_token="token")
+        results = list(self.builder.send(client, ROWS, io_workers=2))
+
+        self.assertEqual(sorted(result.index for result in results), list(range(10)))
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(results[0].response.EnvelopeId, "envelope-id")
+        kwargs = request.call_args.kwargs
+        self.assertIsInstance(kwargs["data"], bytes)
+        self.assertNotIn("json", kwargs)
+        self.assertEqual(kwargs["headers"]["Content-Type"], "application/json")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from unittest import mock
+
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.exceptions import (
+    ESawInvalidVersionError,
+    ESawNotFoundError,
+)
+from esignanywhere_python_client.models import models_v6
+
+from .utils import make_response
+
+BULK_ID = "11111111-2222-3333-4444-555555555555"
+
+
+@mock.patch("requests.request")
+class TestBulkEnvelope(unittest.TestCase):
+    def setUp(self):
+        self.client = ESignAnyWhereClient(api_token="token")
+        self.api_uri = "https://demo.esignanywhere.net/Api/v6/envelopebulk"
+
+    def assert_request(self, request, method, url, **kwargs):
+        args, request_kwargs = request.call_args
+        self.assertEqual(args, (method,))
+        self.assertEqual(request_kwargs["url"], url)
+        for key, value in kwargs.items():
+            self.assertEqual(request_kwargs[key], value)
+
+    def test_get_bulk_envelope(self, request):
+        request.return_value = make_response(
+            json_data={
+                "BulkStatus": "PartlyCompleted",
+                "Children": [
+                    {
+                        "EnvelopeId": "child-id",
+                        "Status": "Completed",
+                        "Email": "mario.rossi@example.com",
+                    }
+                ],
+            }
+        )
+        response = self.client.get_bulk_envelope(BULK_ID)
+
+        self.assert_request(request, "GET", f"{self.api_uri}/{BULK_ID}")
+        self.assertEqual(response.BulkStatus, "PartlyCompleted")
+        self.assertEqual(response.Children[0].EnvelopeId, "child-id")
+
+    def test_find_bulk_envelope(self, request):
+        request.return_value = make_response(
+            json_data={"BulkParentEnvelopes": [{"Id": BULK_ID, "Name": "Campaign"}]}
+        )
+        response = self.client.find_bulk_envelope(
+            models_v6.EnvelopeBulkFindRequest(SearchText="Campaign")
+        )
+
+        self.assert_request(request, "POST", f"{self.api_uri}/find")
+        self.assertEqual(request.call_args.kwargs["json"]["SearchText"], "Campaign")
+        self.assertEqual(response.BulkParentEnvelopes[0].Id, BULK_ID)
+
+    def test_cancel_bulk_envelope(self, request):
+        request.return_value = make_response(content=b"")
+        self.client.cancel_bulk_envelope(
+            models_v6.EnvelopeBulkCancelRequest(EnvelopeBulkId=BULK_ID)
+        )
+
+        self.assert_request(
+            request, "POST", f"{self.api_uri}/cancel", json={"EnvelopeBulkId": BULK_ID}
+        )
+
+    def test_delete_bulk_envelope(self, request):
+        request.return_value = make_response(content=b"")
+        self.assertIsNone(self.client.delete_bulk_envelope(BULK_ID))
+
+        self.assert_request(
+            request, "POST", f"{self.api_uri}/delete", json={"EnvelopeBulkId": BULK_ID}
+        )
+
+    def test_remind_bulk_envelope(self, request):
+        request.return_value = make_response(
+            json_data={"TotalSentReminders": 12, "TotalBlockedByRateLimit": 1}
+        )
+        response = self.client.remind_bulk_envelope(
+            models_v6.EnvelopeBulkRemindRequest(EnvelopeBulkId=BULK_ID)
+        )
+
+        self.assert_request(request, "POST", f"{self.api_uri}/remind")
+        self.assertEqual(response.TotalSentReminders, 12)
+
+    def test_restart_expired_bulk_envelope(self, request):
+        request.return_value = make_response(content=b"")
+        self.client.restart_expired_bulk_envelope(
+            models_v6.EnvelopeBulkRestartExpiredRequest(
+                EnvelopeBulkId=BULK_ID, ExpirationInSecondsAfterSending=86400
+            )
+        )
+
+        self.assert_request(request, "POST", f"{self.api_uri}/restartexpired")
+        self.assertEqual(
+            request.call_args.kwargs["json"]["ExpirationInSecondsAfterSending"], 86400
+        )
+
+    def test_wrong_id(self, request):
+        request.return_value = make_response(404, {"ErrorId": "ERR0007"})
+        with self.assertRaises(ESawNotFoundError):
+            self.client.get_bulk_envelope(BULK_ID)
+
+    def test_invalid_version(self, request):
+        with self.assertRaises(ESawInvalidVersionError):
+            self.client.delete_bulk_envelope(BULK_ID, version="v5")
+        request.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+
+from esignanywhere_python_client.bulk_send import (
+    FAILED,
+    SENT,
+    UNKNOWN,
+    BulkSendManifest,
+    BulkSendOrchestrator,
+)
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.metrics import RETRIES, InMemoryMetricsSink
+from esignanywhere_python_client.models import models_v6
+
+from .utils import make_response
+
+
+def make_request(count):
+    return models_v6.EnvelopeBulkSendRequest(
+        Name="Campaign",
+        Documents=[{"FileId": "file-id", "DocumentNumber": 1}],
+        Activities=[
+            {
+                "Action": {
+                    "SignBulk": {
+                        "BulkRecipients": [
+                            {
+                                "RecipientConfiguration": {
+                                    "ContactInformation": {
+                                        "Email": f"{index}@example.com",
+                                        "GivenName": "Mario",
+                                        "Surname": "Rossi",
+                                    }
+                                }
+                            }
+                            for index in range(count)
+                        ]
+                    }
+                }
+            }
+        ],
+    )
+
+
+def respond(method, url, headers, **kwargs):
+    body = json.loads(kwargs["data"]) if "data" in kwargs else kwargs["json"]
+    recipients = body["Activities"][0]["Action"]["SignBulk"]["BulkRecipients"]
+    emails = [
+        recipient["RecipientConfiguration"]["ContactInformation"]["Email"]
+        for recipient in recipients
+    ]
+    return make_response(
+        json_data={
+            "EnvelopeBulkParentId": f"parent-{emails[0]}",
+            "EnvelopeBulkChildren": [
+                {"EnvelopeId": f"envelope-{email}", "BulkRecipientEmail": email}
+                for email in emails
+            ],
+        }
+    )
+
+
+class TestBulkSendOrchestrator(unittest.TestCase):
+    def setUp(self):
+        self.sink = InMemoryMetricsSink()
+        self.client = ESignAnyWhereClient(api_token="token", metrics_sink=self.sink)
+        self.orchestrator = BulkSendOrchestrator(
+            self.client, chunk_size=4, sleep=lambda seconds: None
+        )
+        self.request = make_request(10)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.manifest_path = os.path.join(directory.name, "campaign.json")
+
+    def test_split(self):
+        self.assertEqual(
+            [len(chunk) for chunk in self.orchestrator.split(self.request)], [4, 4, 2]
+        )
+        self.orchestrator.max_chunk_bytes = 1000
+        chunks = self.orchestrator.split(self.request)
+        self.assertGreater(len(chunks), 3)
+        for chunk in chunks:
+            body = self.client._serialize_request(
+                self.orchestrator.get_chunk_request(self.request, chunk)
+            )[0]
+            self.assertLessEqual(len(str(body).encode()), 1200)
+
+    @mock.patch("requests.request", side_effect=respond)
+    def test_send(self, request):
+        manifest = self.orchestrator.send(self.request, self.manifest_path)
+
+        self.assertTrue(manifest.complete)
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(
+            sorted(manifest.bulk_parent_ids),
+            ["parent-0@example.com", "parent-4@example.com", "parent-8@example.com"],
+        )
+        self.assertEqual(manifest.children["5@example.com"], "envelope-5@example.com")
+        saved = BulkSendManifest.load(self.manifest_path)
+        self.assertEqual(saved.chunks[2].recipients, ["8@example.com", "9@example.com"])
+        self.assertEqual(saved.chunks[2].bulk_parent_id, "parent-8@example.com")
+
+    @mock.patch("requests.request")
+    def test_retry_failed_chunks_only(self, request):
+        def fail_second_chunk(method, url, headers, **kwargs):
+            response = respond(method, url, headers, **kwargs)
+            if response.json()["EnvelopeBulkParentId"] == "parent-4@example.com":
+                return make_response(503, {}, headers={"Retry-After": "1"})
+            return response
+
+        request.side_effect = fail_second_chunk
+        manifest = self.orchestrator.send(self.request, self.manifest_path)
+
+        self.assertEqual(
+            [chunk.status for chunk in manifest.chunks], [SENT, FAILED, SENT]
+        )
+        self.assertEqual(manifest.chunks[1].attempts, 3)
+        self.assertIn("ESawTransientError", manifest.chunks[1].error)
+
+        request.side_effect = respond
+        manifest = self.orchestrator.send(self.request, self.manifest_path)
+        self.assertTrue(manifest.complete)
+        # 1 + 3 attempts + 1 in the first run, the failed chunk only in the second
+        self.assertEqual(request.call_count, 6)
+        self.assertEqual(len(manifest.children), 10)
+        self.assertEqual(
+            self.sink.get_counter(
+                RETRIES,
+                endpoint="create_and_send_bulk_envelope",
+                version="v6",
+                reason="ESawTransientError",
+            ),
+            2,
+        )
+
+    @mock.patch("requests.request")
+    def test_ambiguous_failures_are_not_resent(self, request):
+        def fail_chunks(method, url, headers, **kwargs):
+            response = respond(method, url, headers, **kwargs)
+            parent_id = response.json()["EnvelopeBulkParentId"]
+            if parent_id == "parent-0@example.com":
+                raise requests.ReadTimeout()
+            if parent_id == "parent-4@example.com":
+                return make_response(504, {})
+            return response
+
+        request.side_effect = fail_chunks
+        manifest = self.orchestrator.send(self.request, self.manifest_path)
+
+        self.assertEqual(
+            [chunk.status for chunk in manifest.chunks], [UNKNOWN, UNKNOWN, SENT]
+        )
+        self.assertEqual([chunk.attempts for chunk in manifest.chunks], [1, 1, 1])
+        self.assertEqual(manifest.unknown, manifest.chunks[:2])
+        self.assertFalse(manifest.complete)
+
+        request.side_effect = respond
+        manifest = self.orchestrator.send(self.request, self.manifest_path)
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(len(manifest.unknown), 2)
+
+        manifest = self.orchestrator.send(
+            self.request, self.manifest_path, resend_unknown=True
+        )
+        self.assertEqual(request.call_count, 5)
+        self.assertTrue(manifest.complete)
+
+    @mock.patch("requests.request")
+    def test_rejected_chunks_fail(self, request):
+        request.return_value = make_response(400, {"ErrorId": "ERR0001"})
+
+        manifest = self.orchestrator.send(self.request)
+
+        self.assertEqual({chunk.status for chunk in manifest.chunks}, {FAILED})
+        self.assertEqual(request.call_count, 3)
+
+    def test_invalid_requests(self):
+        duplicate = make_request(3)
+        recipients = duplicate.Activities[0].Action.SignBulk.BulkRecipients
+        recipients[2].RecipientConfiguration.ContactInformation.Email = "0@Example.com"
+        without_email = make_request(2)
+        recipients = without_email.Activities[0].Action.SignBulk.BulkRecipients
+        recipients[1].RecipientConfiguration.ContactInformation = None
+        without_sign_bulk = make_request(1)
+        without_sign_bulk.Activities[0].Action.SignBulk = None
+
+        for request, message in (
+            (duplicate, "0@example.com is given twice"),
+            (without_email, "requires a ContactInformation Email"),
+            (without_sign_bulk, "no SignBulk activity"),
+        ):
+            with self.assertRaisesRegex(ValueError, message):
+                self.orchestrator.send(request)
+
+    def test_manifest_mismatch(self):
+        BulkSendManifest("Campaign").save(self.manifest_path)
+        with self.assertRaises(ValueError):
+            self.orchestrator.send(self.request, self.manifest_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from unittest import mock
+
+from esignanywhere_python_client.bulk_status import BulkStatusAggregator
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+
+from .utils import make_response
+
+
+def child(envelope_id, status):
+    return {
+        "EnvelopeId": envelope_id,
+        "Status": status,
+        "Email": f"{envelope_id}@example.com",
+    }
+
+
+class TestBulkStatusAggregator(unittest.TestCase):
+    def setUp(self):
+        self.responses = {
+            "parent-1": {
+                "BulkStatus": "Active",
+                "Children": [child("a", "Active"), child("b", "Active")],
+            },
+            "parent-2": {
+                "BulkStatus": "Completed",
+                "Children": [child("c", "Completed")],
+            },
+        }
+        self.calls = []
+        patcher = mock.patch("requests.request", side_effect=self.respond)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.aggregator = BulkStatusAggregator(ESignAnyWhereClient(api_token="token"))
+        self.aggregator.track("parent-1", "parent-2")
+
+    def respond(self, method, url, **kwargs):
+        bulk_id = url.rsplit("/", 1)[-1]
+        self.calls.append(bulk_id)
+        if bulk_id not in self.responses:
+            return make_response(404, {"ErrorId": "ERR0007"})
+        return make_response(json_data=self.responses[bulk_id])
+
+    def test_refresh_incremental(self):
+        self.assertEqual(self.aggregator.refresh(), {"parent-1": 2, "parent-2": 1})
+        self.assertEqual(self.aggregator.counts, {"Active": 2, "Completed": 1})
+        self.assertAlmostEqual(self.aggregator.completion_rate, 1 / 3)
+
+        self.responses["parent-1"]["BulkStatus"] = "PartlyCompleted"
+        self.responses["parent-1"]["Children"][0]["Status"] = "Completed"
+        self.calls.clear()
+        self.assertEqual(self.aggregator.refresh(), {"parent-1": 1})
+        # parent-2 is completed and not refreshed anymore
+        self.assertEqual(self.calls, ["parent-1"])
+        self.assertEqual(self.aggregator.counts, {"Active": 1, "Completed": 2})
+        self.assertEqual(
+            self.aggregator.parents["parent-1"].counts, {"Active": 1, "Completed": 1}
+        )
+        self.assertEqual(
+            self.aggregator.get_recipient_states("parent-1"),
+            {"a@example.com": "Completed", "b@example.com": "Active"},
+        )
+
+    def test_children_without_id_or_removed(self):
+        self.responses["parent-1"]["Children"].append(child(None, "Active"))
+        self.responses["parent-1"]["Children"].append(child(None, "Completed"))
+        self.aggregator.refresh()
+        self.assertEqual(self.aggregator.counts, {"Active": 2, "Completed": 1})
+
+        del self.responses["parent-1"]["Children"][1]
+        self.assertEqual(self.aggregator.refresh(), {"parent-1": 1})
+        self.assertEqual(self.aggregator.counts, {"Active": 1, "Completed": 1})
+        self.assertEqual(list(self.aggregator.parents["parent-1"].children), ["a"])
+        self.assertEqual(self.aggregator.parents["parent-1"].counts, {"Active": 1})
+
+    def test_final_children_stop_refresh(self):
+        self.responses["parent-1"]["Children"] = [
+            child("a", "Expired"),
+            child("b", "Canceled"),
+        ]
+        self.aggregator.refresh()
+
+        self.assertEqual(self.aggregator.get_pending(), [])
+
+    def test_error_keeps_state(self):
+        self.aggregator.track("missing")
+        result = self.aggregator.refresh()
+
+        self.assertEqual(result["missing"], 0)
+        self.assertIsNotNone(self.aggregator.parents["missing"].error)
+        self.assertIn("missing", self.aggregator.get_pending())
+
+    def test_untrack(self):
+        self.aggregator.refresh()
+        self.aggregator.untrack("parent-1")
+
+        self.assertEqual(self.aggregator.counts, {"Completed": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
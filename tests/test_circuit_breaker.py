@@ -0,0 +1,144 @@
+import unittest
+from unittest import mock
+
+import requests
+
+from esignanywhere_python_client import circuit_breaker
+from esignanywhere_python_client.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerMiddleware,
+    get_endpoint_family,
+)
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.exceptions import (
+    ESawCircuitOpenError,
+    ESawNotFoundError,
+    ESawTransientError,
+)
+
+from .utils import make_response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            minimum_calls=4, open_seconds=10, clock=self.clock
+        )
+
+    def test_endpoint_family(self):
+        api_uri = "https://demo.esignanywhere.net/Api/"
+        self.assertEqual(get_endpoint_family(api_uri + "v6/file/upload"), "file")
+        self.assertEqual(get_endpoint_family(api_uri + "v6/envelope/1"), "envelope")
+        self.assertEqual(get_endpoint_family(api_uri + "v6/envelopebulk/send"), "bulk")
+        self.assertEqual(get_endpoint_family(api_uri + "v6/draft/send"), "draft")
+        self.assertEqual(get_endpoint_family(api_uri + "v4/version"), "version")
+
+    def test_opens_on_failure_rate(self):
+        self.breaker.record_success(self.breaker.allow())
+        self.breaker.record_success(self.breaker.allow())
+        self.breaker.record_failure(self.breaker.allow())
+        self.assertEqual(self.breaker.state, circuit_breaker.CLOSED)
+        self.breaker.record_failure(self.breaker.allow())
+
+        self.assertEqual(self.breaker.state, circuit_breaker.OPEN)
+        self.assertIsNone(self.breaker.allow())
+        self.assertEqual(self.breaker.retry_after, 10)
+
+    def test_half_open_probe(self):
+        for _ in range(4):
+            self.breaker.record_failure(self.breaker.allow())
+        self.clock.now += 10
+
+        probe = self.breaker.allow()
+        self.assertTrue(probe.probe)
+        self.assertEqual(self.breaker.state, circuit_breaker.HALF_OPEN)
+        self.assertIsNone(self.breaker.allow())
+        self.breaker.record_success(probe)
+        self.assertEqual(self.breaker.state, circuit_breaker.CLOSED)
+
+    def test_only_probes_count_while_half_open(self):
+        self.breaker.record_success(self.breaker.allow())
+        late = self.breaker.allow()
+        for _ in range(3):
+            self.breaker.record_failure(self.breaker.allow())
+        self.clock.now += 10
+        probe = self.breaker.allow()
+
+        # Let through while closed, it finishes after the circuit half opened
+        self.breaker.record_success(late)
+        self.assertEqual(self.breaker.state, circuit_breaker.HALF_OPEN)
+        self.assertIsNone(self.breaker.allow())
+        self.breaker.record_failure(late)
+        self.assertEqual(self.breaker.state, circuit_breaker.HALF_OPEN)
+
+        self.breaker.record_success(probe)
+        self.assertEqual(self.breaker.state, circuit_breaker.CLOSED)
+
+    def test_failed_probe_reopens(self):
+        for _ in range(4):
+            self.breaker.record_failure(self.breaker.allow())
+        self.clock.now += 10
+
+        self.breaker.record_failure(self.breaker.allow())
+        self.assertEqual(self.breaker.state, circuit_breaker.OPEN)
+
+    def test_window_expiration(self):
+        for _ in range(3):
+            self.breaker.record_failure(self.breaker.allow())
+        self.clock.now += 31
+        self.breaker.record_failure(self.breaker.allow())
+
+        self.assertEqual(self.breaker.state, circuit_breaker.CLOSED)
+
+
+class TestCircuitBreakerMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.middleware = CircuitBreakerMiddleware(minimum_calls=2)
+        self.client = ESignAnyWhereClient(
+            api_token="token", middlewares=[self.middleware]
+        )
+
+    @mock.patch("requests.request")
+    def test_fail_fast(self, request):
+        request.side_effect = requests.ConnectionError()
+        for _ in range(2):
+            with self.assertRaises(requests.ConnectionError):
+                self.client.get_envelope("1")
+
+        with self.assertRaises(ESawCircuitOpenError) as cm:
+            self.client.get_envelope("1")
+        self.assertEqual(cm.exception.family, "envelope")
+        self.assertEqual(request.call_count, 2)
+
+        # Other families are tracked separately
+        request.side_effect = None
+        request.return_value = make_response(json_data={"FileId": "1"})
+        self.client.dispose_uploaded_file(mock.Mock(model_dump=lambda mode: {}))
+        self.assertEqual(self.middleware.breakers["file"].state, "closed")
+
+    @mock.patch("requests.request")
+    def test_error_classes(self, request):
+        request.return_value = make_response(404, {"ErrorId": "ERR0007"})
+        for _ in range(3):
+            with self.assertRaises(ESawNotFoundError):
+                self.client.get_envelope("1")
+
+        request.return_value = make_response(503, {})
+        for _ in range(3):
+            with self.assertRaises(ESawTransientError):
+                self.client.get_envelope("1")
+        with self.assertRaises(ESawCircuitOpenError):
+            self.client.get_envelope("1")
+
+
+if __name__ == "__main__":
+    unittest.main()
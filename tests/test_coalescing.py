@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from esignanywhere_python_client.coalescing import (
+    AsyncSingleFlight,
+    CoalescingMiddleware,
+    SingleFlight,
+)
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.exceptions import ESawNotFoundError
+from esignanywhere_python_client.metrics import InMemoryMetricsSink
+from esignanywhere_python_client.models.models_v6 import EnvelopeCancelRequest
+
+from .utils import make_response
+
+
+class TestCoalescing(unittest.TestCase):
+    def setUp(self):
+        self.sink = InMemoryMetricsSink()
+        self.middleware = CoalescingMiddleware(metrics_sink=self.sink)
+        self.client = ESignAnyWhereClient(
+            api_token="token", middlewares=[self.middleware]
+        )
+
+    def slow_request(self, response, release):
+        def request(*args, **kwargs):
+            release.wait(5)
+            return response
+
+        return request
+
+    def test_concurrent_reads_share_request(self):
+        release = threading.Event()
+        with mock.patch(
+            "requests.request",
+            side_effect=self.slow_request(
+                make_response(json_data={"ViewerLinks": []}), release
+            ),
+        ) as request:
+            with ThreadPoolExecutor(max_workers=5) as executor:
+                futures = [
+                    executor.submit(self.client.get_envelope_viewer_links, "1")
+                    for _ in range(5)
+                ]
+                while self.middleware.flights.in_flight() == 0:
+                    time.sleep(0.001)
+                time.sleep(0.05)
+                release.set()
+                results = [future.result() for future in futures]
+
+        self.assertEqual(request.call_count, 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(self.middleware.collapsed, 4)
+        self.assertEqual(
+            self.sink.get_counter(
+                "esaw_coalesced_calls_total",
+                endpoint="get_envelope_viewer_links",
+                version="v6",
+            ),
+            4,
+        )
+
+    def test_errors_are_shared(self):
+        release = threading.Event()
+        with mock.patch(
+            "requests.request",
+            side_effect=self.slow_request(
+                make_response(404, {"ErrorId": "ERR0007"}), release
+            ),
+        ):
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                futures = [
+                    executor.submit(self.client.get_envelope, "1") for _ in range(3)
+                ]
+                while self.middleware.flights.in_flight() == 0:
+                    time.sleep(0.001)
+                time.sleep(0.05)
+                release.set()
+                for future in futures:
+                    with self.assertRaises(ESawNotFoundError):
+                        future.result()
+
+    @mock.patch("requests.request")
+    def test_writes_are_not_coalesced(self, request):
+        request.return_value = make_response(json_data={})
+        self.client.cancel_envelope(EnvelopeCancelRequest(EnvelopeId="1"))
+        self.client.cancel_envelope(EnvelopeCancelRequest(EnvelopeId="1"))
+
+        self.assertEqual(request.call_count, 2)
+
+    def test_sequential_calls_are_not_shared(self):
+        flights = SingleFlight()
+
+        self.assertEqual(flights.do("key", lambda: 1), (1, False))
+        self.assertEqual(flights.do("key", lambda: 2), (2, False))
+
+    def test_async_single_flight(self):
+        flights = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def main():
+            return await asyncio.gather(*(flights.do("key", fetch) for _ in range(3)))
+
+        results = asyncio.run(main())
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([result for result, _ in results], ["result"] * 3)
+        self.assertEqual(flights.collapsed, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from esignanywhere_python_client.concurrency import (
+    OVERLOAD,
+    SUCCESS,
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimitMiddleware,
+)
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.exceptions import ESawRateLimitedError
+from esignanywhere_python_client.metrics import InMemoryMetricsSink
+
+from .utils import make_response
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+    def setUp(self):
+        self.sink = InMemoryMetricsSink()
+        self.limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=4, max_limit=20, name="bulk", metrics_sink=self.sink
+        )
+
+    def run_calls(self, count, latency, outcome=SUCCESS):
+        for _ in range(count):
+            self.limiter.acquire()
+            self.limiter.release(latency, outcome)
+
+    def test_increase_with_flat_latency(self):
+        self.run_calls(200, 0.1)
+
+        self.assertEqual(self.limiter.current_limit, 20)
+        self.assertEqual(
+            self.sink.get_gauge("esaw_concurrency_limit", limiter="bulk"), 20
+        )
+
+    def test_decrease_on_overload(self):
+        self.run_calls(30, 0.1)
+        limit = self.limiter.limit
+        self.run_calls(1, 0.1, OVERLOAD)
+
+        self.assertAlmostEqual(self.limiter.limit, limit * 0.7)
+        self.assertEqual(
+            self.sink.get_counter(
+                "esaw_concurrency_decisions_total",
+                limiter="bulk",
+                decision="decrease_overload",
+            ),
+            1,
+        )
+
+    def test_decrease_on_latency_spike(self):
+        self.run_calls(30, 0.1)
+        limit = self.limiter.limit
+        self.run_calls(1, 1.0)
+
+        self.assertLess(self.limiter.limit, limit)
+
+    def test_single_decrease_per_round_trip(self):
+        clock = mock.Mock(return_value=100.0)
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10, clock=clock)
+        limiter.acquire()
+        limiter.release(1.0)
+        for _ in range(3):
+            limiter.acquire()
+            limiter.release(1.0, OVERLOAD)
+
+        self.assertEqual(limiter.decreases, 1)
+        self.assertGreaterEqual(limiter.current_limit, 1)
+
+    def test_acquire_blocks_at_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire(timeout=0.01))
+        limiter.release(0.1)
+        self.assertTrue(limiter.acquire(timeout=0.01))
+
+
+class TestConcurrencyLimitMiddleware(unittest.TestCase):
+    def test_in_flight_bounded(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+        client = ESignAnyWhereClient(
+            api_token="token", middlewares=[ConcurrencyLimitMiddleware(limiter)]
+        )
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def request(*args, **kwargs):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.pop()
+            return make_response(json_data={})
+
+        with mock.patch("requests.request", side_effect=request):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda _: client.get_teams(), range(16)))
+
+        self.assertLessEqual(max(peak), 2)
+        self.assertEqual(limiter.in_flight, 0)
+
+    @mock.patch("requests.request")
+    def test_rate_limited_reduces_limit(self, request):
+        request.return_value = make_response(429, {})
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10)
+        client = ESignAnyWhereClient(
+            api_token="token", middlewares=[ConcurrencyLimitMiddleware(limiter)]
+        )
+        with self.assertRaises(ESawRateLimitedError):
+            client.get_teams()
+
+        self.assertEqual(limiter.current_limit, 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,7 @@ import os
 import unittest
 
 from esignanywhere_python_client.esign_client import ESignAnyWhereClient
-from esignanywhere_python_client.exceptions import ESawErrorResponse
+from esignanywhere_python_client.exceptions import ESawNotFoundError
 from esignanywhere_python_client.models.models_v6 import TemplateCreateDraftRequest
 
 
@@ -23,7 +23,7 @@ class TestCreateDraftFromTemplate(unittest.TestCase):
         self.assertIsNotNone(r.DraftId)
 
     def test_wrong_id(self):
-        with self.assertRaises(ESawErrorResponse) as cm:
+        with self.assertRaises(ESawNotFoundError) as cm:
             self.client.create_draft_from_template(
                 TemplateCreateDraftRequest(
                     TemplateId="00000000-0000-0000-0000-000000000000"
@@ -0,0 +1,331 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from esignanywhere_python_client import exceptions
+from esignanywhere_python_client.envelope_index import EnvelopeIndex, IndexMiddleware
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.models import models_v6
+
+from .utils import make_response
+
+
+def make_find_envelope(envelope_id, name, status="Active", metadata=None, **fields):
+    return models_v6.EnvelopeFindEnvelope(
+        Id=envelope_id, Name=name, Status=status, MetaData=metadata, **fields
+    )
+
+
+def make_envelope(envelope_id, *emails, status="Active"):
+    return models_v6.EnvelopeGetResponse(
+        Id=envelope_id,
+        EnvelopeStatus=status,
+        SentDate="2024-01-02T03:04:05Z",
+        SenderUserInformation={"Email": "sender@example.com"},
+        Activities=[
+            {
+                "Action": {
+                    "Sign": {
+                        "ContactInformation": {
+                            "Email": email,
+                            "GivenName": "Mario",
+                            "Surname": "Rossi",
+                        }
+                    }
+                }
+            }
+            for email in emails
+        ],
+    )
+
+
+class TestEnvelopeIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = EnvelopeIndex()
+        self.addCleanup(self.index.close)
+        self.index.add_find_envelopes(
+            [
+                make_find_envelope(
+                    "1", "Contract Rossi", metadata='{"CustomerId": "42", "Year": 2024}'
+                ),
+                make_find_envelope(
+                    "2", "Invoice Bianchi", "Completed", '{"CustomerId": "7"}'
+                ),
+                make_find_envelope("3", "Contract Verdi", metadata="<xml/>"),
+            ]
+        )
+
+    def get_ids(self, envelopes):
+        return sorted(envelope.id for envelope in envelopes)
+
+    def test_text_search(self):
+        self.assertEqual(self.get_ids(self.index.query(text="contract")), ["1", "3"])
+        self.assertEqual(self.get_ids(self.index.query(text="contr ross")), ["1"])
+        self.assertEqual(self.get_ids(self.index.query(text='"or NOT')), [])
+
+    def test_status_and_metadata(self):
+        self.assertEqual(self.get_ids(self.index.query(status="Active")), ["1", "3"])
+        self.assertEqual(
+            self.get_ids(self.index.query(metadata={"CustomerId": "42"})), ["1"]
+        )
+        self.assertEqual(
+            self.get_ids(
+                self.index.query(metadata={"CustomerId": "42", "Year": "2024"})
+            ),
+            ["1"],
+        )
+        self.assertEqual(
+            self.get_ids(
+                self.index.query(status="Active", metadata={"CustomerId": "7"})
+            ),
+            [],
+        )
+
+    def test_merges_get_envelope_results(self):
+        self.index.add_envelopes(
+            [make_envelope("1", "Mario.Rossi@example.com", status="Completed")]
+        )
+
+        envelope = self.index.get("1")
+        self.assertEqual(envelope.name, "Contract Rossi")
+        self.assertEqual(envelope.status, "Completed")
+        self.assertEqual(envelope.sender_email, "sender@example.com")
+        self.assertTrue(envelope.sent_date.startswith("2024-01-02"))
+        self.assertEqual(self.index.get_recipients("1"), ["mario.rossi@example.com"])
+        self.assertEqual(
+            self.get_ids(self.index.query(recipient_email="mario.rossi@EXAMPLE.com")),
+            ["1"],
+        )
+        self.assertEqual(self.get_ids(self.index.query(text="mario")), ["1"])
+        self.assertEqual(
+            self.get_ids(self.index.query(metadata={"CustomerId": "42"})), ["1"]
+        )
+
+    def test_bulk_children_and_status_updates(self):
+        self.index.add_bulk_children(
+            [
+                models_v6.EnvelopeBulkGetChildEnvelope(
+                    EnvelopeId="4", Status="Active", Email="luigi@example.com"
+                )
+            ],
+            "bulk",
+        )
+        self.index.update_status("4", "Completed")
+
+        self.assertEqual(
+            self.get_ids(self.index.query(bulk_parent_id="bulk", status="Completed")),
+            ["4"],
+        )
+        self.assertEqual(
+            self.get_ids(self.index.query(recipient_email="luigi@example.com")), ["4"]
+        )
+
+    def test_remove(self):
+        self.index.remove("1")
+        self.index.remove("unknown")
+
+        self.assertIsNone(self.index.get("1"))
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.get_ids(self.index.query(text="rossi")), [])
+
+    def test_rebuild_text(self):
+        self.index.connection.execute("DELETE FROM envelopes_text")
+
+        self.index.rebuild_text()
+
+        self.assertEqual(self.get_ids(self.index.query(text="invoice")), ["2"])
+
+    def test_rebuild(self):
+        client = mock.Mock()
+        client.find_envelope.side_effect = [
+            models_v6.EnvelopeFindResponse(
+                Envelopes=[make_find_envelope("5", "Lease Neri")]
+            ),
+            models_v6.EnvelopeFindResponse(Envelopes=[]),
+        ]
+
+        count = self.index.rebuild(
+            client,
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            datetime(2024, 1, 11, tzinfo=timezone.utc),
+        )
+
+        self.assertEqual(count, 1)
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(self.get_ids(self.index.query(text="lease")), ["5"])
+        queries = [call.args[0] for call in client.find_envelope.call_args_list]
+        self.assertEqual(queries[0].StartDate.day, 4)
+        self.assertEqual(queries[1].StartDate.day, 1)
+
+    def test_rebuild_keeps_get_envelope_results(self):
+        self.index.add_envelopes([make_envelope("1", "mario@example.com")])
+        client = mock.Mock()
+        client.find_envelope.return_value = models_v6.EnvelopeFindResponse(
+            Envelopes=[make_find_envelope("1", "Contract Rossi", "Completed")]
+        )
+
+        self.index.rebuild(
+            client,
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            datetime(2024, 1, 5, tzinfo=timezone.utc),
+        )
+
+        self.assertEqual(len(self.index), 1)
+        envelope = self.index.get("1")
+        self.assertEqual(envelope.status, "Completed")
+        self.assertEqual(envelope.sender_email, "sender@example.com")
+        self.assertIsNotNone(envelope.sent_date)
+        self.assertEqual(
+            self.get_ids(self.index.query(recipient_email="Mario@example.com")), ["1"]
+        )
+        self.assertEqual(self.get_ids(self.index.query(text="rossi mario")), ["1"])
+        self.assertEqual(
+            self.get_ids(self.index.query(metadata={"Year": "2024"})), ["1"]
+        )
+        self.assertEqual(self.index.query(text="verdi"), [])
+
+    def test_failed_rebuild_keeps_the_index(self):
+        client = mock.Mock()
+        client.find_envelope.side_effect = ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            self.index.rebuild(
+                client,
+                datetime(2024, 1, 1, tzinfo=timezone.utc),
+                datetime(2024, 1, 11, tzinfo=timezone.utc),
+            )
+
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.get_ids(self.index.query(text="contract")), ["1", "3"])
+
+    def test_writes_during_a_rebuild_follow_it(self):
+        client = mock.Mock()
+
+        def find_envelope(request):
+            self.index.write_after_rebuild(
+                lambda: self.index.update_status("1", "Completed")
+            )
+            self.assertTrue(self.index.rebuilding)
+            self.assertEqual(self.index.get("1").status, "Active")
+            return models_v6.EnvelopeFindResponse(
+                Envelopes=[make_find_envelope("1", "Contract Rossi")]
+            )
+
+        client.find_envelope.side_effect = find_envelope
+
+        self.index.rebuild(
+            client,
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            datetime(2024, 1, 5, tzinfo=timezone.utc),
+        )
+
+        self.assertFalse(self.index.rebuilding)
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(self.index.get("1").status, "Completed")
+
+    def test_a_single_rebuild_runs(self):
+        client = mock.Mock()
+
+        def find_envelope(request):
+            with self.assertRaises(RuntimeError):
+                self.index.rebuild(client, request.StartDate, request.EndDate)
+            return models_v6.EnvelopeFindResponse(Envelopes=[])
+
+        client.find_envelope.side_effect = find_envelope
+
+        self.index.rebuild(
+            client,
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            datetime(2024, 1, 5, tzinfo=timezone.utc),
+        )
+
+        self.assertEqual(client.find_envelope.call_count, 1)
+
+    def test_persists(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "envelopes.db")
+            index = EnvelopeIndex(path)
+            index.add_find_envelopes([make_find_envelope("1", "Contract")])
+            index.close()
+
+            index = EnvelopeIndex(path)
+            self.assertEqual(self.get_ids(index.query(text="contract")), ["1"])
+            index.close()
+
+
+class TestIndexMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.client = ESignAnyWhereClient("token", "", is_test_env=True)
+        self.index = EnvelopeIndex()
+        self.addCleanup(self.index.close)
+        self.client.add_middleware(IndexMiddleware(self.index))
+
+    @mock.patch("requests.request")
+    def test_indexes_find_results(self, mock_request):
+        mock_request.return_value = make_response(
+            json_data={
+                "Envelopes": [{"Id": "1", "Name": "Contract", "Status": "Active"}]
+            }
+        )
+
+        self.client.find_envelope(models_v6.EnvelopeFindRequest())
+
+        self.assertEqual(self.index.get("1").name, "Contract")
+
+    @mock.patch("requests.request")
+    def test_indexes_bulk_children(self, mock_request):
+        mock_request.return_value = make_response(
+            json_data={
+                "BulkStatus": "Active",
+                "Children": [{"EnvelopeId": "2", "Status": "Active", "Email": "a@b.c"}],
+            }
+        )
+
+        self.client.get_bulk_envelope("bulk")
+
+        self.assertEqual(self.index.get("2").bulk_parent_id, "bulk")
+
+    @mock.patch("requests.request")
+    def test_failed_rebuild_with_the_middleware_keeps_the_index(self, mock_request):
+        self.index.add_find_envelopes(
+            [
+                make_find_envelope("old1", "Contract"),
+                make_find_envelope("old2", "Lease"),
+            ]
+        )
+        mock_request.side_effect = [
+            make_response(json_data={"Envelopes": [{"Id": "new1", "Name": "Invoice"}]}),
+            make_response(status_code=500, json_data={"Message": "boom"}),
+        ]
+
+        with self.assertRaises(exceptions.ESawTransientError):
+            self.index.rebuild(
+                self.client,
+                datetime(2024, 1, 1, tzinfo=timezone.utc),
+                datetime(2024, 1, 11, tzinfo=timezone.utc),
+            )
+
+        # The envelope found by the first query is still indexed by the middleware
+        self.assertEqual(
+            sorted(envelope.id for envelope in self.index.query()),
+            ["new1", "old1", "old2"],
+        )
+        self.assertFalse(self.index.rebuilding)
+
+    @mock.patch("requests.request")
+    def test_indexing_failures_do_not_fail_calls(self, mock_request):
+        mock_request.return_value = make_response(
+            json_data={"Envelopes": [{"Id": "1"}]}
+        )
+        self.index.close()
+
+        with self.assertLogs("esignanywhere_python_client.envelope_index", "WARNING"):
+            response = self.client.find_envelope(models_v6.EnvelopeFindRequest())
+
+        self.assertEqual(len(response.Envelopes), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+
+import pydantic
+
+from esignanywhere_python_client.envelope_templates import EnvelopeTemplate
+from esignanywhere_python_client.models import models_v6
+
+
+def contact(email):
+    return {
+        "Email": email,
+        "GivenName": "Mario",
+        "Surname": "Rossi",
+        "LanguageCode": "IT",
+    }
+
+
+SKELETON = {
+    "Name": "Contract",
+    "Documents": [{"FileId": "skeleton-file", "DocumentNumber": 1}],
+    "Activities": [
+        {
+            "Action": {
+                "Sign": {
+                    "RecipientConfiguration": {
+                        "ContactInformation": contact("signer@example.com")
+                    },
+                    "Elements": {
+                        "TextBoxes": [
+                            {"ElementId": "iban", "DocumentNumber": 1, "Value": ""}
+                        ],
+                        "CheckBoxes": [{"ElementId": "privacy", "DocumentNumber": 1}],
+                    },
+                }
+            }
+        },
+        {
+            "Action": {
+                "SendCopy": {
+                    "RecipientConfiguration": {
+                        "ContactInformation": contact("copy@example.com")
+                    }
+                }
+            }
+        },
+    ],
+    "EmailConfiguration": {"Subject": "Please sign", "Message": "Hello"},
+}
+
+
+class TestEnvelopeTemplate(unittest.TestCase):
+    def setUp(self):
+        self.template = EnvelopeTemplate(SKELETON)
+
+    def test_instantiate(self):
+        request = self.template.instantiate(
+            recipients=[{"Email": "luigi@example.com", "GivenName": "Luigi"}],
+            documents=["file-id"],
+            field_values={"iban": "IT60X054", "privacy": True},
+            name="Contract Luigi",
+            metadata="customer-42",
+        )
+
+        expected = models_v6.EnvelopeSendRequest(**SKELETON).model_dump(mode="json")
+        sign = expected["Activities"][0]["Action"]["Sign"]
+        sign["RecipientConfiguration"]["ContactInformation"].update(
+            Email="luigi@example.com", GivenName="Luigi"
+        )
+        sign["Elements"]["TextBoxes"][0]["Value"] = "IT60X054"
+        sign["Elements"]["CheckBoxes"][0]["IsChecked"] = True
+        expected["Documents"][0]["FileId"] = "file-id"
+        expected.update(Name="Contract Luigi", MetaData="customer-42")
+        self.assertEqual(request.model_dump(mode="json"), expected)
+
+    def test_skeleton_untouched_and_shared(self):
+        request = self.template.instantiate(
+            recipients=[None, {"Email": "x@example.com"}]
+        )
+        skeleton = self.template.skeleton
+
+        self.assertEqual(
+            skeleton.Activities[
+                1
+            ].Action.SendCopy.RecipientConfiguration.ContactInformation.Email,
+            "copy@example.com",
+        )
+        self.assertIsNot(request.Activities[1], skeleton.Activities[1])
+        self.assertIs(request.Activities[0], skeleton.Activities[0])
+        self.assertIs(request.EmailConfiguration, skeleton.EmailConfiguration)
+
+    def test_invalid_values(self):
+        with self.assertRaises(pydantic.ValidationError):
+            self.template.instantiate(recipients=[{"Email": None}])
+        with self.assertRaises(ValueError):
+            self.template.instantiate(field_values={"missing": "value"})
+        with self.assertRaises(ValueError):
+            self.template.instantiate(documents=["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
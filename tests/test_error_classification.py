@@ -0,0 +1,126 @@
+import unittest
+from unittest import mock
+
+import requests
+import urllib3
+
+from esignanywhere_python_client import exceptions
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+
+from .utils import make_response
+
+
+class TestErrorClassification(unittest.TestCase):
+    def setUp(self):
+        self.client = ESignAnyWhereClient(api_token="token")
+
+    @mock.patch("requests.request")
+    def test_raised_classes(self, request):
+        for response, error_class in [
+            (make_response(404, {"ErrorId": "ERR0007"}), exceptions.ESawNotFoundError),
+            (make_response(400, {"ErrorId": "ERR0007"}), exceptions.ESawNotFoundError),
+            (
+                make_response(400, {"ErrorId": "ERR0001"}),
+                exceptions.ESawValidationError,
+            ),
+            (make_response(404, {"ErrorId": "ERR0250"}), exceptions.ESawNotFoundError),
+            (make_response(404, {"ErrorId": "ERR0260"}), exceptions.ESawNotFoundError),
+            (
+                make_response(400, {"ErrorId": "ERR0013"}),
+                exceptions.ESawInvalidStatusError,
+            ),
+            (
+                make_response(400, {"ErrorId": "ERR0097"}),
+                exceptions.ESawEmptyFileError,
+            ),
+            (
+                make_response(400, {"ErrorId": "ERR0110"}),
+                exceptions.ESawUnknownUserError,
+            ),
+            (
+                make_response(400, {"ErrorId": "ERR0163"}),
+                exceptions.ESawExpirationInPastError,
+            ),
+            (make_response(409, {}), exceptions.ESawConflictError),
+            (make_response(429, {}), exceptions.ESawRateLimitedError),
+            (make_response(503, content=b"Unavailable"), exceptions.ESawTransientError),
+            (make_response(599, {}), exceptions.ESawTransientError),
+            (make_response(403, {}), exceptions.ESawErrorResponse),
+            (make_response(401, {}), exceptions.ESawUnauthorizedRequest),
+        ]:
+            request.return_value = response
+            with self.assertRaises(exceptions.BaseAPIESawErrorResponse) as cm:
+                self.client.get_envelope("1")
+            self.assertIs(type(cm.exception), error_class)
+
+    def test_retry_hints(self):
+        rate_limited = exceptions.ESawRateLimitedError(
+            status_code=429,
+            service_url="",
+            method_name="",
+            request_data={},
+            response=make_response(429, {}, headers={"Retry-After": "12"}),
+        )
+        not_found = exceptions.ESawNotFoundError(
+            status_code=404,
+            service_url="",
+            method_name="",
+            request_data={},
+            response=make_response(404, {}),
+        )
+        transient = exceptions.ESawTransientError(
+            status_code=503, service_url="", method_name="", request_data={}
+        )
+
+        self.assertTrue(rate_limited.retryable)
+        self.assertEqual(rate_limited.suggested_backoff, 12)
+        self.assertFalse(not_found.retryable)
+        self.assertIsNone(not_found.suggested_backoff)
+        self.assertEqual(transient.suggested_backoff, 1.0)
+        self.assertTrue(exceptions.is_retryable(requests.ConnectionError()))
+        self.assertFalse(exceptions.is_retryable(ValueError()))
+        self.assertIsNone(exceptions.get_backoff(not_found))
+        self.assertEqual(exceptions.get_backoff(requests.Timeout(), default=2), 2)
+
+    def test_unprocessed(self):
+        refused = requests.ConnectionError(
+            urllib3.exceptions.MaxRetryError(
+                None, "/", urllib3.exceptions.NewConnectionError(None, "refused")
+            )
+        )
+        dropped = requests.ConnectionError(
+            urllib3.exceptions.ProtocolError("Connection aborted.")
+        )
+
+        def make_error(status_code, headers=None):
+            return exceptions.get_error_class(status_code)(
+                status_code=status_code,
+                service_url="",
+                method_name="",
+                request_data={},
+                response=make_response(status_code, {}, headers=headers),
+            )
+
+        self.assertTrue(exceptions.is_unprocessed(refused))
+        self.assertTrue(exceptions.is_unprocessed(requests.ConnectTimeout()))
+        self.assertTrue(exceptions.is_unprocessed(make_error(429)))
+        self.assertTrue(
+            exceptions.is_unprocessed(make_error(503, {"Retry-After": "5"}))
+        )
+        self.assertFalse(exceptions.is_unprocessed(dropped))
+        self.assertFalse(exceptions.is_unprocessed(requests.ReadTimeout()))
+        self.assertFalse(exceptions.is_unprocessed(make_error(503)))
+        self.assertFalse(exceptions.is_unprocessed(make_error(500)))
+
+    def test_subclass_of_error_response(self):
+        for error_class in {
+            *exceptions.STATUS_CODE_ERRORS.values(),
+            *exceptions.ERROR_ID_ERRORS.values(),
+        }:
+            self.assertTrue(issubclass(error_class, exceptions.ESawErrorResponse))
+        for error_class in exceptions.ERROR_ID_ERRORS.values():
+            self.assertFalse(error_class.retryable)
+
+
+if __name__ == "__main__":
+    unittest.main()
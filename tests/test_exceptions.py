@@ -0,0 +1,110 @@
+import json
+import pickle
+import unittest
+
+from esignanywhere_python_client.exceptions import (
+    MAX_BODY_BYTES,
+    ESawErrorResponse,
+    ESawInvalidVersionError,
+    ESawUnauthorizedRequest,
+)
+
+from .utils import make_response
+
+
+class TestExceptions(unittest.TestCase):
+    def make_error(self, response, error_class=ESawErrorResponse):
+        return error_class(
+            status_code=response.status_code,
+            service_url="https://demo.esignanywhere.net/Api/v6/envelope/1",
+            method_name="get_envelope",
+            request_data={},
+            response=response,
+        )
+
+    def test_snapshot(self):
+        response = make_response(
+            404,
+            {"ErrorId": "ERR0007", "Message": "Not found", "TraceId": "t"},
+            headers={
+                "Content-Type": "application/json",
+                "Retry-After": "3",
+                "Set-Cookie": "session=1",
+            },
+        )
+        error = self.make_error(response)
+
+        self.assertEqual(error.status_code, 404)
+        self.assertEqual(error.response_data["ErrorId"], "ERR0007")
+        self.assertEqual(error.error_id, "ERR0007")
+        self.assertEqual(error.error_response.Message, "Not found")
+        self.assertEqual(error.response_headers["Retry-After"], "3")
+        self.assertNotIn("Set-Cookie", error.response_headers)
+        self.assertIs(error.response, response)
+
+    def test_bounded_body(self):
+        response = make_response(500, content=b"x" * (MAX_BODY_BYTES * 2))
+        error = self.make_error(response)
+
+        self.assertEqual(len(error.response_body), MAX_BODY_BYTES)
+        self.assertEqual(error.response_data, "x" * MAX_BODY_BYTES)
+        self.assertIsNone(error.error_response)
+
+    def test_redacted_and_bounded_request_data(self):
+        request_data = {
+            "Name": "Contract",
+            "Activities": [
+                {"ContactInformation": {"Email": "mario@example.com", "GivenName": "M"}}
+            ],
+            "AccessCode": "1234",
+            "Documents": [{"Content": "x" * MAX_BODY_BYTES} for _ in range(10)],
+        }
+        for data in (request_data, json.dumps(request_data).encode()):
+            error = ESawErrorResponse(
+                status_code=400,
+                service_url="https://demo.esignanywhere.net/Api/v6/envelope/send",
+                method_name="create_and_send_envelope",
+                request_data=data,
+            )
+
+            snapshot = error.request_data
+            self.assertEqual(snapshot["Name"], "Contract")
+            self.assertEqual(snapshot["AccessCode"], "***")
+            contact = snapshot["Activities"][0]["ContactInformation"]
+            self.assertEqual(contact, {"Email": "***", "GivenName": "M"})
+            self.assertLess(len(json.dumps(snapshot)), MAX_BODY_BYTES + 1024)
+            self.assertEqual(snapshot["Documents"][-1], "... [truncated]")
+
+        error = ESawErrorResponse(400, "", "", request_data=b"\x00" * 10)
+        self.assertEqual(error.request_data, "<10 bytes>")
+
+    def test_pickle(self):
+        response = make_response(401, {"ErrorId": "ERR0001"})
+        with open(__file__, "rb") as file:
+            error = ESawUnauthorizedRequest(
+                status_code=401,
+                service_url="https://demo.esignanywhere.net/Api/v6/file/upload",
+                method_name="upload_file",
+                request_data={"File": file},
+                response=response,
+            )
+            error.response_data
+
+        restored = pickle.loads(pickle.dumps(error))
+
+        self.assertIsInstance(restored, ESawUnauthorizedRequest)
+        self.assertEqual(restored.status_code, 401)
+        self.assertEqual(restored.response_data["ErrorId"], "ERR0001")
+        self.assertEqual(restored.request_data, {"File": f"<file {__file__}>"})
+        self.assertIsNone(restored.response)
+        self.assertIn("ERR0001", str(self.make_error(response)))
+
+    def test_pickle_invalid_version(self):
+        error = pickle.loads(pickle.dumps(ESawInvalidVersionError("v4", ["v6"])))
+
+        self.assertEqual(error.version, "v4")
+        self.assertEqual(error.supported_versions, ["v6"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.expiration_sweeper import (
+    EXPIRED,
+    ExpirationSweeper,
+    RestartPolicy,
+)
+
+from .utils import make_response
+
+DAY = 86400
+NOW = 1000 * DAY
+
+
+class FakeServer:
+    """Answer find_envelope with the envelopes of a status and restart them."""
+
+    def __init__(self, envelopes):
+        self.envelopes = envelopes
+        self.queries = []
+        self.restarts = []
+        self.failing = set()
+
+    def request(self, method, url=None, json=None, **kwargs):
+        if url.endswith("v6/envelope/find"):
+            self.queries.append(json)
+            # Every window finds the same envelopes, the sweeper dedups them
+            found = [
+                envelope
+                for envelope in self.envelopes
+                if json["Status"] == EXPIRED and envelope["Status"] == "Expired"
+            ]
+            return make_response(json_data={"Envelopes": found})
+        if json["EnvelopeId"] in self.failing:
+            return make_response(status_code=400, json_data={"Message": "no"})
+        self.restarts.append(json)
+        return make_response(content=b"")
+
+
+class TestExpirationSweeper(unittest.TestCase):
+    def setUp(self):
+        self.client = ESignAnyWhereClient("token", "", is_test_env=True)
+        self.server = FakeServer(
+            [
+                {"Id": "expired", "Status": "Expired", "IsExpiringSoon": False},
+                {"Id": "expiring", "Status": "Active", "IsExpiringSoon": True},
+                {"Id": "active", "Status": "Active", "IsExpiringSoon": False},
+            ]
+        )
+        patcher = mock.patch("requests.request", side_effect=self.server.request)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.ledger_path = os.path.join(directory.name, "ledger.json")
+        self.now = NOW
+
+    def make_sweeper(self, policy=None, **options):
+        return ExpirationSweeper(
+            self.client,
+            policy or RestartPolicy(expires_in=timedelta(days=1)),
+            ledger_path=self.ledger_path,
+            clock=lambda: self.now,
+            **options,
+        )
+
+    def test_queries_windows(self):
+        sweeper = self.make_sweeper(
+            RestartPolicy(expires_in=timedelta(days=1), expired_since_days=2),
+            lookback_days=7,
+            window_days=3,
+        )
+
+        queries = sweeper.get_queries()
+
+        self.assertEqual(
+            [(query.EndDate - query.StartDate).days for query in queries], [3, 3, 1]
+        )
+        self.assertEqual({query.Status for query in queries}, {EXPIRED})
+        self.assertEqual(queries[0].InStatusSinceDays, 2)
+        self.assertEqual(queries[-1].StartDate.timestamp(), NOW - 7 * DAY)
+
+    def test_restarts_expired_envelopes(self):
+        report = self.make_sweeper(lookback_days=3).sweep()
+
+        self.assertEqual(len(self.server.queries), 3)
+        self.assertEqual(report.found, 1)
+        self.assertEqual(report.restarted, ["expired"])
+        (restart,) = self.server.restarts
+        self.assertEqual(restart["EnvelopeId"], "expired")
+        self.assertIsNone(restart["ExpirationInSecondsAfterSending"])
+        # From the restart, not from the original sending
+        self.assertEqual(
+            datetime.fromisoformat(restart["ExpirationDate"]).timestamp(), NOW + DAY
+        )
+
+    def test_expiration_date(self):
+        expiration_date = datetime.fromtimestamp(NOW + 2 * DAY, timezone.utc)
+        policy = RestartPolicy(expiration_date=expiration_date)
+
+        self.make_sweeper(policy).sweep()
+
+        self.assertEqual(
+            datetime.fromisoformat(self.server.restarts[0]["ExpirationDate"]),
+            expiration_date,
+        )
+        self.now = NOW + 3 * DAY
+        with self.assertRaises(ValueError):
+            self.make_sweeper(policy).sweep()
+
+    def test_policy_requires_an_expiration(self):
+        with self.assertRaises(ValueError):
+            RestartPolicy()
+        with self.assertRaises(ValueError):
+            RestartPolicy(
+                expires_in=timedelta(days=1),
+                expiration_date=datetime(2030, 1, 1, tzinfo=timezone.utc),
+            )
+        with self.assertRaises(ValueError):
+            RestartPolicy(expiration_date=datetime(2030, 1, 1))
+
+    def test_only_expired_envelopes_are_restarted(self):
+        self.server.envelopes.append(
+            {"Id": "expired-2", "Status": "Expired", "IsExpiringSoon": False}
+        )
+        policy = RestartPolicy(
+            expires_in=timedelta(days=1),
+            predicate=lambda envelope: envelope.Id != "expired",
+        )
+
+        report = self.make_sweeper(policy).sweep()
+
+        self.assertEqual(report.restarted, ["expired-2"])
+        self.assertEqual(report.skipped, 1)
+        self.assertNotIn(
+            "expiring", [restart["EnvelopeId"] for restart in self.server.restarts]
+        )
+
+    def test_touches_envelopes_once_per_cycle(self):
+        policy = RestartPolicy(expires_in=timedelta(days=1), max_restarts=None)
+        self.make_sweeper(policy).sweep()
+        self.now += 60
+
+        report = self.make_sweeper(policy).sweep()
+
+        self.assertEqual(report.restarted, [])
+        self.assertEqual(report.skipped, 1)
+        self.assertEqual(len(self.server.restarts), 1)
+
+        self.now += DAY
+        report = self.make_sweeper(policy).sweep()
+
+        self.assertEqual(report.restarted, ["expired"])
+
+    def test_max_restarts(self):
+        self.make_sweeper().sweep()
+        self.now += DAY
+
+        report = self.make_sweeper().sweep()
+
+        self.assertEqual(report.restarted, [])
+        self.assertEqual(len(self.server.restarts), 1)
+
+    def test_failed_restarts_are_retried(self):
+        self.server.failing.add("expired")
+        sweeper = self.make_sweeper()
+
+        report = sweeper.sweep()
+
+        self.assertEqual([outcome.key for outcome in report.failed], ["expired"])
+        self.assertNotIn("expired", sweeper.ledger.entries)
+        self.server.failing.clear()
+        self.assertEqual(self.make_sweeper().sweep().restarted, ["expired"])
+
+    def test_ledger_is_pruned(self):
+        self.make_sweeper(lookback_days=3).sweep()
+        self.now += 2 * DAY
+        self.assertIn("expired", self.make_sweeper(lookback_days=3).ledger.entries)
+
+        self.server.envelopes.clear()
+        self.now += 2 * DAY
+        sweeper = self.make_sweeper(lookback_days=3)
+        sweeper.sweep()
+
+        self.assertEqual(sweeper.ledger.entries, {})
+        self.assertEqual(os.listdir(os.path.dirname(self.ledger_path)), ["ledger.json"])
+
+    def test_failed_queries_are_reported(self):
+        sweeper = self.make_sweeper(lookback_days=2)
+        with mock.patch.object(
+            self.client, "find_envelope", side_effect=ValueError("boom")
+        ):
+            report = sweeper.sweep()
+
+        self.assertEqual(len(report.failed_queries), 2)
+        self.assertEqual(report.found, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
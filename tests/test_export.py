@@ -0,0 +1,179 @@
+import csv
+import importlib.util
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from esignanywhere_python_client import export
+from esignanywhere_python_client.models import models_v6
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+HISTORY = {
+    "Events": [
+        {
+            "CreationDate": "2024-01-02T03:04:05Z",
+            "Type": "EnvelopeCreated",
+            "Completed": True,
+        },
+        {
+            "CreationDate": "2024-01-02T03:05:00Z",
+            "Type": "EmailSent",
+            "AffectedRecipient": {
+                "Id": "2c3c2b4c-c1ee-4a5c-9b3a-0d7b6a3f4e55",
+                "Email": "mario@example.com",
+                "GivenName": "Mario",
+                "Surname": "Rossi",
+            },
+            "Attempt": 2,
+        },
+    ]
+}
+
+ELEMENTS = {
+    "UnassignedElements": {
+        "TextBoxes": [{"ElementId": "name", "Value": "Mario", "DocumentNumber": 1}],
+        "CheckBoxes": [{"ElementId": "agree", "IsChecked": True}],
+    },
+    "Activities": [
+        {
+            "Id": "activity",
+            "Action": {
+                "Sign": {
+                    "Elements": {
+                        "ListBoxes": [
+                            {"ElementId": "colors", "PreSelectedItems": ["red", "blue"]}
+                        ],
+                        "RadioButtons": [
+                            {"GroupName": "size", "SelectedItem": "L", "Required": True}
+                        ],
+                    }
+                }
+            },
+        }
+    ],
+}
+
+
+class TestExport(unittest.TestCase):
+    def test_envelopes_to_csv(self):
+        envelopes = [
+            models_v6.EnvelopeFindEnvelope(Id="1", Name="Contract", Status="Active"),
+            {"Id": "2", "Name": "Invoice", "Status": "Completed", "MetaData": "<m/>"},
+        ]
+        file = io.StringIO()
+
+        count = export.export_envelopes(envelopes, file, format="csv")
+
+        self.assertEqual(count, 2)
+        rows = list(csv.DictReader(io.StringIO(file.getvalue())))
+        self.assertEqual([row["Id"] for row in rows], ["1", "2"])
+        self.assertEqual(rows[1]["MetaData"], "<m/>")
+        self.assertEqual(rows[0]["MetaData"], "")
+
+    def test_history_events_from_models_and_dicts(self):
+        model = models_v6.EnvelopeGetHistoryResponse.model_validate(HISTORY)
+        file = io.StringIO()
+
+        export.export_history_events(
+            [("1", model), ("2", HISTORY)], file, format="jsonl"
+        )
+
+        rows = [json.loads(line) for line in file.getvalue().splitlines()]
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]["EnvelopeId"], "1")
+        self.assertTrue(rows[0]["CreationDate"].startswith("2024-01-02T03:04:05"))
+        self.assertEqual(rows[1]["RecipientEmail"], "mario@example.com")
+        self.assertEqual(rows[1]["Attempt"], 2)
+        self.assertEqual(rows[3]["RecipientSurname"], "Rossi")
+        self.assertEqual(rows[1]["Type"], rows[3]["Type"])
+
+    def test_form_field_values(self):
+        model = models_v6.EnvelopeGetElementsResponse.model_validate(ELEMENTS)
+        for response in (model, ELEMENTS):
+            file = io.StringIO()
+            export.export_form_field_values([("1", response)], file, format="jsonl")
+
+            rows = [json.loads(line) for line in file.getvalue().splitlines()]
+            values = {
+                row["ElementId"]: (row["ActivityId"], row["FieldType"], row["Value"])
+                for row in rows
+            }
+            self.assertEqual(
+                values,
+                {
+                    "name": (None, "TextBoxes", "Mario"),
+                    "agree": (None, "CheckBoxes", "true"),
+                    "colors": ("activity", "ListBoxes", '["red", "blue"]'),
+                    "size": ("activity", "RadioButtons", "L"),
+                },
+            )
+
+    def test_bulk_children_in_batches(self):
+        written = []
+        table = export.BULK_CHILDREN
+        bulk = models_v6.EnvelopeBulkGetResponse(
+            BulkStatus="Active",
+            Children=[
+                {"EnvelopeId": str(index), "Status": "Active"} for index in range(5)
+            ],
+        )
+
+        def get_rows(item):
+            written.append(item[0])
+            return table.get_rows(item)
+
+        file = io.StringIO()
+        count = export.export(
+            export.Table(table.name, table.columns, get_rows),
+            iter([("bulk", bulk), ("other", {"Children": []})]),
+            file,
+            format="csv",
+            batch_size=2,
+        )
+
+        self.assertEqual(count, 5)
+        self.assertEqual(written, ["bulk", "other"])
+        rows = list(csv.reader(io.StringIO(file.getvalue())))
+        self.assertEqual(rows[0][:2], ["EnvelopeBulkParentId", "EnvelopeId"])
+        self.assertEqual([row[1] for row in rows[1:]], ["0", "1", "2", "3", "4"])
+
+    def test_format_from_the_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "envelopes.jsonl")
+            export.export_envelopes([{"Id": "1"}], path)
+
+            with open(path) as file:
+                self.assertEqual(json.loads(file.read())["Id"], "1")
+            with self.assertRaises(ValueError):
+                export.export_envelopes([], os.path.join(directory, "envelopes.xml"))
+        with self.assertRaises(ValueError):
+            export.export_envelopes([], io.StringIO())
+        with self.assertRaises(ValueError):
+            export.export_envelopes([], io.StringIO(), format="xml")
+
+    @unittest.skipUnless(HAS_PYARROW, "requires pyarrow")
+    def test_parquet(self):
+        import pyarrow.parquet
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "history.parquet")
+            count = export.export_history_events(
+                [("1", HISTORY), ("2", HISTORY)], path, batch_size=3
+            )
+
+            table = pyarrow.parquet.read_table(path)
+        self.assertEqual(count, 4)
+        self.assertEqual(table.num_rows, 4)
+        self.assertEqual(table.column("Attempt").to_pylist(), [None, 2, None, 2])
+
+    @unittest.skipIf(HAS_PYARROW, "pyarrow is installed")
+    def test_parquet_requires_pyarrow(self):
+        with self.assertRaises(ImportError):
+            export.export_envelopes([], "envelopes.parquet")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import gc
+import json
+import unittest
+from unittest import mock
+
+from esignanywhere_python_client import fragments
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.middleware import Middleware
+from esignanywhere_python_client.models import models_v6
+
+from .utils import make_response
+
+
+def make_request(email_configuration, email="signer@example.com"):
+    return models_v6.EnvelopeSendRequest(
+        Name="Contract",
+        Documents=[{"FileId": "file-id"}],
+        Activities=[
+            {
+                "Action": {
+                    "View": {
+                        "RecipientConfiguration": {
+                            "ContactInformation": {
+                                "Email": email,
+                                "GivenName": "Mario",
+                                "Surname": "Rossi",
+                            }
+                        }
+                    }
+                }
+            }
+        ],
+        EmailConfiguration=email_configuration,
+    )
+
+
+class TestFragments(unittest.TestCase):
+    def setUp(self):
+        self.email_configuration = models_v6.EnvelopeSendEmailConfiguration(
+            Subject="Please sign", Message="Hello"
+        )
+        self.request = make_request(self.email_configuration)
+        self.addCleanup(fragments.unfreeze, self.email_configuration)
+        self.addCleanup(fragments.unfreeze, self.request)
+        self.expected = self.request.model_dump(mode="json")
+
+    def test_dumps_splices_frozen_parts(self):
+        fragments.freeze(self.email_configuration)
+        # A later change is not seen, the cached JSON is used
+        self.email_configuration.Subject = "Changed"
+        self.request.Activities[
+            0
+        ].Action.View.RecipientConfiguration.ContactInformation.Email = (
+            "other@example.com"
+        )
+        body = json.loads(fragments.dumps(self.request))
+
+        self.expected["Activities"][0]["Action"]["View"]["RecipientConfiguration"][
+            "ContactInformation"
+        ]["Email"] = "other@example.com"
+        self.assertEqual(body, self.expected)
+        # The request itself is left untouched
+        self.assertIs(self.request.EmailConfiguration, self.email_configuration)
+
+    def test_frozen_root_and_unfrozen(self):
+        self.assertEqual(json.loads(fragments.dumps(self.request)), self.expected)
+        fragments.freeze(self.request)
+        self.assertEqual(json.loads(fragments.dumps(self.request)), self.expected)
+
+    def test_released_with_model(self):
+        email_configuration = fragments.freeze(
+            models_v6.EnvelopeSendEmailConfiguration(Subject="Temporary")
+        )
+        self.assertTrue(fragments.is_frozen(email_configuration))
+        count = len(fragments._fragments)
+        del email_configuration
+        gc.collect()
+        self.assertEqual(len(fragments._fragments), count - 1)
+
+    def test_reused_id_is_not_frozen(self):
+        model = models_v6.EnvelopeSendEmailConfiguration(Subject="Other")
+        fragments.freeze(self.email_configuration)
+        # A stale entry, as left by a freed model whose id was reused
+        fragments._fragments[id(model)] = fragments._fragments[
+            id(self.email_configuration)
+        ]
+        self.addCleanup(fragments._fragments.pop, id(model), None)
+
+        self.assertFalse(fragments.is_frozen(model))
+        self.assertTrue(fragments.is_frozen(self.email_configuration))
+        self.assertEqual(
+            json.loads(fragments.dumps(model)), model.model_dump(mode="json")
+        )
+
+    @mock.patch("requests.request")
+    def test_client_sends_spliced_body(self, request):
+        request.return_value = make_response(json_data={"EnvelopeId": "envelope-id"})
+        fragments.freeze(self.email_configuration)
+        ESignAnyWhereClient(api_token="token").create_and_send_envelope(
+            fragments.dumps(self.request)
+        )
+
+        self.assertEqual(json.loads(request.call_args.kwargs["data"]), self.expected)
+
+    @mock.patch("requests.request")
+    def test_models_are_sent_as_dicts(self, request):
+        request.return_value = make_response(json_data={"EnvelopeId": "envelope-id"})
+        fragments.freeze(self.email_configuration)
+        seen = []
+
+        class Recorder(Middleware):
+            def __call__(self, call, call_next):
+                seen.append(call.request_data)
+                return call_next(call)
+
+        ESignAnyWhereClient(
+            api_token="token", middlewares=[Recorder()]
+        ).create_and_send_envelope(self.request)
+
+        self.assertEqual(seen, [self.expected])
+        self.assertEqual(request.call_args.kwargs["json"], self.expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
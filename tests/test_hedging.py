@@ -0,0 +1,158 @@
+import contextvars
+import threading
+import time
+import unittest
+from unittest import mock
+
+from esignanywhere_python_client import metrics
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.hedging import HedgeBudget, HedgingMiddleware
+from esignanywhere_python_client.metrics import InMemoryMetricsSink
+
+from .utils import make_response
+
+REQUEST_ID = contextvars.ContextVar("request_id", default=None)
+
+
+class TestHedging(unittest.TestCase):
+    def setUp(self):
+        self.sink = InMemoryMetricsSink()
+        for _ in range(50):
+            self.sink.observe(
+                metrics.REQUEST_DURATION,
+                0.02,
+                {"endpoint": "get_envelope_viewer_links", "version": "v6"},
+            )
+        self.middleware = HedgingMiddleware(self.sink, max_delay=0.05)
+        self.client = ESignAnyWhereClient(
+            api_token="token", metrics_sink=self.sink, middlewares=[self.middleware]
+        )
+        self.addCleanup(self.middleware.close)
+
+    def test_slow_first_attempt_is_hedged(self):
+        calls = []
+        lock = threading.Lock()
+
+        def request(*args, **kwargs):
+            with lock:
+                calls.append(time.monotonic())
+                attempt = len(calls)
+            if attempt == 1:
+                time.sleep(1)
+            return make_response(
+                json_data={"ViewerLinks": [{"ActivityId": str(attempt)}]}
+            )
+
+        with mock.patch("requests.request", side_effect=request):
+            started = time.monotonic()
+            result = self.client.get_envelope_viewer_links("1")
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(result.ViewerLinks[0].ActivityId, "2")
+        self.assertLess(elapsed, 0.5)
+        labels = {"endpoint": "get_envelope_viewer_links", "version": "v6"}
+        self.assertEqual(self.sink.get_counter("esaw_hedged_calls_total", **labels), 1)
+        self.assertEqual(self.sink.get_counter("esaw_hedge_wins_total", **labels), 1)
+
+    def test_attempts_keep_the_context(self):
+        seen = []
+
+        def request(*args, **kwargs):
+            seen.append((REQUEST_ID.get(), threading.current_thread().name))
+            if len(seen) == 1:
+                time.sleep(0.3)
+            return make_response(json_data={"ViewerLinks": []})
+
+        REQUEST_ID.set("abc")
+        self.addCleanup(REQUEST_ID.set, None)
+        with mock.patch("requests.request", side_effect=request):
+            self.client.get_envelope_viewer_links("1")
+
+        self.assertEqual([request_id for request_id, _ in seen], ["abc", "abc"])
+        self.assertTrue(all(name.startswith("esaw-hedge_") for _, name in seen))
+
+    @mock.patch("requests.request")
+    def test_calls_reuse_the_pool_threads(self, request):
+        request.return_value = make_response(json_data={"ViewerLinks": []})
+        threads = threading.active_count()
+
+        for _ in range(20):
+            self.client.get_envelope_viewer_links("1")
+
+        self.assertEqual(request.call_count, 20)
+        self.assertEqual(len(self.middleware.executor._threads), 1)
+        self.assertLessEqual(threading.active_count(), threads + 1)
+
+    def test_no_hedge_while_the_pool_is_busy(self):
+        middleware = HedgingMiddleware(self.sink, max_delay=0.05, max_workers=1)
+        self.addCleanup(middleware.close)
+        client = ESignAnyWhereClient(
+            api_token="token", metrics_sink=self.sink, middlewares=[middleware]
+        )
+        release = threading.Event()
+        middleware.executor.submit(release.wait)
+        middleware._slots.acquire()
+        self.addCleanup(release.set)
+        calls = []
+
+        def request(*args, **kwargs):
+            calls.append(1)
+            time.sleep(0.2)
+            return make_response(json_data={"ViewerLinks": []})
+
+        with mock.patch("requests.request", side_effect=request):
+            client.get_envelope_viewer_links("1")
+
+        # The first attempt ran on the calling thread, without a hedge
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(
+            self.sink.get_counter(
+                "esaw_hedge_pool_busy_total",
+                endpoint="get_envelope_viewer_links",
+                version="v6",
+            ),
+            1,
+        )
+
+    @mock.patch("requests.request")
+    def test_closed_middleware_does_not_hedge(self, request):
+        request.return_value = make_response(json_data={"ViewerLinks": []})
+        self.middleware.close()
+
+        self.client.get_envelope_viewer_links("1")
+
+        self.assertEqual(request.call_count, 1)
+        self.assertTrue(self.middleware.executor._shutdown)
+
+    @mock.patch("requests.request")
+    def test_fast_call_is_not_hedged(self, request):
+        request.return_value = make_response(json_data={"ViewerLinks": []})
+        self.client.get_envelope_viewer_links("1")
+
+        self.assertEqual(request.call_count, 1)
+
+    @mock.patch("requests.request")
+    def test_not_enough_samples(self, request):
+        request.return_value = make_response(json_data={})
+        self.sink.reset()
+
+        self.assertIsNone(
+            self.middleware.get_delay(
+                mock.Mock(endpoint="get_envelope_viewer_links", version="v6")
+            )
+        )
+
+    def test_budget(self):
+        budget = HedgeBudget(ratio=0.5, burst=1)
+
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from unittest import mock
+
+import requests
+
+from esignanywhere_python_client import metrics
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.exceptions import ESawErrorResponse
+from esignanywhere_python_client.metrics import InMemoryMetricsSink, MetricsSink
+
+from .utils import make_response
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.sink = InMemoryMetricsSink()
+        self.client = ESignAnyWhereClient(
+            api_token="token", is_test_env=True, metrics_sink=self.sink
+        )
+
+    @mock.patch("requests.request")
+    def test_successful_call(self, request):
+        request.return_value = make_response(
+            json_data={"EnvelopeId": "1"}, request_body=b'{"a": 1}'
+        )
+        self.client.get_envelope_viewer_links("1")
+
+        labels = {"endpoint": "get_envelope_viewer_links", "version": "v6"}
+        self.assertTrue(request.call_args.kwargs["stream"])
+        self.assertEqual(
+            self.sink.get_counter(metrics.RESPONSES, status_code="200", **labels), 1
+        )
+        self.assertEqual(
+            self.sink.get_histogram(metrics.REQUEST_BYTES, **labels).sum, 8
+        )
+        self.assertEqual(
+            self.sink.get_histogram(metrics.RESPONSE_BYTES, **labels).sum,
+            len(b'{"EnvelopeId": "1"}'),
+        )
+        for phase in metrics.PHASES:
+            self.assertEqual(
+                self.sink.get_histogram(
+                    metrics.PHASE_DURATION, phase=phase, **labels
+                ).count,
+                1,
+            )
+
+    @mock.patch("requests.request")
+    def test_error_call(self, request):
+        request.return_value = make_response(404, {"ErrorId": "ERR0007"})
+        with self.assertRaises(ESawErrorResponse):
+            self.client.get_envelope("1")
+
+        self.assertEqual(
+            self.sink.get_counter(
+                metrics.RESPONSES,
+                endpoint="get_envelope",
+                version="v6",
+                status_code="404",
+            ),
+            1,
+        )
+
+    @mock.patch("requests.request")
+    def test_connection_error(self, request):
+        request.side_effect = requests.ConnectionError()
+        with self.assertRaises(requests.ConnectionError):
+            self.client.get_teams()
+
+        self.assertEqual(
+            self.sink.get_counter(
+                metrics.RESPONSES, endpoint="get_teams", version="v6", status_code="0"
+            ),
+            1,
+        )
+
+    @mock.patch("requests.request")
+    def test_disabled_sink(self, request):
+        request.return_value = make_response(json_data={})
+        client = ESignAnyWhereClient(api_token="token", is_test_env=True)
+        client.get_teams()
+
+        self.assertIsInstance(client.metrics, MetricsSink)
+        self.assertFalse(request.call_args.kwargs["stream"])
+
+    def test_histogram_percentile(self):
+        histogram = metrics.Histogram(metrics.LATENCY_BUCKETS)
+        for value in range(1, 101):
+            histogram.observe(value / 100)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.percentile(50), 0.5, delta=0.02)
+        self.assertAlmostEqual(histogram.percentile(99), 0.99, delta=0.02)
+        self.assertEqual(histogram.as_dict()["buckets"]["1.0"], 50)
+
+    def test_histogram_window(self):
+        histogram = metrics.Histogram(metrics.LATENCY_BUCKETS, window=10)
+        for value in [5.0] * 10 + [1.0] * 5:
+            histogram.observe(value)
+
+        self.assertEqual(histogram.sorted_recent, [1.0] * 5 + [5.0] * 5)
+        self.assertEqual(histogram.percentile(0), 1.0)
+        self.assertEqual(histogram.percentile(100), 5.0)
+        for _ in range(5):
+            histogram.observe(2.0)
+        self.assertEqual(histogram.percentile(100), 2.0)
+        self.assertEqual(histogram.max, 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from unittest import mock
+
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.middleware import HeadersMiddleware, Middleware
+from esignanywhere_python_client.models.models_v6 import (
+    EnvelopeCancelRequest,
+    EnvelopeGetViewerLinksResponse,
+)
+
+from .utils import make_response
+
+
+class RecordingMiddleware(Middleware):
+    def __init__(self, name, events):
+        self.name = name
+        self.events = events
+
+    def __call__(self, call, call_next):
+        self.events.append(f"{self.name}:before")
+        result = call_next(call)
+        self.events.append(f"{self.name}:after:{call.response.status_code}")
+        return result
+
+
+class ShortCircuitMiddleware(Middleware):
+    def __init__(self, result):
+        self.result = result
+
+    def __call__(self, call, call_next):
+        return self.result
+
+
+class TestMiddleware(unittest.TestCase):
+    @mock.patch("requests.request")
+    def test_chain_order(self, request):
+        request.return_value = make_response(json_data={})
+        events = []
+        client = ESignAnyWhereClient(
+            api_token="token",
+            middlewares=[
+                RecordingMiddleware("outer", events),
+                RecordingMiddleware("inner", events),
+            ],
+        )
+        client.cancel_envelope(EnvelopeCancelRequest(EnvelopeId="1"))
+
+        self.assertEqual(
+            events,
+            ["outer:before", "inner:before", "inner:after:200", "outer:after:200"],
+        )
+
+    @mock.patch("requests.request")
+    def test_call_information(self, request):
+        request.return_value = make_response(json_data={})
+        calls = []
+
+        class Spy(Middleware):
+            def __call__(self, call, call_next):
+                calls.append(call)
+                return call_next(call)
+
+        cancel_request = EnvelopeCancelRequest(EnvelopeId="1")
+        client = ESignAnyWhereClient(api_token="token", middlewares=[Spy()])
+        client.cancel_envelope(cancel_request)
+
+        call = calls[0]
+        self.assertEqual(call.endpoint, "cancel_envelope")
+        self.assertEqual(call.version, "v6")
+        self.assertIs(call.request_model, cancel_request)
+        self.assertEqual(call.request_data, {"EnvelopeId": "1"})
+        self.assertFalse(call.is_idempotent)
+
+    @mock.patch("requests.request")
+    def test_short_circuit(self, request):
+        cached = EnvelopeGetViewerLinksResponse(ViewerLinks=[])
+        client = ESignAnyWhereClient(
+            api_token="token", middlewares=[ShortCircuitMiddleware(cached)]
+        )
+
+        self.assertIs(client.get_envelope_viewer_links("1"), cached)
+        request.assert_not_called()
+
+    @mock.patch("requests.request")
+    def test_add_middleware(self, request):
+        request.return_value = make_response(json_data={})
+        client = ESignAnyWhereClient(api_token="token")
+        client.add_middleware(HeadersMiddleware({"X-Trace-Id": "abc"}))
+        client.get_teams()
+
+        headers = request.call_args.kwargs["headers"]
+        self.assertEqual(headers["X-Trace-Id"], "abc")
+        self.assertEqual(headers["apiToken"], "token")
+
+
+if __name__ == "__main__":
+    unittest.main()
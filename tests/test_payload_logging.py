@@ -0,0 +1,162 @@
+import json
+import logging
+import unittest
+from unittest import mock
+
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.models import models_v6
+from esignanywhere_python_client.payload_logging import (
+    LazyPayload,
+    PayloadLogConfig,
+    render_payload,
+)
+
+from .utils import make_response
+
+
+class TestPayloadLogging(unittest.TestCase):
+    def test_redaction(self):
+        rendered = render_payload(
+            {
+                "apiToken": "secret-token",
+                "ContactInformation": {"Email": "mario@example.com", "GivenName": "M"},
+                "Message": "Contact mario@example.com",
+            },
+            PayloadLogConfig(),
+        )
+
+        self.assertNotIn("secret-token", rendered)
+        self.assertNotIn("mario@example.com", rendered)
+        self.assertIn('"GivenName": "M"', rendered)
+
+    def test_nested_redaction(self):
+        rendered = render_payload(
+            {
+                "Activities": [
+                    {
+                        "Action": {
+                            "Sign": {
+                                "RecipientConfiguration": {
+                                    "ContactInformation": {
+                                        "Email": "luigi",
+                                        "PhoneNumber": "+39 123",
+                                    },
+                                    "AuthenticationConfiguration": {
+                                        "AccessCodeAuthentications": [
+                                            {"AccessCode": "4321"}
+                                        ],
+                                    },
+                                }
+                            }
+                        }
+                    }
+                ]
+            },
+            PayloadLogConfig(),
+        )
+
+        self.assertNotIn("luigi", rendered)
+        self.assertNotIn("+39 123", rendered)
+        self.assertNotIn("4321", rendered)
+        self.assertIn('"AccessCodeAuthentications": "***"', rendered)
+
+    def test_bytes_bodies(self):
+        body = json.dumps(
+            {"Name": "Contract", "Contacts": [{"Email": "mario@example.com"}]}
+        ).encode()
+
+        self.assertEqual(
+            render_payload(body, PayloadLogConfig()),
+            '{"Name": "Contract", "Contacts": [{"Email": "***"}]}',
+        )
+        self.assertEqual(render_payload(b"%PDF-1.4", PayloadLogConfig()), "<8 bytes>")
+
+    @mock.patch("requests.request")
+    def test_logged_requests_are_redacted(self, request):
+        request.return_value = make_response(json_data={"EnvelopeId": "1"})
+        client = ESignAnyWhereClient(api_token="token")
+        envelope = {
+            "Name": "Contract",
+            "Documents": [{"FileId": "file"}],
+            "Activities": [
+                {
+                    "Action": {
+                        "View": {
+                            "RecipientConfiguration": {
+                                "ContactInformation": {
+                                    "Email": "mario@example.com",
+                                    "GivenName": "Mario",
+                                    "Surname": "Rossi",
+                                    "LanguageCode": "IT",
+                                }
+                            }
+                        }
+                    }
+                }
+            ],
+        }
+        model = models_v6.EnvelopeSendRequest(**envelope)
+
+        for envelope_data in (model, json.dumps(envelope).encode()):
+            with self.assertLogs(
+                "esignanywhere_python_client.esign_client", level="DEBUG"
+            ) as logs:
+                client.create_and_send_envelope(envelope_data)
+            (message,) = [
+                record.getMessage()
+                for record in logs.records
+                if record.getMessage().startswith("create_and_send_envelope Request")
+            ]
+            self.assertNotIn("mario@example.com", message)
+            self.assertIn('"Email": "***"', message)
+            self.assertIn('"GivenName": "Mario"', message)
+
+    def test_size_cap(self):
+        payload = {"Activities": [{"Name": "x" * 100} for _ in range(10000)]}
+        rendered = render_payload(payload, PayloadLogConfig(max_length=500))
+
+        self.assertLessEqual(len(rendered), 500 + len("... [truncated]"))
+        self.assertTrue(rendered.endswith("... [truncated]"))
+
+    def test_lazy_rendering(self):
+        with mock.patch(
+            "esignanywhere_python_client.payload_logging.render_payload",
+            return_value="{}",
+        ) as render:
+            payload = LazyPayload({"a": 1}, PayloadLogConfig())
+            render.assert_not_called()
+            str(payload)
+            render.assert_called_once()
+
+    @mock.patch("requests.request")
+    def test_disabled_level_skips_rendering(self, request):
+        request.return_value = make_response(json_data={"EnvelopeId": "1"})
+        client = ESignAnyWhereClient(api_token="token")
+        logger = logging.getLogger("esignanywhere_python_client.esign_client")
+
+        with mock.patch.object(logger, "isEnabledFor", return_value=False):
+            with mock.patch(
+                "esignanywhere_python_client.payload_logging.LazyPayload"
+            ) as lazy_payload:
+                client.get_envelope_viewer_links("1")
+        lazy_payload.assert_not_called()
+
+    @mock.patch("requests.request")
+    def test_sampling(self, request):
+        request.return_value = make_response(json_data={"EnvelopeId": "1"})
+        client = ESignAnyWhereClient(
+            api_token="token", payload_log_config=PayloadLogConfig(sample_rate=0)
+        )
+
+        with self.assertLogs(
+            "esignanywhere_python_client.esign_client", level="INFO"
+        ) as logs:
+            client.get_envelope_viewer_links("1")
+        self.assertEqual(
+            logs.records[0].getMessage(),
+            f"Response from service_url : {client.api_uri}v6/envelope/1/viewerlinks",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
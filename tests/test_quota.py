@@ -0,0 +1,274 @@
+import threading
+import unittest
+from unittest import mock
+
+from esignanywhere_python_client import exceptions
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.metrics import InMemoryMetricsSink
+from esignanywhere_python_client.models import models_v6
+from esignanywhere_python_client.quota import (
+    QUOTA_REMAINING,
+    LicenseQuota,
+    QuotaMiddleware,
+)
+from esignanywhere_python_client.reference_data import ReferenceDataCache
+
+from .utils import make_response
+
+
+def make_license(limit, count):
+    return models_v6.LicenseGetResponse(Envelopes={"Limit": limit, "Count": count})
+
+
+class TestLicenseQuota(unittest.TestCase):
+    def setUp(self):
+        self.client = mock.Mock()
+        self.client.get_license.return_value = make_license(10, 7)
+        self.now = 0.0
+
+    def make_quota(self, **options):
+        return LicenseQuota(self.client, clock=lambda: self.now, **options)
+
+    def test_admits_up_to_the_limit(self):
+        quota = self.make_quota()
+
+        self.assertTrue(quota.acquire(2))
+        quota.commit(2)
+        self.assertEqual(quota.remaining, 1)
+        self.assertFalse(quota.acquire(2))
+        self.assertTrue(quota.acquire())
+        self.assertFalse(quota.acquire())
+        self.client.get_license.assert_called_once()
+
+    def test_headroom(self):
+        quota = self.make_quota(headroom=2)
+
+        self.assertTrue(quota.acquire())
+        self.assertFalse(quota.acquire())
+
+    def test_release_gives_back_envelopes(self):
+        quota = self.make_quota()
+        self.assertTrue(quota.acquire(3))
+        quota.release(3)
+
+        self.assertEqual(quota.remaining, 3)
+
+    def test_unlimited(self):
+        self.client.get_license.return_value = make_license(-1, 5000)
+        quota = self.make_quota()
+
+        self.assertTrue(quota.acquire(100000))
+        self.assertIsNone(quota.remaining)
+
+        self.client.get_license.return_value = models_v6.LicenseGetResponse()
+        quota = self.make_quota()
+        self.assertTrue(quota.acquire(100000))
+
+    def test_reconciles_periodically(self):
+        quota = self.make_quota(reconcile_seconds=60)
+        quota.acquire(2)
+        quota.commit(2)
+        self.client.get_license.return_value = make_license(10, 8)
+        self.now = 60
+
+        self.assertTrue(quota.acquire())
+
+        self.assertEqual(self.client.get_license.call_count, 2)
+        self.assertEqual((quota.count, quota.sent, quota.reserved), (8, 0, 1))
+        self.assertEqual(quota.remaining, 1)
+
+    def test_failed_reconciliation_keeps_the_tally(self):
+        quota = self.make_quota(reconcile_seconds=60)
+        quota.acquire()
+        self.client.get_license.side_effect = ValueError("boom")
+        self.now = 60
+
+        self.assertTrue(quota.acquire())
+        self.assertEqual(quota.remaining, 1)
+
+    def test_failed_first_reconciliation_backs_off(self):
+        self.client.get_license.side_effect = exceptions.ESawUnauthorizedRequest(
+            403, "https://demo.esignanywhere.net", "get_license", {}
+        )
+        quota = self.make_quota(limit=3, retry_seconds=10, reconcile_seconds=60)
+
+        with self.assertLogs("esignanywhere_python_client.quota", "WARNING"):
+            self.assertTrue(quota.acquire(2))
+        self.assertTrue(quota.acquire())
+        self.assertFalse(quota.acquire())
+        self.assertEqual(self.client.get_license.call_count, 1)
+
+        self.now = 10
+        with self.assertLogs("esignanywhere_python_client.quota", "WARNING"):
+            quota.acquire()
+        self.now = 29
+        quota.acquire()
+        self.assertEqual(self.client.get_license.call_count, 2)
+
+        self.client.get_license.side_effect = None
+        self.now = 30
+        quota.acquire()
+        self.assertEqual(self.client.get_license.call_count, 3)
+        self.assertEqual((quota.limit, quota.failures), (10, 0))
+
+    def test_unconfigured_limit_admits_until_reconciled(self):
+        self.client.get_license.side_effect = ValueError("boom")
+        quota = self.make_quota()
+
+        with self.assertLogs("esignanywhere_python_client.quota", "WARNING"):
+            self.assertTrue(quota.acquire(100))
+        self.assertIsNone(quota.remaining)
+
+    def test_a_single_thread_reconciles(self):
+        quota = self.make_quota()
+        quota._reconcile_lock.acquire()
+        self.addCleanup(quota._reconcile_lock.release)
+
+        self.assertTrue(quota.acquire())
+        self.client.get_license.assert_not_called()
+
+    def test_waits_for_a_reconciliation(self):
+        quota = LicenseQuota(self.client, reconcile_seconds=0.05)
+        self.assertTrue(quota.acquire(3))
+        self.client.get_license.return_value = make_license(10, 4)
+
+        self.assertTrue(quota.acquire(3, timeout=None))
+        self.assertEqual(self.client.get_license.call_count, 2)
+
+    def test_waits_for_released_envelopes(self):
+        quota = LicenseQuota(self.client)
+        self.assertTrue(quota.acquire(3))
+        threading.Timer(0.05, quota.release, (1,)).start()
+
+        self.assertTrue(quota.acquire(1, timeout=5))
+        self.assertFalse(quota.acquire(1, timeout=0.01))
+
+    def test_reserve(self):
+        quota = self.make_quota()
+
+        with quota.reserve(2):
+            self.assertEqual(quota.reserved, 2)
+        self.assertEqual(quota.sent, 2)
+        with self.assertRaises(exceptions.ESawRateLimitedError):
+            with quota.reserve():
+                raise exceptions.ESawRateLimitedError(429, "url", "send", {})
+        self.assertEqual((quota.sent, quota.reserved), (2, 0))
+        # The send may have been processed
+        with self.assertRaises(ValueError):
+            with quota.reserve():
+                raise ValueError
+        self.assertEqual((quota.sent, quota.reserved), (3, 0))
+        with self.assertRaises(exceptions.ESawQuotaExceededError) as context:
+            with quota.reserve(2, method_name="create_and_send_envelope"):
+                pass
+        self.assertEqual(context.exception.remaining, 0)
+        self.assertFalse(exceptions.is_retryable(context.exception))
+        self.assertIsNone(exceptions.get_backoff(context.exception))
+
+    def test_reads_the_license_through_the_cache(self):
+        cache = mock.Mock(spec=ReferenceDataCache)
+        cache.get_license.return_value = make_license(10, 0)
+        cache.refresh.return_value = make_license(10, 5)
+        quota = self.make_quota(reference_cache=cache, reconcile_seconds=60)
+
+        quota.acquire()
+        self.now = 60
+        quota.acquire()
+
+        cache.get_license.assert_called_once()
+        cache.refresh.assert_called_once_with("license")
+        self.client.get_license.assert_not_called()
+        self.assertEqual(quota.remaining, 3)
+
+    def test_metrics(self):
+        sink = InMemoryMetricsSink()
+        quota = self.make_quota(metrics_sink=sink)
+
+        quota.acquire()
+
+        self.assertEqual(sink.get_gauge(QUOTA_REMAINING), 2)
+
+
+class TestQuotaMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.client = ESignAnyWhereClient("token", "", is_test_env=True)
+        self.quota = LicenseQuota(mock.Mock())
+        self.quota.client.get_license.return_value = make_license(10, 8)
+        self.client.add_middleware(QuotaMiddleware(self.quota))
+
+    @mock.patch("requests.request")
+    def test_refuses_sends_over_the_quota(self, mock_request):
+        mock_request.return_value = make_response(json_data={"EnvelopeId": "1"})
+        request = b'{"Name": "test"}'
+
+        self.client.create_and_send_envelope(request)
+        self.client.create_and_send_envelope(request)
+        with self.assertRaises(exceptions.ESawQuotaExceededError):
+            self.client.create_and_send_envelope(request)
+
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(self.quota.sent, 2)
+
+    @mock.patch("requests.request")
+    def test_unprocessed_sends_do_not_count(self, mock_request):
+        mock_request.return_value = make_response(
+            status_code=429, json_data={"Message": "slow down"}
+        )
+
+        with self.assertRaises(exceptions.ESawRateLimitedError):
+            self.client.create_and_send_envelope(b"{}")
+        self.assertEqual((self.quota.sent, self.quota.reserved), (0, 0))
+
+        mock_request.return_value = make_response(
+            status_code=500, json_data={"Message": "failed"}
+        )
+        with self.assertRaises(exceptions.BaseAPIESawErrorResponse):
+            self.client.create_and_send_envelope(b"{}")
+        self.assertEqual((self.quota.sent, self.quota.reserved), (1, 0))
+
+    @mock.patch("requests.request")
+    def test_other_endpoints_pass(self, mock_request):
+        mock_request.return_value = make_response(content=b"")
+        self.quota.acquire(2)
+
+        self.client.delete_envelope("1")
+
+        mock_request.assert_called_once()
+
+    @mock.patch("requests.request")
+    def test_bulk_sends_count_their_recipients(self, mock_request):
+        request = models_v6.EnvelopeBulkSendRequest(
+            Name="bulk",
+            Documents=[{"FileId": "file"}],
+            Activities=[
+                {
+                    "Action": {
+                        "SignBulk": {
+                            "BulkRecipients": [
+                                {
+                                    "RecipientConfiguration": {
+                                        "ContactInformation": {
+                                            "Email": f"{index}@example.com",
+                                            "GivenName": "Mario",
+                                            "Surname": "Rossi",
+                                            "LanguageCode": "EN",
+                                        }
+                                    }
+                                }
+                                for index in range(3)
+                            ]
+                        }
+                    }
+                }
+            ],
+        )
+
+        with self.assertRaises(exceptions.ESawQuotaExceededError) as context:
+            self.client.create_and_send_bulk_envelope(request)
+
+        self.assertEqual(context.exception.requested, 3)
+        mock_request.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
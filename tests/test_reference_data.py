@@ -0,0 +1,220 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.exceptions import ESawInvalidVersionError
+from esignanywhere_python_client.metrics import InMemoryMetricsSink
+from esignanywhere_python_client.models import models_v6
+from esignanywhere_python_client.reference_data import (
+    REFERENCE_CACHE_LOOKUPS,
+    ReferenceDataCache,
+)
+
+from .utils import make_response
+
+LICENSE = {"Envelopes": {"Limit": 100, "Count": 10}}
+
+
+class TestReferenceEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.client = ESignAnyWhereClient("token", "", is_test_env=True)
+
+    @mock.patch("requests.request")
+    def test_get_sealing_certificates(self, mock_request):
+        mock_request.return_value = make_response(
+            json_data={"SealingCertificates": [{"Id": "1", "IsDefault": True}]}
+        )
+
+        response = self.client.get_sealing_certificates()
+
+        self.assertIsInstance(response, models_v6.SealingCertificateGetAllResponse)
+        self.assertTrue(response.SealingCertificates[0].IsDefault)
+        self.assertEqual(mock_request.call_args.args[0], "GET")
+        self.assertTrue(
+            mock_request.call_args.kwargs["url"].endswith("v6/sealingcertificate")
+        )
+
+    @mock.patch("requests.request")
+    def test_get_automatic_profiles(self, mock_request):
+        mock_request.return_value = make_response(
+            json_data={
+                "RemoteCertificateProfiles": [{"Id": "p", "Description": "Remote"}],
+                "SignaturePlugins": [{"PluginId": "plugin", "Profiles": []}],
+            }
+        )
+
+        response = self.client.get_automatic_profiles()
+
+        self.assertIsInstance(response, models_v6.AutomaticProfileGetAllResponse)
+        self.assertEqual(response.SignaturePlugins[0].PluginId, "plugin")
+        self.assertTrue(
+            mock_request.call_args.kwargs["url"].endswith("v6/automaticprofile")
+        )
+
+    def test_invalid_version(self):
+        with self.assertRaises(ESawInvalidVersionError):
+            self.client.get_sealing_certificates(version="v5")
+        with self.assertRaises(ESawInvalidVersionError):
+            self.client.get_automatic_profiles(version="v5")
+
+
+class TestReferenceDataCache(unittest.TestCase):
+    def setUp(self):
+        self.client = ESignAnyWhereClient("token", "", is_test_env=True)
+        self.now = 1000.0
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.snapshot_path = os.path.join(directory.name, "snapshot.json")
+        patcher = mock.patch(
+            "requests.request", return_value=make_response(json_data=LICENSE)
+        )
+        self.mock_request = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_cache(self, **options):
+        return ReferenceDataCache(self.client, clock=lambda: self.now, **options)
+
+    def test_caches_until_ttl(self):
+        cache = self.make_cache(ttl=60)
+
+        self.assertEqual(cache.get_license().Envelopes.Limit, 100)
+        self.now += 59
+        cache.get_license()
+        self.assertEqual(self.mock_request.call_count, 1)
+
+        self.now += 1
+        cache.get_license()
+        self.assertEqual(self.mock_request.call_count, 2)
+
+    def test_ttl_by_name(self):
+        cache = self.make_cache(ttl=60, ttls={"license": 10})
+        cache.get_license()
+        self.now += 10
+
+        cache.get_license()
+
+        self.assertEqual(self.mock_request.call_count, 2)
+
+    def test_unknown_name(self):
+        with self.assertRaises(KeyError):
+            self.make_cache().get("users")
+
+    def test_serves_stale_value_on_error(self):
+        cache = self.make_cache(ttl=60)
+        license = cache.get_license()
+        self.now += 60
+        self.mock_request.return_value = make_response(status_code=500)
+
+        self.assertIs(cache.get_license(), license)
+        self.assertIsNotNone(cache.entries["license"].error)
+
+        cache = self.make_cache(ttl=60, stale_if_error=False)
+        with self.assertRaises(Exception):
+            cache.get_license()
+
+    def test_raises_without_value(self):
+        self.mock_request.return_value = make_response(status_code=500)
+
+        with self.assertRaises(Exception):
+            self.make_cache().get_license()
+
+    def test_collapses_concurrent_fetches(self):
+        release = threading.Event()
+
+        def request(*args, **kwargs):
+            release.wait(5)
+            return make_response(json_data=LICENSE)
+
+        self.mock_request.side_effect = request
+        cache = self.make_cache()
+        threads = [threading.Thread(target=cache.get_license) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        threading.Timer(0.1, release.set).start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.mock_request.call_count, 1)
+
+    def test_refresh_due(self):
+        cache = self.make_cache(ttl=100, refresh_ratio=0.5)
+        cache.get_license()
+        self.now += 49
+        self.assertEqual(cache.refresh_due(), [])
+
+        self.now += 1
+        self.assertEqual(cache.refresh_due(), ["license"])
+        self.assertEqual(cache.entries["license"].fetched_at, self.now)
+        self.assertEqual(self.mock_request.call_count, 2)
+
+    def test_background_refresh(self):
+        refreshed = threading.Event()
+        cache = self.make_cache(ttl=100, refresh_ratio=0)
+        cache.get_license()
+
+        def refresh(name):
+            refreshed.set()
+
+        with mock.patch.object(cache, "refresh", side_effect=refresh):
+            cache.start(interval=0.01)
+            self.addCleanup(cache.stop)
+            self.assertTrue(refreshed.wait(5))
+
+    def test_snapshot(self):
+        cache = self.make_cache(ttl=60, snapshot_path=self.snapshot_path)
+        cache.get_license()
+        self.mock_request.return_value = make_response(content=b"OK")
+        cache.test_authorization()
+
+        cache = self.make_cache(ttl=60, snapshot_path=self.snapshot_path)
+
+        self.assertIsInstance(cache.get_license(), models_v6.LicenseGetResponse)
+        self.assertEqual(cache.get_license().Envelopes.Count, 10)
+        self.assertEqual(cache.test_authorization(), "OK")
+        self.assertEqual(self.mock_request.call_count, 2)
+
+        self.now += 60
+        cache.get_license()
+        self.assertEqual(self.mock_request.call_count, 3)
+        self.assertEqual(
+            os.listdir(os.path.dirname(self.snapshot_path)), ["snapshot.json"]
+        )
+
+    def test_corrupt_snapshot(self):
+        cache = self.make_cache(ttl=60, snapshot_path=self.snapshot_path)
+        cache.get_license()
+        with open(self.snapshot_path) as snapshot_file:
+            content = snapshot_file.read()
+
+        for corrupt in (content[: len(content) // 2], '{"license": {}}', "[]"):
+            with open(self.snapshot_path, "w") as snapshot_file:
+                snapshot_file.write(corrupt)
+            with self.assertLogs(
+                "esignanywhere_python_client.reference_data", "WARNING"
+            ):
+                cache = self.make_cache(ttl=60, snapshot_path=self.snapshot_path)
+
+            self.assertEqual(cache.entries, {})
+            self.assertIsInstance(cache.get_license(), models_v6.LicenseGetResponse)
+
+    def test_metrics(self):
+        sink = InMemoryMetricsSink()
+        cache = self.make_cache(metrics_sink=sink)
+
+        cache.get_license()
+        cache.get_license()
+        cache.get_license()
+
+        self.assertEqual(
+            sink.get_counter(REFERENCE_CACHE_LOOKUPS, data="license", result="miss"), 1
+        )
+        self.assertEqual(
+            sink.get_counter(REFERENCE_CACHE_LOOKUPS, data="license", result="hit"), 2
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
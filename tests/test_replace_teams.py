@@ -2,7 +2,7 @@ import os
 import unittest
 
 from esignanywhere_python_client.esign_client import ESignAnyWhereClient
-from esignanywhere_python_client.exceptions import ESawErrorResponse
+from esignanywhere_python_client.exceptions import ESawUnknownUserError
 from esignanywhere_python_client.models.models_v6 import (
     TeamReplaceRequest,
     TeamReplaceTeam,
@@ -30,7 +30,7 @@ class TestReplaceTeams(unittest.TestCase):
         )
 
     def test_invalid_email(self):
-        with self.assertRaises(ESawErrorResponse) as cm:
+        with self.assertRaises(ESawUnknownUserError) as cm:
             self.client.replace_teams(
                 TeamReplaceRequest(
                     Teams=[
@@ -3,7 +3,10 @@ import os
 import unittest
 
 from esignanywhere_python_client.esign_client import ESignAnyWhereClient
-from esignanywhere_python_client.exceptions import ESawErrorResponse
+from esignanywhere_python_client.exceptions import (
+    ESawExpirationInPastError,
+    ESawInvalidStatusError,
+)
 from esignanywhere_python_client.models.models_v6 import (
     EnvelopeRestartExpiredRequest,
     EnvelopeSendRequest,
@@ -74,7 +77,7 @@ class TestRestartEnvelopeExpirationDays(unittest.TestCase):
             microsecond=0
         ) - datetime.timedelta(days=1)
 
-        with self.assertRaises(ESawErrorResponse) as cm:
+        with self.assertRaises(ESawExpirationInPastError) as cm:
             self.client.restart_envelope_expiration_days(
                 EnvelopeRestartExpiredRequest(
                     EnvelopeId=self.envelope_id,
@@ -90,7 +93,7 @@ class TestRestartEnvelopeExpirationDays(unittest.TestCase):
             microsecond=0
         ) + datetime.timedelta(days=1)
 
-        with self.assertRaises(ESawErrorResponse) as cm:
+        with self.assertRaises(ESawInvalidStatusError) as cm:
             self.client.restart_envelope_expiration_days(
                 EnvelopeRestartExpiredRequest(
                     EnvelopeId=self.envelope_id,
@@ -0,0 +1,222 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from esignanywhere_python_client.batch import BatchCheckpoint
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.retention import (
+    PurgeEngine,
+    PurgeManifest,
+    RetentionPolicy,
+    has_metadata,
+)
+
+from .utils import make_response
+
+DAY = 86400
+NOW = 20000 * DAY
+
+
+class FakeServer:
+    def __init__(self, envelopes):
+        self.envelopes = envelopes
+        self.queries = []
+        self.deleted = []
+        self.already_deleted = set()
+        self.failing = set()
+
+    def request(self, method, url=None, json=None, **kwargs):
+        if url.endswith("v6/envelope/find"):
+            self.queries.append(json)
+            # Only the first window has envelopes
+            found = self.envelopes if len(self.queries) == 1 else []
+            return make_response(json_data={"Envelopes": found})
+        if url.endswith("/history"):
+            envelope_id = url.split("/")[-2]
+            return make_response(
+                json_data={
+                    "Events": [],
+                    "EnvelopeHasBeenDeleted": envelope_id in self.already_deleted,
+                }
+            )
+        envelope_id = json["EnvelopeId"]
+        if envelope_id in self.already_deleted or envelope_id in self.failing:
+            return make_response(status_code=400, json_data={"Message": "no"})
+        self.deleted.append(envelope_id)
+        return make_response(content=b"")
+
+
+class TestPurgeEngine(unittest.TestCase):
+    def setUp(self):
+        self.client = ESignAnyWhereClient("token", "", is_test_env=True)
+        self.server = FakeServer(
+            [
+                {"Id": "a", "Name": "A", "Status": "Completed", "MetaData": "{}"},
+                {
+                    "Id": "b",
+                    "Name": "B",
+                    "Status": "Completed",
+                    "MetaData": '{"Retention": "legal-hold"}',
+                },
+                {"Id": "c", "Name": "C", "Status": "Completed", "MetaData": None},
+                {"Id": "d", "Name": "D", "Status": "Active", "MetaData": None},
+            ]
+        )
+        patcher = mock.patch("requests.request", side_effect=self.server.request)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint_path = os.path.join(directory.name, "purge.checkpoint")
+        self.manifest_path = os.path.join(directory.name, "purge.manifest")
+
+    def make_engine(self, policy=None, **options):
+        return PurgeEngine(
+            self.client,
+            policy or RetentionPolicy(older_than_days=30, lookback_days=21),
+            checkpoint_path=self.checkpoint_path,
+            manifest_path=self.manifest_path,
+            clock=lambda: NOW,
+            **options,
+        )
+
+    def test_queries_windows(self):
+        queries = list(self.make_engine().get_queries())
+
+        self.assertEqual(len(queries), 4)
+        # Everything sent before the lookback is searched first
+        self.assertEqual(
+            queries[0].StartDate, datetime(2000, 1, 1, tzinfo=timezone.utc)
+        )
+        self.assertEqual(queries[0].EndDate.timestamp(), NOW - 51 * DAY)
+        self.assertEqual(queries[1].StartDate.timestamp(), NOW - 51 * DAY)
+        self.assertEqual(queries[-1].EndDate.timestamp(), NOW - 30 * DAY)
+        self.assertTrue(all(query.Status == "Completed" for query in queries))
+        self.assertTrue(all(query.InStatusSinceDays == 30 for query in queries))
+
+    def test_purges_matching_envelopes(self):
+        policy = RetentionPolicy(
+            older_than_days=30,
+            lookback_days=21,
+            predicate=lambda envelope: not has_metadata(Retention="legal-hold")(
+                envelope
+            ),
+        )
+
+        report = self.make_engine(policy).purge()
+
+        self.assertEqual(sorted(self.server.deleted), ["a", "c"])
+        self.assertEqual(report.found, 4)
+        self.assertEqual(report.filtered_out, 2)
+        self.assertEqual(report.deleted, 2)
+        self.assertTrue(PurgeManifest.verify(self.manifest_path))
+
+    def test_dry_run(self):
+        report = self.make_engine().purge(dry_run=True)
+
+        self.assertEqual(self.server.deleted, [])
+        self.assertEqual(report.found, 4)
+        self.assertEqual(report.filtered_out, 1)
+        self.assertFalse(os.path.exists(self.manifest_path))
+
+    def test_already_deleted_envelopes(self):
+        self.server.already_deleted.add("a")
+        self.server.failing.add("b")
+
+        report = self.make_engine().purge()
+
+        self.assertEqual(report.deleted, 1)
+        self.assertEqual(report.already_deleted, 1)
+        self.assertEqual([outcome.key for outcome in report.failed], ["b"])
+        with open(self.manifest_path) as manifest_file:
+            lines = [json.loads(line) for line in manifest_file]
+        self.assertEqual(
+            sorted((line["EnvelopeId"], line["result"]) for line in lines[:-1]),
+            [("a", "already_deleted"), ("c", "deleted")],
+        )
+        self.assertEqual(lines[-1]["signed_off"]["failed"], 1)
+
+    def test_resumes_from_checkpoint(self):
+        self.server.failing.add("b")
+        self.make_engine().purge()
+        self.server.failing.clear()
+        self.server.queries.clear()
+
+        report = self.make_engine().purge()
+
+        self.assertEqual(self.server.deleted.count("a"), 1)
+        self.assertIn("b", self.server.deleted)
+        self.assertEqual(report.skipped, 2)
+        self.assertEqual(report.deleted, 1)
+        self.assertTrue(PurgeManifest.verify(self.manifest_path))
+        with open(self.manifest_path) as manifest_file:
+            lines = manifest_file.readlines()
+        self.assertEqual(json.loads(lines[-1])["signed_off"]["entries"], 3)
+
+    def test_manifest_before_checkpoint(self):
+        with mock.patch.object(PurgeManifest, "add", side_effect=OSError("full")):
+            with self.assertRaises(OSError):
+                self.make_engine().purge()
+
+        with open(self.checkpoint_path) as checkpoint_file:
+            self.assertEqual(checkpoint_file.read(), "")
+        self.server.queries.clear()
+        self.make_engine().purge()
+        with open(self.manifest_path) as manifest_file:
+            lines = [json.loads(line) for line in manifest_file]
+        self.assertEqual(
+            sorted(line["EnvelopeId"] for line in lines[:-1]), ["a", "b", "c"]
+        )
+
+    def test_crash_before_checkpoint(self):
+        with mock.patch.object(BatchCheckpoint, "record", side_effect=OSError("full")):
+            with self.assertRaises(OSError):
+                self.make_engine().purge()
+        with open(self.manifest_path) as manifest_file:
+            listed = [json.loads(line)["EnvelopeId"] for line in manifest_file]
+        self.assertGreater(len(listed), 0)
+        self.server.queries.clear()
+
+        report = self.make_engine().purge()
+
+        self.assertEqual(report.already_listed, len(listed))
+        for envelope_id in listed:
+            self.assertEqual(self.server.deleted.count(envelope_id), 1)
+        self.assertTrue(PurgeManifest.verify(self.manifest_path))
+        with open(self.manifest_path) as manifest_file:
+            lines = [json.loads(line) for line in manifest_file]
+        self.assertEqual(
+            sorted(line["EnvelopeId"] for line in lines[:-1]), ["a", "b", "c"]
+        )
+
+    def test_manifest_signature(self):
+        self.make_engine(manifest_key=b"secret").purge()
+
+        self.assertTrue(PurgeManifest.verify(self.manifest_path, b"secret"))
+        self.assertFalse(PurgeManifest.verify(self.manifest_path, b"other"))
+        self.assertFalse(PurgeManifest.verify(self.manifest_path))
+
+        with open(self.manifest_path) as manifest_file:
+            content = manifest_file.read()
+        with open(self.manifest_path, "w") as manifest_file:
+            manifest_file.write(content.replace('"a"', '"z"'))
+        self.assertFalse(PurgeManifest.verify(self.manifest_path, b"secret"))
+
+
+class TestHasMetadata(unittest.TestCase):
+    def test_matches_json_metadata(self):
+        predicate = has_metadata(Retention="standard", Year=2020)
+        envelope = mock.Mock(MetaData='{"Retention": "standard", "Year": 2020}')
+
+        self.assertTrue(predicate(envelope))
+        self.assertFalse(predicate(mock.Mock(MetaData='{"Retention": "standard"}')))
+        self.assertFalse(predicate(mock.Mock(MetaData="<xml/>")))
+        self.assertFalse(predicate(mock.Mock(MetaData=None)))
+        self.assertFalse(predicate(mock.Mock(MetaData="[1]")))
+
+
+if __name__ == "__main__":
+    unittest.main()
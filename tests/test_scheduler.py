@@ -0,0 +1,114 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.metrics import InMemoryMetricsSink
+from esignanywhere_python_client.scheduler import (
+    BATCH,
+    INTERACTIVE,
+    SchedulerMiddleware,
+    WeightedFairScheduler,
+    priority,
+)
+
+from .utils import make_response
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.001)
+
+
+class TestWeightedFairScheduler(unittest.TestCase):
+    def setUp(self):
+        self.sink = InMemoryMetricsSink()
+        self.scheduler = WeightedFairScheduler(
+            max_concurrency=1,
+            weights={INTERACTIVE: 4.0, BATCH: 1.0},
+            metrics_sink=self.sink,
+        )
+        self.order = []
+        self.lock = threading.Lock()
+
+    def start(self, name, count):
+        threads = []
+        for _ in range(count):
+
+            def run():
+                with self.scheduler.slot(name):
+                    with self.lock:
+                        self.order.append(name)
+
+            thread = threading.Thread(target=run)
+            thread.start()
+            threads.append(thread)
+        wait_until(lambda: self.scheduler.queue_depth(name) == count)
+        return threads
+
+    def test_weighted_order(self):
+        self.scheduler.acquire(BATCH)
+        threads = self.start(BATCH, 4) + self.start(INTERACTIVE, 8)
+
+        self.assertEqual(
+            self.sink.get_gauge("esaw_scheduler_queue_depth", priority=BATCH), 4
+        )
+        self.scheduler.release()
+        for thread in threads:
+            thread.join()
+
+        # 4 interactive calls are served for each batch one
+        self.assertEqual(self.order[:5].count(BATCH), 1)
+        self.assertEqual(self.order[:10].count(BATCH), 2)
+        self.assertEqual(self.scheduler.queue_depth(), 0)
+        self.assertEqual(
+            self.sink.get_histogram(
+                "esaw_scheduler_wait_seconds", priority=INTERACTIVE
+            ).count,
+            8,
+        )
+
+    def test_lone_class_takes_all_slots(self):
+        scheduler = WeightedFairScheduler(max_concurrency=3)
+        for _ in range(3):
+            scheduler.acquire(BATCH)
+        self.assertEqual(scheduler.in_flight, 3)
+
+    def test_unknown_priority(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.acquire("urgent")
+
+
+class TestSchedulerMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.middleware = SchedulerMiddleware(
+            endpoints={"get_envelope_viewer_links": INTERACTIVE}
+        )
+        self.client = ESignAnyWhereClient(
+            api_token="token", middlewares=[self.middleware]
+        )
+        self.calls = []
+        self.client.add_middleware(self.record)
+
+    def record(self, call, call_next):
+        self.calls.append(call.extras["priority"])
+        return call_next(call)
+
+    @mock.patch("requests.request")
+    def test_priority_resolution(self, request):
+        request.return_value = make_response(json_data={})
+        self.client.get_teams()
+        with priority(BATCH):
+            self.client.get_teams()
+        self.client.get_envelope_viewer_links("envelope-id")
+
+        self.assertEqual(self.calls, ["default", BATCH, INTERACTIVE])
+        self.assertEqual(self.middleware.scheduler.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
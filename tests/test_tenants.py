@@ -0,0 +1,143 @@
+import http.client
+import io
+import unittest
+from unittest import mock
+
+from esignanywhere_python_client.circuit_breaker import CircuitBreakerMiddleware
+from esignanywhere_python_client.exceptions import ESawUnauthorizedRequest
+from esignanywhere_python_client.models import models_v6
+from esignanywhere_python_client.tenants import TenantClientPool
+
+from .utils import make_response
+
+
+class TestTenantClientPool(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.pool = TenantClientPool(
+            middleware_factory=lambda tenant_id: [CircuitBreakerMiddleware()],
+            idle_seconds=60,
+            clock=lambda: self.now,
+        )
+        self.pool.register("acme", "acme-token")
+        self.pool.register("globex", "globex-token")
+        self.pool.register("initech", "initech-token", "https://esign.initech.com")
+
+    def test_shared_adapters_and_own_middlewares(self):
+        acme, globex, initech = (
+            self.pool.get(tenant_id) for tenant_id in ("acme", "globex", "initech")
+        )
+
+        self.assertIs(self.pool.get("acme"), acme)
+        self.assertIsNot(acme.session, globex.session)
+        adapter = acme.session.get_adapter("https://demo.esignanywhere.net")
+        self.assertIs(
+            globex.session.get_adapter("https://demo.esignanywhere.net"), adapter
+        )
+        self.assertIs(self.pool.get_adapter("https://demo.esignanywhere.net"), adapter)
+        self.assertIsNot(
+            initech.session.get_adapter("https://esign.initech.com"), adapter
+        )
+        self.assertIsNot(acme.middlewares[0], globex.middlewares[0])
+        self.assertEqual(acme.api_token, "acme-token")
+        self.assertEqual(initech.api_uri, "https://esign.initech.com/Api/")
+
+    @mock.patch("requests.adapters.HTTPAdapter.send")
+    def test_cookies_stay_with_their_tenant(self, send):
+        def respond(request, **kwargs):
+            response = make_response(json_data={"Envelopes": []})
+            response.request = request
+            response.url = request.url
+            headers = b""
+            if request.headers["apiToken"] == "acme-token":
+                headers = b"Set-Cookie: session=acme; Path=/\r\n"
+            # Where requests reads the cookies set by a response from
+            response.raw = mock.Mock()
+            response.raw._original_response.msg = http.client.parse_headers(
+                io.BytesIO(headers + b"\r\n")
+            )
+            return response
+
+        send.side_effect = respond
+        descriptor = models_v6.EnvelopeFindRequest()
+        self.pool.get("acme").find_envelope(descriptor)
+        self.pool.get("globex").find_envelope(descriptor)
+        self.pool.get("acme").find_envelope(descriptor)
+
+        cookies = [call.args[0].headers.get("Cookie") for call in send.call_args_list]
+        self.assertEqual(cookies, [None, None, "session=acme"])
+
+    def test_evicted_clients_close_their_middlewares(self):
+        middlewares = []
+
+        def middleware_factory(tenant_id):
+            middlewares.append(mock.Mock(spec=CircuitBreakerMiddleware))
+            return [middlewares[-1]]
+
+        pool = TenantClientPool(
+            middleware_factory=middleware_factory,
+            idle_seconds=60,
+            max_clients=1,
+            clock=lambda: self.now,
+        )
+        pool.register("acme", "acme-token")
+        pool.register("globex", "globex-token")
+        pool.get("acme")
+        pool.get("globex")
+        middlewares[0].close.assert_called_once_with()
+        middlewares[1].close.assert_not_called()
+
+        self.now = 70
+        self.assertEqual(pool.evict_idle(), ["globex"])
+        middlewares[1].close.assert_called_once_with()
+        pool.get("acme")
+        pool.close()
+        middlewares[2].close.assert_called_once_with()
+
+    def test_unknown_tenant(self):
+        with self.assertRaises(KeyError):
+            self.pool.get("umbrella")
+
+    def test_idle_eviction(self):
+        acme = self.pool.get("acme")
+        self.now = 30
+        self.pool.get("globex")
+        self.now = 70
+
+        self.assertEqual(self.pool.evict_idle(), ["acme"])
+        self.assertEqual(len(self.pool), 1)
+        self.assertIsNot(self.pool.get("acme"), acme)
+
+    def test_max_clients(self):
+        pool = TenantClientPool(max_clients=1)
+        pool.register("acme", "acme-token")
+        pool.register("globex", "globex-token")
+        pool.get("acme")
+        pool.get("globex")
+
+        self.assertEqual(len(pool), 1)
+
+    @mock.patch("requests.Session.request")
+    def test_find_envelope_fan_out(self, request):
+        def respond(method, url, headers, **kwargs):
+            if headers["apiToken"] == "globex-token":
+                return make_response(401, {})
+            return make_response(
+                json_data={
+                    "Envelopes": [{"Id": headers["apiToken"][:-6], "Status": "Active"}]
+                }
+            )
+
+        request.side_effect = respond
+        envelopes, errors = self.pool.find_envelope(models_v6.EnvelopeFindRequest())
+
+        self.assertEqual(
+            sorted((e.tenant_id, e.envelope.Id) for e in envelopes),
+            [("acme", "acme"), ("initech", "initech")],
+        )
+        self.assertEqual(list(errors), ["globex"])
+        self.assertIsInstance(errors["globex"], ESawUnauthorizedRequest)
+
+
+if __name__ == "__main__":
+    unittest.main()
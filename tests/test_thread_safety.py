@@ -0,0 +1,66 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from esignanywhere_python_client.coalescing import CoalescingMiddleware
+from esignanywhere_python_client.esign_client import ESignAnyWhereClient
+from esignanywhere_python_client.metrics import InMemoryMetricsSink
+from esignanywhere_python_client.middleware import Middleware
+
+from .utils import make_response
+
+THREADS = 16
+CALLS = 50
+
+
+class TestThreadSafety(unittest.TestCase):
+    def setUp(self):
+        self.sink = InMemoryMetricsSink()
+        self.client = ESignAnyWhereClient(
+            api_token="token",
+            metrics_sink=self.sink,
+            middlewares=[CoalescingMiddleware(endpoints=set())],
+        )
+        self.barrier = threading.Barrier(THREADS)
+
+    def run_threads(self, function):
+        def run(_):
+            self.barrier.wait()
+            for _ in range(CALLS):
+                function()
+
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            list(executor.map(run, range(THREADS)))
+
+    @mock.patch("requests.request")
+    def test_shared_client_metrics(self, request):
+        request.side_effect = lambda *args, **kwargs: make_response(
+            json_data={"Teams": []}
+        )
+        self.run_threads(self.client.get_teams)
+
+        self.assertEqual(
+            self.sink.get_counter(
+                "esaw_responses_total",
+                endpoint="get_teams",
+                version="v6",
+                status_code="200",
+            ),
+            THREADS * CALLS,
+        )
+        self.assertEqual(
+            self.sink.get_histogram(
+                "esaw_request_duration_seconds", endpoint="get_teams", version="v6"
+            ).count,
+            THREADS * CALLS,
+        )
+
+    def test_concurrent_add_middleware(self):
+        self.run_threads(lambda: self.client.add_middleware(Middleware()))
+
+        self.assertEqual(len(self.client.middlewares), THREADS * CALLS + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,7 @@ import unittest
 import uuid
 
 from esignanywhere_python_client.esign_client import ESignAnyWhereClient
-from esignanywhere_python_client.exceptions import ESawErrorResponse
+from esignanywhere_python_client.exceptions import ESawEmptyFileError
 
 
 class TestUploadFile(unittest.TestCase):
@@ -53,7 +53,7 @@ class TestUploadFile(unittest.TestCase):
     def test_upload_empty_file(self):
         f = io.BufferedReader(io.BytesIO())
 
-        with self.assertRaises(ESawErrorResponse) as cm:
+        with self.assertRaises(ESawEmptyFileError) as cm:
             self.client.upload_file(f)
 
         self.assertEqual(cm.exception.status_code, 400)
@@ -0,0 +1,22 @@
+import datetime
+import json
+
+import requests
+
+
+def make_response(
+    status_code=200, json_data=None, content=None, headers=None, request_body=b""
+):
+    """Build a requests.Response as returned by the eSignAnyWhere API."""
+    response = requests.Response()
+    response.status_code = status_code
+    if content is None:
+        content = json.dumps(json_data if json_data is not None else {}).encode()
+    response._content = content
+    response.headers.update(headers or {"Content-Type": "application/json"})
+    response.elapsed = datetime.timedelta(milliseconds=5)
+    response.request = requests.Request(
+        "POST", "https://demo.esignanywhere.net/Api/"
+    ).prepare()
+    response.request.body = request_body
+    return response